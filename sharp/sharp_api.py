@@ -11,6 +11,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import base64
 import gzip
+import re
+import uuid
 
 # Define the Modal App
 app = modal.App("sharp-api-myroom-v2")
@@ -53,6 +55,15 @@ image = (
 models_volume = modal.Volume.from_name("sharp-models", create_if_missing=True)
 CACHE_DIR = "/root/.cache/torch/hub/checkpoints"
 
+# Volume for the predicted scenes, so they can be rendered from new views later on.
+# Scenes are only stored on request (/predict?persist_scene=true) and deleted by
+# cleanup_scenes once they are older than SCENE_RETENTION_DAYS.
+scenes_volume = modal.Volume.from_name("sharp-scenes", create_if_missing=True)
+SCENES_DIR = "/root/scenes"
+SCENE_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+SCENE_RETENTION_DAYS = 7
+MAX_RENDER_SIZE = 4096
+
 def extract_camera_params(ply_path: Path) -> dict:
     """Extract camera parameters from Sharp PLY file."""
     from plyfile import PlyData
@@ -136,35 +147,18 @@ def map_2d_mask_to_gaussians_from_ply(floor_mask_2d, ply_path, camera_params):
         print(f"Image size: {img_width}x{img_height}")
         print(f"Floor mask shape: {floor_mask_2d.shape}")
 
-        # Project 3D positions to 2D image coordinates
+        # Project 3D positions to 2D image coordinates and look up the mask.
         # For Sharp's coordinate system: camera at origin looking down +Z
-        # Standard pinhole projection: u = fx * (x/z) + cx, v = fy * (y/z) + cy
-        z = positions[:, 2]
-
-        # Avoid division by zero
-        valid_depth = z > 0.01  # Gaussians must be in front of camera
-
-        u = fx * (positions[:, 0] / np.maximum(z, 0.01)) + cx
-        v = fy * (positions[:, 1] / np.maximum(z, 0.01)) + cy
-
-        # Convert to integer pixel coordinates
-        u_px = np.round(u).astype(int)
-        v_px = np.round(v).astype(int)
+        from sharp.utils.labels import map_mask_to_gaussians
 
-        # Check if pixels are within image bounds
-        in_bounds = (u_px >= 0) & (u_px < img_width) & (v_px >= 0) & (v_px < img_height) & valid_depth
+        floor_gaussian_mask = map_mask_to_gaussians(
+            floor_mask_2d,
+            positions,
+            focal_length_px=(fx, fy),
+            principal_point_px=(cx, cy),
+            image_size=(img_width, img_height),
+        )
 
-        # Create floor mask for gaussians
-        floor_gaussian_mask = np.zeros(num_gaussians, dtype=bool)
-
-        # For each gaussian, check if its projected pixel is floor
-        for i in range(num_gaussians):
-            if in_bounds[i]:
-                # Check floor mask at projected pixel location
-                is_floor = floor_mask_2d[v_px[i], u_px[i]] > 127  # Threshold at mid-gray
-                floor_gaussian_mask[i] = is_floor
-
-        print(f"Gaussians in bounds: {np.sum(in_bounds)} / {num_gaussians}")
         print(f"Floor gaussians: {np.sum(floor_gaussian_mask)} / {num_gaussians} ({100 * np.sum(floor_gaussian_mask) / num_gaussians:.1f}%)")
 
         return floor_gaussian_mask
@@ -179,11 +173,11 @@ def map_2d_mask_to_gaussians_from_ply(floor_mask_2d, ply_path, camera_params):
 @app.function(
     image=image,
     gpu="A100",  # Upgraded from T4 for higher quality processing
-    volumes={CACHE_DIR: models_volume},
+    volumes={CACHE_DIR: models_volume, SCENES_DIR: scenes_volume},
     timeout=600,  # 10 minutes should be enough
     container_idle_timeout=600  # Keep container alive for 10 minutes after last request
 )
-def process_image(image_bytes: bytes, render_video: bool = False):
+def process_image(image_bytes: bytes, render_video: bool = False, persist_scene: bool = False):
     import torch
     import torch.nn.functional as F
     import torchvision.transforms as transforms
@@ -306,6 +300,7 @@ def process_image(image_bytes: bytes, render_video: bool = False):
         print(f"Output files: {[f.relative_to(output_dir) for f in output_files]}")
         
         ply_bytes = None
+        scene_id = None
         camera_params = None
         floor_gaussian_mask = None
         wall_gaussian_mask = None
@@ -318,6 +313,13 @@ def process_image(image_bytes: bytes, render_video: bool = False):
             with open(ply_path, "rb") as f:
                 ply_bytes = f.read()
 
+            # Persist the scene on request so /render can load it by its id
+            if persist_scene:
+                scene_id = uuid.uuid4().hex
+                shutil.copyfile(ply_path, Path(SCENES_DIR) / f"{scene_id}.ply")
+                scenes_volume.commit()
+                print(f"Saved scene {scene_id}")
+
             # Extract camera parameters from PLY file
             camera_params = extract_camera_params(ply_path)
             print(f"Extracted camera parameters: {camera_params}")
@@ -384,6 +386,7 @@ def process_image(image_bytes: bytes, render_video: bool = False):
             "wall_coverage_2d": float(np.sum(wall_mask > 0) / wall_mask.size),
             "wall_coverage_3d": float(np.sum(wall_gaussian_mask) / len(wall_gaussian_mask)),
             "camera": camera_params,
+            "scene_id": scene_id,
             "gaussian_grid_info": {
                 "total_gaussians": len(floor_gaussian_mask),
                 "floor_rug_gaussians": int(np.sum(floor_gaussian_mask)),
@@ -392,6 +395,189 @@ def process_image(image_bytes: bytes, render_video: bool = False):
             }
         }
 
+# Scenes resident on the device of a warm render container (see render_scene)
+scene_cache = None
+
+def load_scene(scene_id: str):
+    """Load a stored scene from the scenes volume."""
+    from sharp.utils.gaussians import load_ply
+
+    scene_path = Path(SCENES_DIR) / f"{scene_id}.ply"
+    if not scene_path.exists():
+        # The scene may have been committed by another container after this one started
+        scenes_volume.reload()
+    if not scene_path.exists():
+        raise FileNotFoundError(f"Unknown scene {scene_id}")
+    return load_ply(scene_path)
+
+@app.function(
+    image=image,
+    volumes={SCENES_DIR: scenes_volume},
+    schedule=modal.Period(hours=6),
+)
+def cleanup_scenes():
+    """Delete stored scenes which are older than SCENE_RETENTION_DAYS."""
+    import time
+
+    scenes_volume.reload()
+    max_mtime = time.time() - SCENE_RETENTION_DAYS * 24 * 3600
+    num_deleted = 0
+    for scene_path in Path(SCENES_DIR).glob("*.ply"):
+        if scene_path.stat().st_mtime < max_mtime:
+            scene_path.unlink(missing_ok=True)
+            num_deleted += 1
+    if num_deleted > 0:
+        scenes_volume.commit()
+    print(f"Deleted {num_deleted} scenes older than {SCENE_RETENTION_DAYS} days")
+
+@app.function(
+    image=image,
+    gpu="A100",
+    volumes={SCENES_DIR: scenes_volume},
+    timeout=60,
+    container_idle_timeout=600  # Keep resident scenes around for 10 minutes after last request
+)
+def render_scene(
+    scene_id: str,
+    extrinsics: list,
+    intrinsics: dict,
+    width: int,
+    height: int,
+    image_format: str = "jpeg",
+) -> bytes:
+    """Render a stored scene from a single camera into an encoded image."""
+    import io
+    import time
+
+    import torch
+
+    from sharp.utils import gsplat
+    from sharp.utils import io as io_utils
+    from sharp.utils.scene_cache import SceneCache
+
+    global scene_cache
+    if scene_cache is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        scene_cache = SceneCache(load_scene, device=device, max_scenes=8, max_bytes=8 * 1024**3)
+
+    start_time = time.time()
+    scene = scene_cache.get(scene_id)
+    device = scene_cache.device
+
+    extrinsics_pt = torch.tensor(extrinsics, dtype=torch.float32, device=device).reshape(1, 4, 4)
+    intrinsics_pt = torch.tensor(
+        [
+            [intrinsics["fx"], 0, intrinsics["cx"], 0],
+            [0, intrinsics["fy"], intrinsics["cy"], 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ],
+        dtype=torch.float32,
+        device=device,
+    )[None]
+
+    renderer = gsplat.GSplatRenderer(color_space=scene.metadata.color_space)
+    with torch.no_grad():
+        rendering_output = renderer.render_views(
+            scene.gaussians, extrinsics_pt, intrinsics_pt, width, height
+        )
+    color = (rendering_output.color[0].permute(1, 2, 0).clamp(0, 1) * 255.0).to(torch.uint8)
+
+    output_io = io.BytesIO()
+    io_utils.write_image(
+        color.cpu().numpy(), output_io, format="JPEG" if image_format == "jpeg" else "PNG"
+    )
+    print(
+        f"⏱️ Rendered scene {scene_id} at {width}x{height} in {time.time() - start_time:.3f}s "
+        f"(cache: {len(scene_cache)} scenes, {scene_cache.num_hits} hits, "
+        f"{scene_cache.num_misses} misses)"
+    )
+    return output_io.getvalue()
+
+# Monodepth model of a warm depth container (see predict_depth_preview)
+depth_model = None
+
+@app.function(
+    image=image,
+    gpu="A100",
+    volumes={CACHE_DIR: models_volume},
+    timeout=60,
+    container_idle_timeout=600  # Keep the model loaded for 10 minutes after last request
+)
+def predict_depth_preview(image_bytes: bytes, point_stride: Optional[int] = None) -> dict:
+    """Predict a metric depth map and optionally a point cloud without Gaussians."""
+    import io
+    import time
+
+    import torch
+
+    from sharp.cli.depth import (
+        DEPTH_PNG_SCALE,
+        create_monodepth_predictor,
+        depth_to_points,
+        predict_depth,
+        save_depth_png,
+        write_point_cloud,
+    )
+    from sharp.cli.predict import DEFAULT_MODEL_URL
+    from sharp.utils import io as io_utils
+
+    global depth_model
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    if depth_model is None:
+        state_dict = torch.hub.load_state_dict_from_url(DEFAULT_MODEL_URL, progress=False)
+        depth_model = create_monodepth_predictor(state_dict).to(device)
+
+    start_time = time.time()
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
+        image_file.write(image_bytes)
+        image_file.flush()
+        # Reads the focal length from the EXIF data like `sharp predict`
+        rgb, _, f_px = io_utils.load_rgb(Path(image_file.name))
+
+    depth = predict_depth(depth_model, rgb, f_px, device).cpu().numpy()
+    depth_io = io.BytesIO()
+    save_depth_png(depth, depth_io)
+
+    result = {
+        "depth_png": base64.b64encode(depth_io.getvalue()).decode('utf-8'),
+        "depth_scale": DEPTH_PNG_SCALE,
+        "width": int(depth.shape[1]),
+        "height": int(depth.shape[0]),
+        "f_px": float(f_px),
+        "points_ply": None,
+    }
+    if point_stride is not None:
+        points, colors = depth_to_points(depth, rgb, f_px, point_stride)
+        points_io = io.BytesIO()
+        write_point_cloud(points, colors, points_io)
+        result["points_ply"] = base64.b64encode(
+            gzip.compress(points_io.getvalue(), compresslevel=6)
+        ).decode('utf-8')
+    print(
+        f"⏱️ Depth preview at {depth.shape[1]}x{depth.shape[0]} "
+        f"in {time.time() - start_time:.3f}s"
+    )
+    return result
+
+class CameraIntrinsics(BaseModel):
+    """Pinhole intrinsics in pixels."""
+
+    fx: float
+    fy: float
+    cx: float
+    cy: float
+
+class RenderRequest(BaseModel):
+    """Request body of /render."""
+
+    scene_id: str
+    extrinsics: list[float]  # Row-major 4x4 world-to-camera matrix (OpenCV convention)
+    intrinsics: CameraIntrinsics
+    width: int
+    height: int
+    format: str = "jpeg"
+
 @app.function(
     image=image,
     allow_concurrent_inputs=True,
@@ -415,7 +601,19 @@ def fastapi_app():
             "description": "Monocular View Synthesis - Fast Splat Generation with 2D+3D Floor/Rug/Wall Segmentation (Optimized with Compression)",
             "version": "2.3.0",
             "endpoints": {
-                "/predict": "POST - Upload an image to generate a 3D gaussian splat PLY file with 2D and 3D floor/rug/wall segmentation"
+                "/predict": (
+                    "POST - Upload an image to generate a 3D gaussian splat PLY file with 2D "
+                    "and 3D floor/rug/wall segmentation (query parameter persist_scene stores "
+                    f"the scene for /render for {SCENE_RETENTION_DAYS} days)"
+                ),
+                "/depth": (
+                    "POST - Upload an image to get a fast metric depth preview (16-bit PNG) "
+                    "and optionally a point cloud (query parameter point_stride)"
+                ),
+                "/render": (
+                    "POST - Render a novel view of a stored scene (JSON body: scene_id, "
+                    "extrinsics, intrinsics, width, height, format) as JPEG or PNG"
+                ),
             },
             "response_format": {
                 "ply": "base64-encoded gzip-compressed PLY file (3D Gaussian splat)",
@@ -430,6 +628,9 @@ def fastapi_app():
                 "wall_mask_3d_length": "int - original length of wall mask array before packing",
                 "wall_coverage_2d": "float - percentage of image pixels identified as wall (0.0 to 1.0)",
                 "wall_coverage_3d": "float - percentage of Gaussians identified as wall (0.0 to 1.0)",
+                "scene_id": (
+                    "string - id of the stored scene for /render (null without persist_scene)"
+                ),
                 "camera": {
                     "intrinsics": {"fx": "float", "fy": "float", "cx": "float", "cy": "float"},
                     "extrinsics": {"position": "[x, y, z]", "matrix": "4x4 transformation matrix"},
@@ -440,19 +641,65 @@ def fastapi_app():
                     "floor_rug_gaussians": "int - number of Gaussians identified as floor or rug",
                     "wall_gaussians": "int - number of Gaussians identified as wall"
                 }
+            },
+            "depth_response_format": {
+                "depth_png": "base64-encoded 16-bit PNG of the metric depth at image resolution",
+                "depth_scale": "float - depth in meters is the PNG value divided by this scale",
+                "width": "int", "height": "int", "f_px": "float - focal length in pixels",
+                "points_ply": (
+                    "base64-encoded gzip-compressed PLY point cloud (null without point_stride)"
+                ),
             }
         }
 
     @app.post("/predict")
-    async def predict_endpoint(file: UploadFile = File(...)):
+    async def predict_endpoint(file: UploadFile = File(...), persist_scene: bool = False):
         image_bytes = await file.read()
         
         # Check if file is image
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
             
-        result = process_image.remote(image_bytes)
+        result = process_image.remote(image_bytes, persist_scene=persist_scene)
         return result
+
+    @app.post("/depth")
+    async def depth_endpoint(file: UploadFile = File(...), point_stride: Optional[int] = None):
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+        if point_stride is not None and point_stride < 1:
+            raise HTTPException(status_code=400, detail="point_stride must be positive")
+
+        image_bytes = await file.read()
+        return predict_depth_preview.remote(image_bytes, point_stride)
+
+    @app.post("/render")
+    async def render_endpoint(request: RenderRequest):
+        if not SCENE_ID_PATTERN.fullmatch(request.scene_id):
+            raise HTTPException(status_code=400, detail="Invalid scene_id")
+        if len(request.extrinsics) != 16:
+            raise HTTPException(
+                status_code=400, detail="extrinsics must be a 4x4 matrix with 16 values"
+            )
+        if not (0 < request.width <= MAX_RENDER_SIZE and 0 < request.height <= MAX_RENDER_SIZE):
+            raise HTTPException(
+                status_code=400, detail=f"width and height must be in [1, {MAX_RENDER_SIZE}]"
+            )
+        if request.format not in ("jpeg", "png"):
+            raise HTTPException(status_code=400, detail="format must be jpeg or png")
+
+        try:
+            image_bytes = render_scene.remote(
+                request.scene_id,
+                request.extrinsics,
+                request.intrinsics.model_dump(),
+                request.width,
+                request.height,
+                request.format,
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Scene not found")
+        return Response(content=image_bytes, media_type=f"image/{request.format}")
     
     return app
 
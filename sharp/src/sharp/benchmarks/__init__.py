@@ -0,0 +1,44 @@
+"""Contains micro-benchmarks for performance critical code paths.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from . import cases, pipeline
+from .harness import (
+    BENCHMARK_REGISTRY,
+    DEFAULT_SCENE_SIZES,
+    BenchmarkCase,
+    BenchmarkContext,
+    BenchmarkResult,
+    BenchmarkSkipped,
+    collect_metadata,
+    compare_results,
+    get_peak_memory_increase,
+    load_results,
+    register_benchmark,
+    reset_peak_memory,
+    run_benchmarks,
+    save_results,
+    select_benchmarks,
+)
+
+__all__ = [
+    "cases",
+    "pipeline",
+    "BENCHMARK_REGISTRY",
+    "DEFAULT_SCENE_SIZES",
+    "BenchmarkCase",
+    "BenchmarkContext",
+    "BenchmarkResult",
+    "BenchmarkSkipped",
+    "collect_metadata",
+    "compare_results",
+    "get_peak_memory_increase",
+    "load_results",
+    "register_benchmark",
+    "reset_peak_memory",
+    "run_benchmarks",
+    "save_results",
+    "select_benchmarks",
+]
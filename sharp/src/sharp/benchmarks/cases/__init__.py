@@ -0,0 +1,11 @@
+"""Contains the micro-benchmark cases, grouped by area.
+
+Importing this package registers all cases.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from . import io, linalg, model, render
+
+__all__ = ["io", "linalg", "model", "render"]
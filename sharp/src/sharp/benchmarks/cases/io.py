@@ -0,0 +1,167 @@
+"""Contains benchmark cases for the Gaussian and video I/O.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import zlib
+
+import torch
+
+from sharp.utils import gaussians as gaussians_utils
+from sharp.utils import io, ordering
+from sharp.utils import packed_gaussians as packed_utils
+
+from ..harness import BenchmarkContext, register_benchmark
+from ..scenes import (
+    DEFAULT_FOCAL_LENGTH_PX,
+    DEFAULT_IMAGE_SIZE,
+    LAYERED_SCENE_SIZES,
+    create_synthetic_gaussians,
+    create_synthetic_layered_scene,
+)
+
+# Resolution of the video encoding benchmark (divisible by the codec block size).
+VIDEO_FRAME_SIZE = (1024, 768)
+
+
+@register_benchmark("gaussians.save_ply")
+def _setup_save_ply(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    path = context.workdir / f"save_{size}.ply"
+
+    def run():
+        gaussians_utils.save_ply(gaussians, DEFAULT_FOCAL_LENGTH_PX, DEFAULT_IMAGE_SIZE[::-1], path)
+
+    return run
+
+
+@register_benchmark("gaussians.load_ply")
+def _setup_load_ply(size: int, context: BenchmarkContext):
+    path = context.workdir / f"load_{size}.ply"
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    gaussians_utils.save_ply(gaussians, DEFAULT_FOCAL_LENGTH_PX, DEFAULT_IMAGE_SIZE[::-1], path)
+
+    def run():
+        return gaussians_utils.load_ply(path)
+
+    return run
+
+
+def _packed_gaussians_metrics(size: int, context: BenchmarkContext):
+    """Report the memory savings and quantization errors of the packed layouts."""
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    unpacked_nbytes = sum(tensor.numel() * tensor.element_size() for tensor in gaussians)
+    metrics = {}
+    for name, layout in (
+        ("float32", packed_utils.FLOAT32_LAYOUT),
+        ("compact", packed_utils.COMPACT_LAYOUT),
+    ):
+        packed = packed_utils.PackedGaussians.from_gaussians(gaussians, layout)
+        metrics[f"{name}_bytes_ratio"] = packed.nbytes / unpacked_nbytes
+        for attribute in ("quaternions", "colors", "opacities"):
+            error = packed.get_column(attribute) - getattr(gaussians, attribute)[0].reshape(
+                size, -1
+            )
+            metrics[f"{name}_max_{attribute}_error"] = error.abs().max().item()
+    return metrics
+
+
+@register_benchmark("packed.from_gaussians", metrics=_packed_gaussians_metrics)
+def _setup_packed_from_gaussians(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+
+    def run():
+        return packed_utils.PackedGaussians.from_gaussians(gaussians)
+
+    return run
+
+
+@register_benchmark("packed.from_gaussians.compact")
+def _setup_packed_from_gaussians_compact(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+
+    def run():
+        return packed_utils.PackedGaussians.from_gaussians(gaussians, packed_utils.COMPACT_LAYOUT)
+
+    return run
+
+
+@register_benchmark("packed.to_ply_vertices")
+def _setup_packed_to_ply_vertices(size: int, context: BenchmarkContext):
+    packed = packed_utils.PackedGaussians.from_gaussians(
+        create_synthetic_gaussians(size, seed=context.seed)
+    )
+
+    def run():
+        return packed.to_ply_vertices()
+
+    return run
+
+
+def _gaussian_order_metrics(size: int, context: BenchmarkContext):
+    """Compare the PLY compression and memory locality of the Gaussian orders."""
+    gaussians = create_synthetic_layered_scene(size, seed=context.seed, device=context.device)
+    metrics = {}
+    for order in ("none", "morton"):
+        sorted_gaussians, _ = ordering.sort_gaussians(gaussians, order)
+        vertices = gaussians_utils.convert_gaussians_to_ply_vertices(sorted_gaussians)
+        data = vertices.tobytes()
+        metrics[f"zlib_ratio_{order}"] = len(data) / len(zlib.compress(data, 6))
+        data = packed_utils.PackedGaussians.from_gaussians(
+            sorted_gaussians, packed_utils.COMPACT_LAYOUT
+        ).to_numpy()
+        data = data.tobytes()
+        metrics[f"zlib_ratio_compact_{order}"] = len(data) / len(zlib.compress(data, 6))
+        # Distance between consecutive Gaussians relative to the median depth.
+        mean_vectors = sorted_gaussians.mean_vectors[0]
+        steps = (mean_vectors[1:] - mean_vectors[:-1]).norm(dim=-1)
+        metrics[f"median_step_{order}"] = (steps.median() / mean_vectors[:, 2].median()).item()
+        metrics[f"p99_step_{order}"] = (
+            torch.quantile(steps[:: max(len(steps) // 2**20, 1)], 0.99)
+            / mean_vectors[:, 2].median()
+        ).item()
+    return metrics
+
+
+@register_benchmark("ordering.morton", sizes=LAYERED_SCENE_SIZES, metrics=_gaussian_order_metrics)
+def _setup_ordering_morton(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_layered_scene(size, seed=context.seed, device=context.device)
+
+    def run():
+        return ordering.sort_gaussians(gaussians, "morton")
+
+    return run
+
+
+def _setup_video_writer(size: int, context: BenchmarkContext, asynchronous: bool):
+    image_width, image_height = VIDEO_FRAME_SIZE
+    generator = torch.Generator().manual_seed(context.seed)
+    # Smooth frames to get realistic encoding costs.
+    images = torch.nn.functional.interpolate(
+        torch.rand(size, 3, image_height // 32, image_width // 32, generator=generator),
+        size=(image_height, image_width),
+        mode="bilinear",
+    )
+    images = (255.0 * images.permute(0, 2, 3, 1)).to(torch.uint8).to(context.device)
+    depths = 1.0 + 19.0 * images[..., :1].permute(0, 3, 1, 2).float() / 255.0
+
+    def run():
+        video_writer = io.VideoWriter(context.workdir / "video.mp4", asynchronous=asynchronous)
+        for image, depth in zip(images, depths):
+            video_writer.add_frame(image, depth)
+        video_writer.close()
+
+    return run
+
+
+@register_benchmark("io.video_writer", unit="frames", sizes=(30,))
+def _setup_video_writer_sync(size: int, context: BenchmarkContext):
+    return _setup_video_writer(size, context, asynchronous=False)
+
+
+@register_benchmark("io.video_writer.async", unit="frames", sizes=(30,))
+def _setup_video_writer_async(size: int, context: BenchmarkContext):
+    return _setup_video_writer(size, context, asynchronous=True)
@@ -0,0 +1,277 @@
+"""Contains benchmark cases for the Gaussian math, linear algebra and spatial queries.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import torch
+
+from sharp.utils import gaussians as gaussians_utils
+from sharp.utils import labels, linalg
+from sharp.utils.spatial_index import SpatialIndex
+
+from ..harness import BenchmarkContext, register_benchmark
+from ..scenes import (
+    DEFAULT_FOCAL_LENGTH_PX,
+    DEFAULT_IMAGE_SIZE,
+    INTERNAL_RESOLUTION,
+    create_random_rotations,
+    create_synthetic_gaussians,
+    create_synthetic_mask,
+)
+
+# Number of queries per spatial index benchmark.
+NUM_SPATIAL_QUERIES = 10_000
+
+
+def _create_unprojection_matrix(device: torch.device) -> torch.Tensor:
+    """Create the NDC unprojection matrix used by `sharp predict`."""
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+    f_px = DEFAULT_FOCAL_LENGTH_PX
+    intrinsics = torch.tensor(
+        [
+            [f_px * INTERNAL_RESOLUTION / image_width, 0, INTERNAL_RESOLUTION / 2, 0],
+            [0, f_px * INTERNAL_RESOLUTION / image_height, INTERNAL_RESOLUTION / 2, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ],
+        device=device,
+    )
+    return gaussians_utils.get_unprojection_matrix(
+        torch.eye(4, device=device), intrinsics, (INTERNAL_RESOLUTION, INTERNAL_RESOLUTION)
+    )
+
+
+@register_benchmark("gaussians.apply_transform")
+def _setup_apply_transform(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    transform = _create_unprojection_matrix(context.device)[:3]
+
+    def run():
+        return gaussians_utils.apply_transform(gaussians, transform)
+
+    return run
+
+
+@register_benchmark("gaussians.apply_transform.similarity")
+def _setup_apply_transform_similarity(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    rotation = create_random_rotations(1, seed=context.seed)[0].to(context.device)
+    offset = torch.tensor([[0.1], [-0.2], [0.3]], device=context.device)
+    transform = torch.cat([2.0 * rotation, offset], dim=-1)
+
+    def run():
+        return gaussians_utils.apply_transform(gaussians, transform)
+
+    return run
+
+
+@register_benchmark("gaussians.compose_covariance_matrices")
+def _setup_compose_covariance_matrices(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+
+    def run():
+        return gaussians_utils.compose_covariance_matrices(
+            gaussians.quaternions, gaussians.singular_values
+        )
+
+    return run
+
+
+def _decompose_covariance_matrices_accuracy(size: int, context: BenchmarkContext):
+    """Compare the eigen decomposition against the float64 SVD reference."""
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    covariance_matrices = gaussians_utils.compose_covariance_matrices(
+        gaussians.quaternions, gaussians.singular_values
+    )
+    quaternions, singular_values = gaussians_utils.decompose_covariance_matrices(
+        covariance_matrices, method="eigh"
+    )
+    _, singular_values_ref = gaussians_utils.decompose_covariance_matrices(
+        covariance_matrices, method="svd"
+    )
+    reconstructed = gaussians_utils.compose_covariance_matrices(quaternions, singular_values)
+    reconstruction_error = torch.linalg.matrix_norm(
+        reconstructed - covariance_matrices
+    ) / torch.linalg.matrix_norm(covariance_matrices)
+    singular_values_error = (singular_values - singular_values_ref).abs() / singular_values_ref
+    return {
+        "max_reconstruction_rel_error": reconstruction_error.max().item(),
+        "max_singular_values_rel_error": singular_values_error.max().item(),
+    }
+
+
+@register_benchmark(
+    "gaussians.decompose_covariance_matrices",
+    metrics=_decompose_covariance_matrices_accuracy,
+)
+def _setup_decompose_covariance_matrices(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    covariance_matrices = gaussians_utils.compose_covariance_matrices(
+        gaussians.quaternions, gaussians.singular_values
+    )
+
+    def run():
+        return gaussians_utils.decompose_covariance_matrices(covariance_matrices)
+
+    return run
+
+
+@register_benchmark("gaussians.decompose_covariance_matrices.svd")
+def _setup_decompose_covariance_matrices_svd(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    covariance_matrices = gaussians_utils.compose_covariance_matrices(
+        gaussians.quaternions, gaussians.singular_values
+    )
+
+    def run():
+        return gaussians_utils.decompose_covariance_matrices(covariance_matrices, method="svd")
+
+    return run
+
+
+@register_benchmark("linalg.eigh_symmetric_3x3")
+def _setup_eigh_symmetric_3x3(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+    covariance_matrices = gaussians_utils.compose_covariance_matrices(
+        gaussians.quaternions, gaussians.singular_values
+    ).to(torch.float64)
+
+    def run():
+        return linalg.eigh_symmetric_3x3(covariance_matrices)
+
+    return run
+
+
+def _quaternion_conversion_parity(size: int, context: BenchmarkContext):
+    """Compare the rotation conversions against scipy."""
+    from scipy.spatial.transform import Rotation
+
+    # Use the orthonormalized float64 rotations of scipy as reference.
+    rotations_scipy = Rotation.from_matrix(create_random_rotations(size, seed=context.seed).numpy())
+    quaternions_ref = torch.from_numpy(rotations_scipy.as_quat()[:, [3, 0, 1, 2]])
+    rotations_ref = torch.from_numpy(rotations_scipy.as_matrix())
+
+    metrics = {}
+    for dtype in (torch.float16, torch.float32, torch.float64):
+        name = str(dtype).removeprefix("torch.")
+        quaternions = linalg.quaternions_from_rotation_matrices(
+            rotations_ref.to(context.device, dtype)
+        ).to("cpu", torch.float64)
+        # Quaternions q and -q describe the same rotation.
+        sign = torch.sign((quaternions * quaternions_ref).sum(dim=-1, keepdim=True))
+        metrics[f"max_quaternion_error_{name}"] = (
+            (quaternions - sign * quaternions_ref).abs().max().item()
+        )
+        matrices = linalg.rotation_matrices_from_quaternions(
+            quaternions_ref.to(context.device, dtype)
+        ).to("cpu", torch.float64)
+        metrics[f"max_matrix_error_{name}"] = (matrices - rotations_ref).abs().max().item()
+    return metrics
+
+
+@register_benchmark(
+    "linalg.quaternions_from_rotation_matrices", metrics=_quaternion_conversion_parity
+)
+def _setup_quaternions_from_rotation_matrices(size: int, context: BenchmarkContext):
+    rotations = create_random_rotations(size, seed=context.seed).to(context.device)
+
+    def run():
+        return linalg.quaternions_from_rotation_matrices(rotations)
+
+    return run
+
+
+@register_benchmark("linalg.quaternions_from_rotation_matrices.scipy")
+def _setup_quaternions_from_rotation_matrices_scipy(size: int, context: BenchmarkContext):
+    from scipy.spatial.transform import Rotation
+
+    rotations = create_random_rotations(size, seed=context.seed).to(context.device)
+
+    def run():
+        # Reference implementation used before the pure torch conversion.
+        quaternions = Rotation.from_matrix(rotations.cpu().numpy()).as_quat()[:, [3, 0, 1, 2]]
+        return torch.as_tensor(quaternions, device=context.device, dtype=rotations.dtype)
+
+    return run
+
+
+@register_benchmark("linalg.rotation_matrices_from_quaternions")
+def _setup_rotation_matrices_from_quaternions(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed, device=context.device)
+
+    def run():
+        return linalg.rotation_matrices_from_quaternions(gaussians.quaternions)
+
+    return run
+
+
+def _create_spatial_queries(
+    size: int, context: BenchmarkContext
+) -> tuple[SpatialIndex, torch.Tensor]:
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    index = SpatialIndex.from_gaussians(gaussians)
+    generator = torch.Generator().manual_seed(context.seed)
+    query_ids = torch.randint(size, (NUM_SPATIAL_QUERIES,), generator=generator)
+    return index, gaussians.mean_vectors[0, query_ids].numpy()
+
+
+@register_benchmark("spatial_index.build")
+def _setup_spatial_index_build(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+
+    def run():
+        return SpatialIndex.from_gaussians(gaussians)
+
+    return run
+
+
+@register_benchmark("spatial_index.query_radius")
+def _setup_spatial_index_query_radius(size: int, context: BenchmarkContext):
+    index, centers = _create_spatial_queries(size, context)
+
+    def run():
+        return index.query_radius(centers, radius=0.05)
+
+    return run
+
+
+@register_benchmark("spatial_index.query_knn")
+def _setup_spatial_index_query_knn(size: int, context: BenchmarkContext):
+    index, centers = _create_spatial_queries(size, context)
+
+    def run():
+        return index.query_knn(centers, k=16)
+
+    return run
+
+
+@register_benchmark("spatial_index.query_box")
+def _setup_spatial_index_query_box(size: int, context: BenchmarkContext):
+    index, centers = _create_spatial_queries(size, context)
+
+    def run():
+        return index.query_box(centers - 0.05, centers + 0.05)
+
+    return run
+
+
+@register_benchmark("labels.map_mask_to_gaussians")
+def _setup_map_mask_to_gaussians(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    mean_vectors = gaussians.mean_vectors[0].numpy()
+    mask = create_synthetic_mask(DEFAULT_IMAGE_SIZE, seed=context.seed)
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+
+    def run():
+        return labels.map_mask_to_gaussians(
+            mask,
+            mean_vectors,
+            focal_length_px=(DEFAULT_FOCAL_LENGTH_PX, DEFAULT_FOCAL_LENGTH_PX),
+            principal_point_px=(image_width / 2, image_height / 2),
+            image_size=DEFAULT_IMAGE_SIZE,
+        )
+
+    return run
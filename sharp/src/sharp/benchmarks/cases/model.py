@@ -0,0 +1,393 @@
+"""Contains benchmark cases for the SPN encoder, ViT blocks and Gaussian composer.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+
+import torch
+
+from sharp.models import create_predictor_params, quantization
+from sharp.models.composer import GaussianComposer
+from sharp.models.encoders import TimmViT, create_monodepth_encoder
+from sharp.models.encoders.spn_encoder import merge, split
+from sharp.models.initializer import GaussianBaseValues, create_initializer
+from sharp.models.presets import VIT_CONFIG_DICT, AttentionBackend
+from sharp.models.quantization import QuantizationMode
+from sharp.utils import math as math_utils
+
+from ..harness import BenchmarkContext, BenchmarkSkipped, register_benchmark
+from ..scenes import INTERNAL_RESOLUTION
+
+# Patch size and embedding dimension of the SPN patch encoder.
+SPN_PATCH_SIZE = 384
+SPN_EMBED_DIM = 1024
+# Patch micro-batch size of the micro-batched SPN benchmark.
+SPN_PATCH_BATCH_SIZE = 8
+# Number of DINOv2-L blocks of the attention backend benchmarks.
+NUM_ATTENTION_BENCHMARK_BLOCKS = 2
+
+
+def _split_reference(image: torch.Tensor, overlap_ratio: float, patch_size: int) -> torch.Tensor:
+    """Split an image into patches by slicing in a loop."""
+    patch_stride = int(patch_size * (1 - overlap_ratio))
+    steps = (image.shape[-1] - patch_size) // patch_stride + 1
+    return torch.cat(
+        [
+            image[..., j : j + patch_size, i : i + patch_size]
+            for j in range(0, steps * patch_stride, patch_stride)
+            for i in range(0, steps * patch_stride, patch_stride)
+        ],
+        dim=0,
+    )
+
+
+def _merge_reference(image_patches: torch.Tensor, batch_size: int, padding: int) -> torch.Tensor:
+    """Merge patches by cropping and concatenating them row by row."""
+    steps = int(math.sqrt(image_patches.shape[0] // batch_size))
+    rows = []
+    for j in range(steps):
+        row = []
+        for i in range(steps):
+            patch = image_patches[batch_size * (j * steps + i) : batch_size * (j * steps + i + 1)]
+            height, width = patch.shape[-2:]
+            row.append(
+                patch[
+                    ...,
+                    (padding if j > 0 else 0) : height - (padding if j < steps - 1 else 0),
+                    (padding if i > 0 else 0) : width - (padding if i < steps - 1 else 0),
+                ]
+            )
+        rows.append(torch.cat(row, dim=-1))
+    return torch.cat(rows, dim=-2)
+
+
+def _create_spn_split_input(size: int, context: BenchmarkContext) -> torch.Tensor:
+    return torch.rand(size, 3, INTERNAL_RESOLUTION, INTERNAL_RESOLUTION, device=context.device)
+
+
+def _create_spn_merge_input(size: int, context: BenchmarkContext) -> torch.Tensor:
+    # The pyramid patch encodings of the SPN with 24x24 tokens each as passed to merge
+    # by SlidingPyramidNetwork.forward: the 5x5 highres patches of all images followed by
+    # the 3x3 and 1x1 lower resolution patches, which merge has to ignore.
+    num_patches = (5 * 5 + 3 * 3 + 1) * size
+    grid_size = SPN_PATCH_SIZE // 16
+    return torch.rand(num_patches, SPN_EMBED_DIM, grid_size, grid_size, device=context.device)
+
+
+def _spn_split_merge_parity(size: int, context: BenchmarkContext):
+    """Compare split and merge against the loop-based references."""
+    image = _create_spn_split_input(size, context)
+    metrics = {}
+    for overlap_ratio in (0.0, 0.25):
+        patches = split(image, overlap_ratio=overlap_ratio, patch_size=SPN_PATCH_SIZE)
+        patches_ref = _split_reference(image, overlap_ratio, SPN_PATCH_SIZE)
+        metrics[f"split_exact_{overlap_ratio}"] = bool(torch.equal(patches, patches_ref))
+
+    image_patches = _create_spn_merge_input(size, context)
+    for padding in (0, 3):
+        merged = merge(image_patches, batch_size=size, padding=padding)
+        merged_ref = _merge_reference(image_patches, size, padding)
+        metrics[f"merge_exact_{padding}"] = bool(torch.equal(merged, merged_ref))
+
+    if size > 1:
+        # Run the SPN forward on two images, which splits and merges patches of a batch,
+        # and compare it against encoding each image on its own.
+        encoder = _create_tiny_spn(None, context)
+        with torch.no_grad():
+            outputs = encoder(image[:2])
+            outputs_ref = [encoder(image[index : index + 1]) for index in range(2)]
+        metrics["forward_batch_exact"] = all(
+            bool(torch.equal(output[index : index + 1], output_ref[level]))
+            for index, output_ref in enumerate(outputs_ref)
+            for level, output in enumerate(outputs)
+        )
+    return metrics
+
+
+@register_benchmark("spn.split", unit="batch", sizes=(1, 2, 4, 8), metrics=_spn_split_merge_parity)
+def _setup_spn_split(size: int, context: BenchmarkContext):
+    image = _create_spn_split_input(size, context)
+
+    def run():
+        return split(image, overlap_ratio=0.25, patch_size=SPN_PATCH_SIZE)
+
+    return run
+
+
+@register_benchmark("spn.split.reference", unit="batch", sizes=(1, 2, 4, 8))
+def _setup_spn_split_reference(size: int, context: BenchmarkContext):
+    image = _create_spn_split_input(size, context)
+
+    def run():
+        return _split_reference(image, overlap_ratio=0.25, patch_size=SPN_PATCH_SIZE)
+
+    return run
+
+
+@register_benchmark("spn.merge", unit="batch", sizes=(1, 2, 4, 8))
+def _setup_spn_merge(size: int, context: BenchmarkContext):
+    image_patches = _create_spn_merge_input(size, context)
+
+    def run():
+        return merge(image_patches, batch_size=size, padding=3)
+
+    return run
+
+
+@register_benchmark("spn.merge.reference", unit="batch", sizes=(1, 2, 4, 8))
+def _setup_spn_merge_reference(size: int, context: BenchmarkContext):
+    image_patches = _create_spn_merge_input(size, context)
+
+    def run():
+        return _merge_reference(image_patches, batch_size=size, padding=3)
+
+    return run
+
+
+def _create_tiny_spn(patch_batch_size: int | None, context: BenchmarkContext):
+    torch.manual_seed(context.seed)
+    encoder = create_monodepth_encoder(
+        "tiny16_384", "tiny16_384", last_encoder=32, patch_batch_size=patch_batch_size
+    )
+    return encoder.eval().to(context.device)
+
+
+def _spn_patch_batch_parity(size: int, context: BenchmarkContext):
+    """Compare the micro-batched SPN against encoding all patches at once."""
+    images = _create_spn_split_input(size, context)
+    encoder = _create_tiny_spn(None, context)
+    with torch.no_grad():
+        outputs_ref = encoder(images)
+        encoder.patch_batch_size = SPN_PATCH_BATCH_SIZE
+        outputs = encoder(images)
+    return {
+        "max_abs_diff": max(
+            (output - output_ref).abs().max().item()
+            for output, output_ref in zip(outputs, outputs_ref)
+        )
+    }
+
+
+def _setup_spn_forward(size: int, context: BenchmarkContext, patch_batch_size: int | None):
+    images = _create_spn_split_input(size, context)
+    encoder = _create_tiny_spn(patch_batch_size, context)
+
+    @torch.no_grad()
+    def run():
+        return encoder(images)
+
+    return run
+
+
+@register_benchmark("spn.forward", unit="images", sizes=(1, 2))
+def _setup_spn_forward_full(size: int, context: BenchmarkContext):
+    return _setup_spn_forward(size, context, patch_batch_size=None)
+
+
+@register_benchmark(
+    "spn.forward.patch_batch", unit="images", sizes=(1, 2), metrics=_spn_patch_batch_parity
+)
+def _setup_spn_forward_patch_batch(size: int, context: BenchmarkContext):
+    return _setup_spn_forward(size, context, patch_batch_size=SPN_PATCH_BATCH_SIZE)
+
+
+def _create_dinov2_blocks(attention_backend: AttentionBackend, context: BenchmarkContext):
+    """Create the first blocks of DINOv2-L, which encode 577 tokens per 384x384 patch."""
+    torch.manual_seed(context.seed)
+    config = dataclasses.replace(
+        VIT_CONFIG_DICT["dinov2l16_384"],
+        depth=NUM_ATTENTION_BENCHMARK_BLOCKS,
+        attention_backend=attention_backend,
+    )
+    return TimmViT(config).eval().to(context.device)
+
+
+def _attention_backend_parity(size: int, context: BenchmarkContext):
+    """Compare all available attention backends against the eager implementation."""
+    patches = torch.rand(size, 3, SPN_PATCH_SIZE, SPN_PATCH_SIZE, device=context.device)
+    model = _create_dinov2_blocks("eager", context)
+    metrics = {}
+    with torch.no_grad():
+        output_ref, _ = model(patches)
+        for attention_backend in ("auto", "flash", "efficient", "math"):
+            model.set_attention_backend(attention_backend)
+            try:
+                output, _ = model(patches)
+            except RuntimeError:
+                continue
+            max_abs_diff = (output - output_ref).abs().max().item()
+            metrics[f"max_abs_diff_{attention_backend}"] = max_abs_diff
+    return metrics
+
+
+def _setup_attention_backend(
+    size: int, context: BenchmarkContext, attention_backend: AttentionBackend
+):
+    patches = torch.rand(size, 3, SPN_PATCH_SIZE, SPN_PATCH_SIZE, device=context.device)
+    model = _create_dinov2_blocks(attention_backend, context)
+
+    @torch.no_grad()
+    def run():
+        return model(patches)
+
+    try:
+        run()
+    except RuntimeError as error:
+        raise BenchmarkSkipped(f"{attention_backend} attention is not available: {error}")
+    return run
+
+
+@register_benchmark(
+    "vit.attention.eager", unit="patches", sizes=(1, 8), metrics=_attention_backend_parity
+)
+def _setup_attention_eager(size: int, context: BenchmarkContext):
+    return _setup_attention_backend(size, context, "eager")
+
+
+@register_benchmark("vit.attention.auto", unit="patches", sizes=(1, 8))
+def _setup_attention_auto(size: int, context: BenchmarkContext):
+    return _setup_attention_backend(size, context, "auto")
+
+
+@register_benchmark("vit.attention.flash", unit="patches", sizes=(1, 8))
+def _setup_attention_flash(size: int, context: BenchmarkContext):
+    return _setup_attention_backend(size, context, "flash")
+
+
+@register_benchmark("vit.attention.efficient", unit="patches", sizes=(1, 8))
+def _setup_attention_efficient(size: int, context: BenchmarkContext):
+    return _setup_attention_backend(size, context, "efficient")
+
+
+@register_benchmark("vit.attention.math", unit="patches", sizes=(1, 8))
+def _setup_attention_math(size: int, context: BenchmarkContext):
+    return _setup_attention_backend(size, context, "math")
+
+
+def _quantization_error(size: int, context: BenchmarkContext):
+    """Compare the outputs of int8 quantized blocks against float32 blocks."""
+    patches = torch.rand(size, 3, SPN_PATCH_SIZE, SPN_PATCH_SIZE)
+    model = _create_dinov2_blocks("auto", context).cpu()
+    with torch.no_grad():
+        output_ref, _ = model(patches)
+        quantization.quantize_predictor(model, "dynamic_int8")
+        output, _ = model(patches)
+    error = (output - output_ref).norm(dim=-1) / output_ref.norm(dim=-1).clamp_min(1e-6)
+    return {
+        "median_relative_error": error.median().item(),
+        "max_relative_error": error.max().item(),
+    }
+
+
+def _setup_quantization(size: int, context: BenchmarkContext, mode: QuantizationMode):
+    if mode != "none" and context.device.type != "cpu":
+        raise BenchmarkSkipped("Quantized inference is only supported on CPU.")
+    patches = torch.rand(size, 3, SPN_PATCH_SIZE, SPN_PATCH_SIZE, device=context.device)
+    model = quantization.quantize_predictor(_create_dinov2_blocks("auto", context), mode)
+
+    @torch.no_grad()
+    def run():
+        return model(patches)
+
+    return run
+
+
+@register_benchmark("vit.quantize.none", unit="patches", sizes=(1, 8))
+def _setup_quantization_none(size: int, context: BenchmarkContext):
+    return _setup_quantization(size, context, "none")
+
+
+@register_benchmark(
+    "vit.quantize.dynamic_int8", unit="patches", sizes=(1, 8), metrics=_quantization_error
+)
+def _setup_quantization_dynamic_int8(size: int, context: BenchmarkContext):
+    return _setup_quantization(size, context, "dynamic_int8")
+
+
+def _create_composer_inputs(size: int, context: BenchmarkContext):
+    """Create the initializer, composer and inputs of the predictor at internal resolution."""
+    params = create_predictor_params("sharp")
+    initializer = create_initializer(params.initializer)
+    composer = GaussianComposer(
+        delta_factor=params.delta_factor,
+        min_scale=params.min_scale,
+        max_scale=params.max_scale,
+        color_activation_type=params.color_activation_type,
+        opacity_activation_type=params.opacity_activation_type,
+        color_space=params.color_space,
+        base_scale_on_predicted_mean=params.base_scale_on_predicted_mean,
+    )
+    generator = torch.Generator().manual_seed(context.seed)
+    shape = (size, INTERNAL_RESOLUTION, INTERNAL_RESOLUTION)
+    image = torch.rand(size, 3, *shape[1:], generator=generator).to(context.device)
+    depth = (1.0 + 9.0 * torch.rand(size, 2, *shape[1:], generator=generator)).to(context.device)
+    base_height = INTERNAL_RESOLUTION // params.initializer.stride
+    delta = torch.randn(
+        size, 14, params.initializer.num_layers, base_height, base_height, generator=generator
+    ).to(context.device)
+    return initializer, composer, image, depth, delta
+
+
+def _forward_mean_reference(
+    base_values: GaussianBaseValues, delta: torch.Tensor, composer: GaussianComposer
+) -> torch.Tensor:
+    """Compose the means from materialized base grids, masks and a concatenation."""
+    shape = (delta.shape[0], 1, *delta.shape[2:])
+    base = torch.cat(
+        [
+            base_values.mean_x_ndc.expand(shape).contiguous(),
+            base_values.mean_y_ndc.expand(shape).contiguous(),
+            base_values.mean_inverse_z_ndc.expand(shape).contiguous(),
+        ],
+        dim=1,
+    )
+    delta_factor = torch.tensor(
+        [composer.delta_factor.xy, composer.delta_factor.xy, composer.delta_factor.z],
+        device=delta.device,
+    )[None, :, None, None, None]
+    learned_delta = delta_factor * delta[:, :3]
+    xx = base[:, 0:1] + learned_delta[:, 0:1]
+    yy = base[:, 1:2] + learned_delta[:, 1:2]
+    inverse_zz = torch.nn.functional.softplus(
+        math_utils.inverse_softplus(base[:, 2:3]) + learned_delta[:, 2:3]
+    )
+    zz = 1.0 / (inverse_zz + 1e-3)
+    return torch.cat([zz * xx, zz * yy, zz], dim=1)
+
+
+def _composer_parity(size: int, context: BenchmarkContext):
+    """Compare the composed Gaussians against materialized base values."""
+    initializer, composer, image, depth, delta = _create_composer_inputs(size, context)
+    with torch.no_grad():
+        output = initializer(image, depth)
+        base_values = output.gaussian_base_values
+        gaussians = composer(delta, base_values, output.global_scale)
+        base_values_ref = GaussianBaseValues(*(value.contiguous().clone() for value in base_values))
+        gaussians_ref = composer(delta, base_values_ref, output.global_scale)
+        mean_vectors_ref = _forward_mean_reference(base_values, delta, composer)
+        mean_vectors_ref = mean_vectors_ref.permute(0, 2, 3, 4, 1).flatten(1, 3)
+        mean_vectors_ref = output.global_scale[:, None, None] * mean_vectors_ref
+    return {
+        "mean_vectors_exact": bool(torch.equal(gaussians.mean_vectors, mean_vectors_ref)),
+        "outputs_exact": all(
+            bool(torch.equal(value, value_ref))
+            for value, value_ref in zip(gaussians, gaussians_ref)
+        ),
+    }
+
+
+@register_benchmark("composer.forward", unit="batch", sizes=(1, 4), metrics=_composer_parity)
+def _setup_composer_forward(size: int, context: BenchmarkContext):
+    initializer, composer, image, depth, delta = _create_composer_inputs(size, context)
+
+    @torch.no_grad()
+    def run():
+        output = initializer(image, depth)
+        return composer(delta, output.gaussian_base_values, output.global_scale)
+
+    return run
@@ -0,0 +1,218 @@
+"""Contains benchmark cases for rendering, camera trajectories and visualization.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import math
+
+import torch
+
+from sharp.utils import camera, gsplat, ordering, rasterizer, vis
+from sharp.utils import gaussians as gaussians_utils
+
+from ..harness import BenchmarkContext, register_benchmark
+from ..scenes import (
+    DEFAULT_FOCAL_LENGTH_PX,
+    DEFAULT_IMAGE_SIZE,
+    LAYERED_SCENE_SIZES,
+    create_synthetic_gaussians,
+    create_synthetic_layered_scene,
+)
+
+# Resolution of the CPU rasterizer benchmark, scaled down from the default image size.
+RENDER_IMAGE_SIZE = (1008, 756)
+# Number of Gaussians of the multi-view rendering benchmark.
+NUM_RENDER_VIEWS_GAUSSIANS = 100_000
+
+
+def _create_render_scene(
+    size: int, context: BenchmarkContext
+) -> tuple[gaussians_utils.Gaussians3D, torch.Tensor]:
+    """Create a scene and the 4x4 intrinsics of the render benchmark resolution."""
+    image_width, image_height = RENDER_IMAGE_SIZE
+    focal_length_px = DEFAULT_FOCAL_LENGTH_PX * image_width / DEFAULT_IMAGE_SIZE[0]
+    gaussians = create_synthetic_gaussians(
+        size,
+        seed=context.seed,
+        device=context.device,
+        image_size=RENDER_IMAGE_SIZE,
+        focal_length_px=focal_length_px,
+    )
+    intrinsics = torch.tensor(
+        [
+            [focal_length_px, 0, image_width / 2, 0],
+            [0, focal_length_px, image_height / 2, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ],
+        device=context.device,
+    )
+    return gaussians, intrinsics
+
+
+@register_benchmark("render.rasterize_cpu", sizes=(100_000, 1_000_000))
+def _setup_rasterize_cpu(size: int, context: BenchmarkContext):
+    gaussians, intrinsics = _create_render_scene(size, context)
+    gaussians = gaussians.to(torch.device("cpu"))
+    image_width, image_height = RENDER_IMAGE_SIZE
+
+    def run():
+        return rasterizer.rasterize(
+            means=gaussians.mean_vectors[0],
+            quats=gaussians.quaternions[0],
+            scales=gaussians.singular_values[0],
+            opacities=gaussians.opacities[0],
+            colors=gaussians.colors[0],
+            viewmats=torch.eye(4)[None],
+            Ks=intrinsics[None, :3, :3].cpu(),
+            width=image_width,
+            height=image_height,
+        )
+
+    return run
+
+
+@register_benchmark("render.render_views", unit="views", sizes=(1, 8))
+def _setup_render_views(size: int, context: BenchmarkContext):
+    gaussians, intrinsics = _create_render_scene(NUM_RENDER_VIEWS_GAUSSIANS, context)
+    image_width, image_height = RENDER_IMAGE_SIZE
+    eye_positions = torch.zeros(size, 3)
+    eye_positions[:, 0] = torch.linspace(-0.1, 0.1, size)
+    extrinsics = camera.create_camera_matrix(
+        eye_positions,
+        look_at_position=torch.tensor([0.0, 0.0, 5.0]),
+        world_up=torch.tensor([0.0, -1.0, 0.0]),
+        inverse=True,
+    ).to(context.device)
+    renderer = gsplat.GSplatRenderer(color_space="linearRGB")
+
+    def run():
+        return renderer.render_views(
+            gaussians,
+            extrinsics=extrinsics,
+            intrinsics=intrinsics.expand(size, 4, 4),
+            image_width=image_width,
+            image_height=image_height,
+        )
+
+    return run
+
+
+def _setup_rasterize_layered(size: int, context: BenchmarkContext, order: ordering.GaussianOrder):
+    gaussians = create_synthetic_layered_scene(size, seed=context.seed)
+    gaussians, _ = ordering.sort_gaussians(gaussians, order)
+    image_width, image_height = RENDER_IMAGE_SIZE
+    # The layered scene spans the field of view of a camera with focal length = width.
+    intrinsics = torch.tensor(
+        [
+            [float(image_width), 0.0, image_width / 2],
+            [0.0, float(image_width), image_height / 2],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+    def run():
+        return rasterizer.rasterize(
+            means=gaussians.mean_vectors[0],
+            quats=gaussians.quaternions[0],
+            scales=gaussians.singular_values[0],
+            opacities=gaussians.opacities[0],
+            colors=gaussians.colors[0],
+            viewmats=torch.eye(4)[None],
+            Ks=intrinsics[None],
+            width=image_width,
+            height=image_height,
+        )
+
+    return run
+
+
+@register_benchmark("render.rasterize_cpu.layered", sizes=LAYERED_SCENE_SIZES)
+def _setup_rasterize_layered_none(size: int, context: BenchmarkContext):
+    return _setup_rasterize_layered(size, context, "none")
+
+
+@register_benchmark("render.rasterize_cpu.layered_morton", sizes=LAYERED_SCENE_SIZES)
+def _setup_rasterize_layered_morton(size: int, context: BenchmarkContext):
+    return _setup_rasterize_layered(size, context, "morton")
+
+
+def _scene_statistics_error(size: int, context: BenchmarkContext):
+    """Compare the approximate scene statistics against exact depth quantiles."""
+    import numpy as np
+
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    statistics = gaussians_utils.compute_scene_statistics(gaussians)
+    depth_values = gaussians.mean_vectors[..., 2].flatten().numpy()
+    depth_values = depth_values[depth_values > 0]
+    statistics_ref = np.quantile(depth_values, gaussians_utils.SCENE_DEPTH_QUANTILES)
+    return {
+        f"rel_error_{name}": abs(value / value_ref - 1.0)
+        for name, value, value_ref in zip(statistics._fields, statistics, statistics_ref)
+    }
+
+
+@register_benchmark("camera.create_trajectory", metrics=_scene_statistics_error)
+def _setup_create_trajectory(size: int, context: BenchmarkContext):
+    gaussians = create_synthetic_gaussians(size, seed=context.seed)
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+    intrinsics = torch.tensor(
+        [
+            [DEFAULT_FOCAL_LENGTH_PX, 0, image_width / 2, 0],
+            [0, DEFAULT_FOCAL_LENGTH_PX, image_height / 2, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ]
+    )
+    params = camera.TrajectoryParams()
+
+    def run():
+        statistics = gaussians_utils.compute_scene_statistics(gaussians)
+        camera_model = camera.create_camera_model(
+            gaussians, intrinsics, DEFAULT_IMAGE_SIZE, statistics=statistics
+        )
+        trajectory = camera.create_eye_trajectory(
+            gaussians, params, DEFAULT_IMAGE_SIZE, DEFAULT_FOCAL_LENGTH_PX, statistics=statistics
+        )
+        return camera_model.compute(trajectory)
+
+    return run
+
+
+def _colorize_scalar_map_parity(size: int, context: BenchmarkContext):
+    """Compare the color lookup tables against matplotlib."""
+    import matplotlib
+
+    side = int(math.sqrt(size))
+    generator = torch.Generator().manual_seed(context.seed)
+    # Include values outside of the display range and a NaN value.
+    scalar_map = 1.2 * torch.rand(1, side, side, generator=generator) - 0.1
+    scalar_map[0, 0, 0] = torch.nan
+
+    metrics = {}
+    for color_map in ("turbo", "coolwarm", "jet"):
+        colors = vis.colorize_scalar_map(scalar_map.to(context.device), color_map=color_map)
+        colors_ref = matplotlib.colormaps[color_map](scalar_map.clamp(0.0, 1.0).numpy())
+        colors_ref = torch.as_tensor(colors_ref[..., :3] * 255.0, dtype=torch.uint8)
+        mismatches = (colors.permute(0, 2, 3, 1).cpu() != colors_ref).any(dim=-1)
+        metrics[f"num_mismatched_pixels_{color_map}"] = int(mismatches.sum())
+    return metrics
+
+
+@register_benchmark(
+    "vis.colorize_depth",
+    unit="pixels",
+    sizes=(512 * 512, 1536 * 1536),
+    metrics=_colorize_scalar_map_parity,
+)
+def _setup_colorize_depth(size: int, context: BenchmarkContext):
+    side = int(math.sqrt(size))
+    depth = 20.0 * torch.rand(1, 1, side, side, device=context.device)
+
+    def run():
+        return vis.colorize_depth(depth, val_max=vis.METRIC_DEPTH_MAX_CLAMP_METER)
+
+    return run
@@ -0,0 +1,376 @@
+"""Contains a minimal harness to time benchmark cases and compare results.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import dataclasses
+import datetime
+import fnmatch
+import gc
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, NamedTuple
+
+import numpy as np
+import torch
+
+LOGGER = logging.getLogger(__name__)
+
+RESULTS_SCHEMA_VERSION = 1
+
+# Default number of Gaussians of the synthetic scenes. A SHARP prediction at the
+# default resolution contains roughly 1.2M Gaussians.
+DEFAULT_SCENE_SIZES = (10_000, 100_000, 1_000_000, 5_000_000)
+
+
+@dataclasses.dataclass
+class BenchmarkContext:
+    """Shared state handed to the setup function of every benchmark case."""
+
+    device: torch.device
+    # Scratch directory which is deleted after all benchmarks have finished.
+    workdir: Path
+    seed: int = 0
+
+
+# A setup function receives the problem size and the context and returns the
+# function to time. All preparation work should happen in the setup function.
+BenchmarkSetup = Callable[[int, BenchmarkContext], Callable[[], Any]]
+BenchmarkMetrics = Callable[[int, BenchmarkContext], dict[str, float]]
+
+
+@dataclasses.dataclass
+class BenchmarkCase:
+    """A registered benchmark case."""
+
+    name: str
+    setup: BenchmarkSetup
+    # What the problem size counts, e.g. "gaussians" or "pixels".
+    unit: str = "gaussians"
+    # Fixed problem sizes. If None, the scene sizes of the run are used.
+    sizes: tuple[int, ...] | None = None
+    # Optional function to compute accuracy metrics that are stored alongside timings.
+    metrics: BenchmarkMetrics | None = None
+
+
+class BenchmarkResult(NamedTuple):
+    """Timings of a single benchmark case for a single problem size."""
+
+    name: str
+    size: int
+    unit: str
+    times_s: list[float]
+    metrics: dict[str, float]
+
+    @property
+    def median_s(self) -> float:
+        """Median run time in seconds."""
+        return statistics.median(self.times_s)
+
+    @property
+    def min_s(self) -> float:
+        """Minimum run time in seconds."""
+        return min(self.times_s)
+
+    def asdict(self) -> dict[str, Any]:
+        """Convert result into a JSON serializable dictionary."""
+        return {
+            "name": self.name,
+            "size": self.size,
+            "unit": self.unit,
+            "times_s": self.times_s,
+            "median_s": self.median_s,
+            "min_s": self.min_s,
+            "throughput": self.size / self.median_s if self.median_s > 0 else None,
+            "metrics": self.metrics,
+        }
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a setup function if a case is not supported, e.g. on the device."""
+
+
+BENCHMARK_REGISTRY: dict[str, BenchmarkCase] = {}
+
+
+def register_benchmark(
+    name: str,
+    unit: str = "gaussians",
+    sizes: tuple[int, ...] | None = None,
+    metrics: BenchmarkMetrics | None = None,
+) -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """Register a benchmark setup function under the given name."""
+
+    def decorator(setup: BenchmarkSetup) -> BenchmarkSetup:
+        if name in BENCHMARK_REGISTRY:
+            raise ValueError(f"Benchmark {name} is already registered.")
+        BENCHMARK_REGISTRY[name] = BenchmarkCase(
+            name=name, setup=setup, unit=unit, sizes=sizes, metrics=metrics
+        )
+        return setup
+
+    return decorator
+
+
+def select_benchmarks(patterns: Iterable[str] | None = None) -> list[BenchmarkCase]:
+    """Return all registered benchmarks matching any of the glob patterns."""
+    patterns = list(patterns) if patterns else ["*"]
+    return [
+        case
+        for name, case in BENCHMARK_REGISTRY.items()
+        if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+    ]
+
+
+def _synchronize(device: torch.device) -> None:
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    elif device.type == "mps":
+        torch.mps.synchronize()
+
+
+def _read_process_memory_bytes(field: str) -> int | None:
+    """Read a memory field such as VmRSS or VmHWM of the current process (Linux only)."""
+    try:
+        with open("/proc/self/status") as status_file:
+            for line in status_file:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _release_free_memory() -> None:
+    """Return freed heap memory to the OS so it does not hide the next peak (glibc only)."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def reset_peak_memory(device: torch.device) -> int | None:
+    """Reset the peak memory statistics and return the current memory usage.
+
+    On CPU, this resets the peak resident set size of the process, which is only
+    supported on Linux. Returns None if peak memory cannot be measured.
+    """
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        return torch.cuda.memory_allocated(device)
+    elif device.type == "cpu":
+        _release_free_memory()
+        try:
+            with open("/proc/self/clear_refs", "w") as clear_refs_file:
+                clear_refs_file.write("5")
+        except OSError:
+            return None
+        return _read_process_memory_bytes("VmRSS")
+    return None
+
+
+def get_peak_memory_increase(device: torch.device, baseline_bytes: int | None) -> int | None:
+    """Return the peak memory above the baseline since the last reset_peak_memory()."""
+    if baseline_bytes is None:
+        return None
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+        peak_bytes = torch.cuda.max_memory_allocated(device)
+    else:
+        peak_bytes = _read_process_memory_bytes("VmHWM")
+    if peak_bytes is None:
+        return None
+    return max(peak_bytes - baseline_bytes, 0)
+
+
+def time_function(
+    fn: Callable[[], Any],
+    device: torch.device,
+    warmup: int = 1,
+    repeats: int = 5,
+    max_time_s: float = 10.0,
+) -> list[float]:
+    """Time a function.
+
+    At least one timed run is executed. Further runs are skipped once the total
+    measured time exceeds max_time_s.
+    """
+    for _ in range(warmup):
+        fn()
+    _synchronize(device)
+
+    times_s: list[float] = []
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter()
+        fn()
+        _synchronize(device)
+        times_s.append(time.perf_counter() - start)
+        if sum(times_s) > max_time_s:
+            break
+    return times_s
+
+
+def run_benchmarks(
+    cases: list[BenchmarkCase],
+    scene_sizes: tuple[int, ...] = DEFAULT_SCENE_SIZES,
+    device: torch.device | str = "cpu",
+    warmup: int = 1,
+    repeats: int = 5,
+    max_time_s: float = 10.0,
+    seed: int = 0,
+) -> list[BenchmarkResult]:
+    """Run benchmark cases and return their results."""
+    results: list[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory(prefix="sharp_benchmark_") as workdir:
+        context = BenchmarkContext(device=torch.device(device), workdir=Path(workdir), seed=seed)
+        for case in cases:
+            sizes = case.sizes if case.sizes is not None else scene_sizes
+            for size in sizes:
+                LOGGER.info("Running %s (%s=%d).", case.name, case.unit, size)
+                torch.manual_seed(seed)
+                try:
+                    fn = case.setup(size, context)
+                except BenchmarkSkipped as error:
+                    LOGGER.info("\tskipped: %s", error)
+                    continue
+                baseline_bytes = reset_peak_memory(context.device)
+                times_s = time_function(
+                    fn,
+                    context.device,
+                    warmup=warmup,
+                    repeats=repeats,
+                    max_time_s=max_time_s,
+                )
+                peak_memory_bytes = get_peak_memory_increase(context.device, baseline_bytes)
+                del fn
+                metrics = case.metrics(size, context) if case.metrics is not None else {}
+                if peak_memory_bytes is not None:
+                    # Memory on top of the inputs created by the setup function.
+                    metrics["peak_memory_mb"] = peak_memory_bytes / 2**20
+                result = BenchmarkResult(
+                    name=case.name,
+                    size=size,
+                    unit=case.unit,
+                    times_s=times_s,
+                    metrics=metrics,
+                )
+                LOGGER.info(
+                    "\tmedian %.4fs, min %.4fs over %d runs, peak memory %s.",
+                    result.median_s,
+                    result.min_s,
+                    len(times_s),
+                    "n/a" if peak_memory_bytes is None else f"{peak_memory_bytes / 2**20:.1f}MB",
+                )
+                results.append(result)
+    return results
+
+
+def _get_git_revision() -> str | None:
+    """Return the current git commit (with a suffix if the tree is dirty)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if status else commit
+
+
+def collect_metadata(device: torch.device | str) -> dict[str, Any]:
+    """Collect information about the environment the benchmarks ran in."""
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_revision": _get_git_revision(),
+        "device": str(device),
+        "num_threads": torch.get_num_threads(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "torch": torch.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def save_results(
+    results: list[BenchmarkResult], path: Path, metadata: dict[str, Any] | None = None
+) -> None:
+    """Save benchmark results as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "metadata": metadata or {},
+        "results": [result.asdict() for result in results],
+    }
+    path.write_text(json.dumps(data, indent=2))
+
+
+def load_results(path: Path) -> tuple[dict[str, Any], list[BenchmarkResult]]:
+    """Load benchmark results from JSON."""
+    data = json.loads(path.read_text())
+    schema_version = data.get("schema_version")
+    if schema_version != RESULTS_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported benchmark results version {schema_version} in {path}.")
+    results = [
+        BenchmarkResult(
+            name=item["name"],
+            size=item["size"],
+            unit=item["unit"],
+            times_s=item["times_s"],
+            metrics=item.get("metrics", {}),
+        )
+        for item in data["results"]
+    ]
+    return data.get("metadata", {}), results
+
+
+class BenchmarkComparison(NamedTuple):
+    """Comparison of a benchmark case between two runs."""
+
+    name: str
+    size: int
+    baseline_s: float
+    candidate_s: float
+
+    @property
+    def speedup(self) -> float:
+        """Speedup of candidate over baseline (> 1 means candidate is faster)."""
+        return self.baseline_s / self.candidate_s if self.candidate_s > 0 else float("inf")
+
+
+def compare_results(
+    baseline: list[BenchmarkResult], candidate: list[BenchmarkResult]
+) -> list[BenchmarkComparison]:
+    """Compare median run times of benchmark cases present in both runs."""
+    baseline_by_key = {(result.name, result.size): result for result in baseline}
+    comparisons = []
+    for result in candidate:
+        reference = baseline_by_key.get((result.name, result.size))
+        if reference is None:
+            continue
+        comparisons.append(
+            BenchmarkComparison(
+                name=result.name,
+                size=result.size,
+                baseline_s=reference.median_s,
+                candidate_s=result.median_s,
+            )
+        )
+    return comparisons
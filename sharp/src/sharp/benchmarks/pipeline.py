@@ -0,0 +1,356 @@
+"""Contains end-to-end benchmark cases for the predict -> unproject -> export -> label pipeline.
+
+The cases use the randomly initialized "tiny" predictor preset. The model stage is
+therefore much faster than with the released checkpoint, but all other stages operate
+on a realistically sized prediction of ~1.2M Gaussians.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.util
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+from sharp.cli.depth import create_monodepth_predictor, predict_depth
+from sharp.cli.predict import predict_image
+from sharp.models import (
+    RGBGaussianPredictor,
+    create_predictor,
+    create_predictor_params,
+    export,
+    quantization,
+)
+from sharp.models.export import ExportFormat
+from sharp.models.feature_cache import (
+    FeatureCacheDType,
+    MonodepthFeatureCache,
+    compute_weights_version,
+)
+from sharp.utils import gaussians as gaussians_utils
+from sharp.utils import labels
+from sharp.utils import math as math_utils
+
+from .harness import BenchmarkContext, BenchmarkSkipped, register_benchmark
+from .scenes import (
+    DEFAULT_FOCAL_LENGTH_PX,
+    DEFAULT_IMAGE_SIZE,
+    INTERNAL_RESOLUTION,
+    create_synthetic_mask,
+)
+
+
+def _create_tiny_predictor(device: torch.device, seed: int) -> RGBGaussianPredictor:
+    torch.manual_seed(seed)
+    predictor = create_predictor(create_predictor_params("tiny"))
+    return predictor.eval().to(device)
+
+
+def _create_synthetic_image(seed: int) -> np.ndarray:
+    """Create a smooth random RGB image of the default size."""
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+    generator = torch.Generator().manual_seed(seed)
+    image = torch.rand(1, 3, image_height // 64, image_width // 64, generator=generator)
+    image = F.interpolate(image, size=(image_height, image_width), mode="bilinear")
+    return (255.0 * image[0].permute(1, 2, 0)).to(torch.uint8).numpy()
+
+
+def _get_intrinsics_resized(device: torch.device) -> torch.Tensor:
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+    f_px = DEFAULT_FOCAL_LENGTH_PX
+    return torch.tensor(
+        [
+            [f_px * INTERNAL_RESOLUTION / image_width, 0, INTERNAL_RESOLUTION / 2, 0],
+            [0, f_px * INTERNAL_RESOLUTION / image_height, INTERNAL_RESOLUTION / 2, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ],
+        device=device,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _predict_tiny_ndc(seed: int) -> gaussians_utils.Gaussians3D:
+    """Predict NDC Gaussians with the tiny model once and share them between cases."""
+    predictor = _create_tiny_predictor(torch.device("cpu"), seed)
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+    image = torch.from_numpy(_create_synthetic_image(seed)).permute(2, 0, 1).float() / 255.0
+    image_resized = F.interpolate(
+        image[None],
+        size=(INTERNAL_RESOLUTION, INTERNAL_RESOLUTION),
+        mode="bilinear",
+        align_corners=True,
+    )
+    disparity_factor = torch.tensor([DEFAULT_FOCAL_LENGTH_PX / image_width])
+    with torch.no_grad():
+        return predictor(image_resized, disparity_factor)
+
+
+def _unproject(
+    gaussians_ndc: gaussians_utils.Gaussians3D, device: torch.device
+) -> gaussians_utils.Gaussians3D:
+    return gaussians_utils.unproject_gaussians(
+        gaussians_ndc,
+        torch.eye(4, device=device),
+        _get_intrinsics_resized(device),
+        (INTERNAL_RESOLUTION, INTERNAL_RESOLUTION),
+    )
+
+
+@register_benchmark("pipeline.predict", unit="images", sizes=(1,))
+def _setup_pipeline_predict(size: int, context: BenchmarkContext):
+    predictor = _create_tiny_predictor(context.device, context.seed)
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    return run
+
+
+def _randomize_prediction_heads(predictor: RGBGaussianPredictor, seed: int) -> None:
+    """Replace the zero initialization of the prediction heads by random weights.
+
+    With zero heads, all Gaussians keep their base values, so changes of the features
+    would not show in the predictions.
+    """
+    torch.manual_seed(seed)
+    for module in predictor.prediction_head.modules():
+        if isinstance(module, nn.Conv2d):
+            module.reset_parameters()
+
+
+def _feature_cache_metrics(size: int, context: BenchmarkContext):
+    """Compare predictions from cached features against uncached predictions."""
+    device = torch.device("cpu")
+    predictor = _create_tiny_predictor(device, context.seed)
+    _randomize_prediction_heads(predictor, context.seed)
+    weights_version = compute_weights_version(predictor.monodepth_model)
+    image = _create_synthetic_image(context.seed)
+    gaussians_ref = predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, device)
+
+    metrics = {}
+    for feature_dtype in ("original", "float16"):
+        predictor.feature_cache = MonodepthFeatureCache(
+            context.workdir / f"feature_cache_metrics_{feature_dtype}",
+            weights_version,
+            feature_dtype=feature_dtype,
+        )
+        predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, device)
+        gaussians = predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, device)
+        position_error = (gaussians.mean_vectors - gaussians_ref.mean_vectors).norm(dim=-1)
+        relative_position_error = position_error / gaussians_ref.mean_vectors.norm(dim=-1)
+        color_error = (gaussians.colors - gaussians_ref.colors).abs()
+        metrics |= {
+            f"cache_mb_per_image_{feature_dtype}": predictor.feature_cache.nbytes / 1024**2,
+            f"hit_rate_{feature_dtype}": predictor.feature_cache.hit_rate,
+            f"max_position_error_{feature_dtype}": position_error.max().item(),
+            f"max_relative_position_error_{feature_dtype}": relative_position_error.max().item(),
+            f"mean_relative_position_error_{feature_dtype}": (
+                relative_position_error.mean().item()
+            ),
+            f"max_color_error_{feature_dtype}": color_error.max().item(),
+            f"mean_color_error_{feature_dtype}": color_error.mean().item(),
+        }
+    return metrics
+
+
+def _setup_pipeline_predict_feature_cache(
+    size: int, context: BenchmarkContext, feature_dtype: FeatureCacheDType
+):
+    predictor = _create_tiny_predictor(context.device, context.seed)
+    predictor.feature_cache = MonodepthFeatureCache(
+        context.workdir / f"feature_cache_{feature_dtype}",
+        compute_weights_version(predictor.monodepth_model),
+        feature_dtype=feature_dtype,
+    )
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    # Fill the cache, so only cache hits are timed.
+    run()
+    return run
+
+
+@register_benchmark(
+    "pipeline.predict.feature_cache", unit="images", sizes=(1,), metrics=_feature_cache_metrics
+)
+def _setup_pipeline_predict_feature_cache_original(size: int, context: BenchmarkContext):
+    return _setup_pipeline_predict_feature_cache(size, context, feature_dtype="original")
+
+
+@register_benchmark("pipeline.predict.feature_cache.float16", unit="images", sizes=(1,))
+def _setup_pipeline_predict_feature_cache_float16(size: int, context: BenchmarkContext):
+    return _setup_pipeline_predict_feature_cache(size, context, feature_dtype="float16")
+
+
+@register_benchmark("pipeline.predict.low_memory", unit="images", sizes=(1,))
+def _setup_pipeline_predict_low_memory(size: int, context: BenchmarkContext):
+    predictor = _create_tiny_predictor(context.device, context.seed)
+    # Offload all encodings on CUDA, which bounds the savings from offloading.
+    predictor.set_low_memory(memory_budget_bytes=0)
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    return run
+
+
+@register_benchmark("pipeline.depth", unit="images", sizes=(1,))
+def _setup_pipeline_depth(size: int, context: BenchmarkContext):
+    torch.manual_seed(context.seed)
+    monodepth_model = create_monodepth_predictor(None, "tiny").to(context.device)
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_depth(monodepth_model, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    return run
+
+
+@register_benchmark("pipeline.unproject", unit="images", sizes=(1,))
+def _setup_pipeline_unproject(size: int, context: BenchmarkContext):
+    gaussians_ndc = _predict_tiny_ndc(context.seed).to(context.device)
+
+    def run():
+        return [_unproject(gaussians_ndc, context.device) for _ in range(size)]
+
+    return run
+
+
+@register_benchmark("pipeline.save_ply", unit="images", sizes=(1,))
+def _setup_pipeline_save_ply(size: int, context: BenchmarkContext):
+    gaussians = _unproject(_predict_tiny_ndc(context.seed), torch.device("cpu"))
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+
+    def run():
+        for i in range(size):
+            gaussians_utils.save_ply(
+                gaussians,
+                DEFAULT_FOCAL_LENGTH_PX,
+                (image_height, image_width),
+                context.workdir / f"pipeline_{i}.ply",
+            )
+
+    return run
+
+
+@register_benchmark("pipeline.map_mask_to_gaussians", unit="images", sizes=(1,))
+def _setup_pipeline_map_mask_to_gaussians(size: int, context: BenchmarkContext):
+    gaussians = _unproject(_predict_tiny_ndc(context.seed), torch.device("cpu"))
+    mean_vectors = gaussians.mean_vectors[0].numpy()
+    mask = create_synthetic_mask(DEFAULT_IMAGE_SIZE, seed=context.seed)
+    image_width, image_height = DEFAULT_IMAGE_SIZE
+
+    def run():
+        return [
+            labels.map_mask_to_gaussians(
+                mask,
+                mean_vectors,
+                focal_length_px=(DEFAULT_FOCAL_LENGTH_PX, DEFAULT_FOCAL_LENGTH_PX),
+                principal_point_px=(image_width / 2, image_height / 2),
+                image_size=DEFAULT_IMAGE_SIZE,
+            )
+            for _ in range(size)
+        ]
+
+    return run
+
+
+def _predict_quantization_error(size: int, context: BenchmarkContext):
+    """Compare the predictions of the int8 quantized against the float32 tiny model."""
+    predictor = _create_tiny_predictor(torch.device("cpu"), context.seed)
+    image = _create_synthetic_image(context.seed)
+    device = torch.device("cpu")
+    gaussians_ref = predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, device)
+    quantization.quantize_predictor(predictor, "dynamic_int8")
+    gaussians = predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, device)
+
+    depth_ref = gaussians_ref.mean_vectors[..., 2]
+    depth_error = (gaussians.mean_vectors[..., 2] - depth_ref).abs() / depth_ref.abs()
+    position_error = (gaussians.mean_vectors - gaussians_ref.mean_vectors).norm(dim=-1)
+    return {
+        "median_relative_depth_error": depth_error.median().item(),
+        "p95_relative_depth_error": math_utils.approximate_quantile(depth_error, [0.95]).item(),
+        "median_position_error": position_error.median().item(),
+    }
+
+
+@register_benchmark(
+    "pipeline.predict.dynamic_int8",
+    unit="images",
+    sizes=(1,),
+    metrics=_predict_quantization_error,
+)
+def _setup_pipeline_predict_dynamic_int8(size: int, context: BenchmarkContext):
+    if context.device.type != "cpu":
+        raise BenchmarkSkipped("Quantized inference is only supported on CPU.")
+    predictor = _create_tiny_predictor(context.device, context.seed)
+    quantization.quantize_predictor(predictor, "dynamic_int8")
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    return run
+
+
+def _setup_pipeline_predict_exported(
+    size: int, context: BenchmarkContext, export_format: ExportFormat
+):
+    if context.device.type != "cpu":
+        raise BenchmarkSkipped("Exported models are benchmarked on CPU.")
+    if export_format == "onnx" and not all(
+        importlib.util.find_spec(name) for name in ("onnxscript", "onnxruntime")
+    ):
+        raise BenchmarkSkipped("ONNX benchmark requires onnxscript and onnxruntime.")
+
+    suffix = export.EXPORT_SUFFIXES[export_format]
+    model_path = (context.workdir / "predictor").with_suffix(suffix)
+    export.export_predictor(
+        _create_tiny_predictor(context.device, context.seed), model_path, export_format
+    )
+    predictor = export.ExportedPredictor(model_path, context.device)
+    images = [_create_synthetic_image(context.seed + i) for i in range(size)]
+
+    def run():
+        return [
+            predict_image(predictor, image, DEFAULT_FOCAL_LENGTH_PX, context.device)
+            for image in images
+        ]
+
+    return run
+
+
+@register_benchmark("pipeline.predict.torch_export", unit="images", sizes=(1,))
+def _setup_pipeline_predict_torch_export(size: int, context: BenchmarkContext):
+    return _setup_pipeline_predict_exported(size, context, "torch_export")
+
+
+@register_benchmark("pipeline.predict.onnx", unit="images", sizes=(1,))
+def _setup_pipeline_predict_onnx(size: int, context: BenchmarkContext):
+    return _setup_pipeline_predict_exported(size, context, "onnx")
@@ -0,0 +1,182 @@
+"""Contains generators for synthetic benchmark inputs.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from sharp.utils.gaussians import Gaussians3D
+
+# Resolution and focal length of a typical 4:3 phone photo.
+DEFAULT_IMAGE_SIZE = (4032, 3024)
+DEFAULT_FOCAL_LENGTH_PX = 3200.0
+# Internal resolution of the predictor.
+INTERNAL_RESOLUTION = 1536
+# Number of Gaussians of the layered 2 x 384 x 288 and 2 x 768 x 576 scenes.
+LAYERED_SCENE_SIZES = (2 * 384 * 288, 2 * 768 * 576)
+
+
+def create_synthetic_gaussians(
+    num_gaussians: int,
+    seed: int = 0,
+    device: torch.device | str = "cpu",
+    image_size: tuple[int, int] = DEFAULT_IMAGE_SIZE,
+    focal_length_px: float = DEFAULT_FOCAL_LENGTH_PX,
+) -> Gaussians3D:
+    """Create a random scene which resembles the statistics of a SHARP prediction.
+
+    The Gaussians are placed inside the view frustum of the camera at the origin with
+    log-uniformly distributed depth and with scales growing linearly with depth.
+
+    Args:
+        num_gaussians: How many Gaussians to create.
+        seed: Seed of the random generator.
+        device: The device to create the Gaussians on.
+        image_size: The (width, height) of the virtual camera.
+        focal_length_px: The focal length of the virtual camera.
+
+    Returns:
+        The Gaussians with a batch dimension of 1.
+    """
+    generator = torch.Generator().manual_seed(seed)
+
+    def _rand(*shape: int) -> torch.Tensor:
+        return torch.rand(*shape, generator=generator)
+
+    image_width, image_height = image_size
+    depth = torch.exp(np.log(1.0) + _rand(num_gaussians) * (np.log(20.0) - np.log(1.0)))
+    x_px = _rand(num_gaussians) * image_width
+    y_px = _rand(num_gaussians) * image_height
+    mean_vectors = torch.stack(
+        [
+            (x_px - 0.5 * image_width) / focal_length_px * depth,
+            (y_px - 0.5 * image_height) / focal_length_px * depth,
+            depth,
+        ],
+        dim=-1,
+    )
+
+    base_scale = depth[:, None] / focal_length_px
+    singular_values = base_scale * torch.exp(torch.randn(num_gaussians, 3, generator=generator))
+
+    quaternions = torch.randn(num_gaussians, 4, generator=generator)
+    quaternions = quaternions / quaternions.norm(dim=-1, keepdim=True)
+
+    colors = _rand(num_gaussians, 3)
+    opacities = 0.01 + 0.98 * _rand(num_gaussians)
+
+    gaussians = Gaussians3D(
+        mean_vectors=mean_vectors[None],
+        singular_values=singular_values[None],
+        quaternions=quaternions[None],
+        colors=colors[None],
+        opacities=opacities[None],
+    )
+    return gaussians.to(torch.device(device))
+
+
+def create_synthetic_layered_gaussians(
+    grid_size: tuple[int, int],
+    num_layers: int = 2,
+    seed: int = 0,
+    device: torch.device | str = "cpu",
+    focal_length_px: float | None = None,
+) -> Gaussians3D:
+    """Create a scene with the layered layout of a SHARP prediction.
+
+    There is one Gaussian per layer and pixel of a (width, height) grid, flattened in
+    the (layer, row, col) order of the predictor. Depth, colors and opacities are
+    smooth across the image with small per-Gaussian noise, the later layers lie
+    behind the first layer.
+
+    Args:
+        grid_size: The (width, height) of the grid of Gaussians.
+        num_layers: How many layers of Gaussians to create.
+        seed: Seed of the random generator.
+        device: The device to create the Gaussians on.
+        focal_length_px: The focal length of the virtual camera. Defaults to the
+            grid width.
+
+    Returns:
+        The Gaussians with a batch dimension of 1.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    width, height = grid_size
+    focal_length_px = float(width) if focal_length_px is None else focal_length_px
+    shape = (num_layers, height, width)
+
+    def _smooth(num_channels: int, num_cells: int) -> torch.Tensor:
+        field = torch.rand(num_layers, num_channels, num_cells, num_cells, generator=generator)
+        field = F.interpolate(field, size=(height, width), mode="bicubic", align_corners=True)
+        return field.clamp(0.0, 1.0).permute(0, 2, 3, 1)
+
+    def _noise(*shape: int) -> torch.Tensor:
+        return torch.randn(*shape, generator=generator)
+
+    # Log-depth between 1m and 20m, where each layer lies behind the previous one.
+    log_depth = np.log(20.0) * _smooth(1, 8)[..., 0]
+    log_depth = log_depth.cummax(dim=0).values + 0.2 * torch.arange(num_layers)[:, None, None]
+    depth = torch.exp(log_depth + 0.01 * _noise(*shape))
+    y_px, x_px = torch.meshgrid(
+        torch.arange(height) + 0.5, torch.arange(width) + 0.5, indexing="ij"
+    )
+    mean_vectors = torch.stack(
+        [
+            (x_px - 0.5 * width) / focal_length_px * depth,
+            (y_px - 0.5 * height) / focal_length_px * depth,
+            depth,
+        ],
+        dim=-1,
+    )
+    base_scale = depth[..., None] / focal_length_px
+    singular_values = base_scale * torch.exp(0.1 * _noise(*shape, 3))
+    quaternions = torch.tensor([1.0, 0.0, 0.0, 0.0]) + 0.05 * _noise(*shape, 4)
+    quaternions = quaternions / quaternions.norm(dim=-1, keepdim=True)
+    colors = (_smooth(3, 32) + 0.02 * _noise(*shape, 3)).clamp(0.0, 1.0)
+    opacities = (0.2 + 0.75 * _smooth(1, 16)[..., 0] + 0.02 * _noise(*shape)).clamp(0.01, 0.99)
+    gaussians = Gaussians3D(
+        mean_vectors=mean_vectors.reshape(1, -1, 3),
+        singular_values=singular_values.reshape(1, -1, 3),
+        quaternions=quaternions.reshape(1, -1, 4),
+        colors=colors.reshape(1, -1, 3),
+        opacities=opacities.reshape(1, -1),
+    )
+    return gaussians.to(torch.device(device))
+
+
+def create_synthetic_layered_scene(
+    num_gaussians: int, seed: int = 0, device: torch.device | str = "cpu"
+) -> Gaussians3D:
+    """Create a 4:3 layered scene with two layers and num_gaussians Gaussians in total."""
+    grid_width = round(math.sqrt(num_gaussians / 2 * 4 / 3))
+    return create_synthetic_layered_gaussians(
+        (grid_width, grid_width * 3 // 4), seed=seed, device=device
+    )
+
+
+def create_random_rotations(num_rotations: int, seed: int = 0) -> torch.Tensor:
+    """Create uniformly distributed random rotation matrices."""
+    generator = torch.Generator().manual_seed(seed)
+    matrices, _ = torch.linalg.qr(torch.randn(num_rotations, 3, 3, generator=generator))
+    # Flip reflections to obtain proper rotations.
+    sign = torch.sign(torch.linalg.det(matrices))
+    return matrices * sign[:, None, None]
+
+
+def create_synthetic_mask(image_size: tuple[int, int], seed: int = 0) -> np.ndarray:
+    """Create a binary 0-255 mask covering roughly the lower half of the image."""
+    image_width, image_height = image_size
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((image_height, image_width), dtype=np.uint8)
+    mask[image_height // 2 :] = 255
+    # Add some noise so the mask is not trivially separable.
+    noise = rng.random((image_height, image_width)) < 0.05
+    mask[noise] = 255 - mask[noise]
+    return mask
@@ -4,12 +4,37 @@ For licensing see accompanying LICENSE file.
 Copyright (C) 2025 Apple Inc. All Rights Reserved.
 """
 
+import importlib
+
 import click
 
 from . import predict, render
 
+# Commands which are only imported when invoked, so that e.g. `sharp predict` does not
+# pay for importing the benchmark harness. Maps command names to (module, attribute).
+LAZY_COMMANDS = {
+    "depth": ("sharp.cli.depth", "depth_cli"),
+    "benchmark": ("sharp.cli.benchmark", "benchmark_cli"),
+    "export": ("sharp.cli.export", "export_cli"),
+}
+
+
+class LazyGroup(click.Group):
+    """Click group which imports the modules of LAZY_COMMANDS on first use."""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List the eager and lazy commands."""
+        return [*super().list_commands(ctx), *LAZY_COMMANDS]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Get a command and import it if it is lazy."""
+        if cmd_name in LAZY_COMMANDS:
+            module_name, attribute = LAZY_COMMANDS[cmd_name]
+            return getattr(importlib.import_module(module_name), attribute)
+        return super().get_command(ctx, cmd_name)
+
 
-@click.group()
+@click.group(cls=LazyGroup)
 def main_cli():
     """Run inference for SHARP model."""
     pass
@@ -0,0 +1,144 @@
+"""Contains `sharp benchmark` CLI implementation.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from pathlib import Path
+
+import click
+import torch
+
+from sharp import benchmarks
+from sharp.utils import logging as logging_utils
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _parse_sizes(ctx, param, value: str | None) -> tuple[int, ...] | None:
+    if value is None:
+        return None
+    try:
+        return tuple(int(float(item)) for item in value.split(","))
+    except ValueError:
+        raise click.BadParameter("Sizes must be a comma separated list of integers.")
+
+
+@click.group()
+def benchmark_cli():
+    """Run and compare micro-benchmarks."""
+    pass
+
+
+@benchmark_cli.command("run")
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(path_type=Path, dir_okay=False),
+    help="Path to the JSON file to store the results in.",
+    required=True,
+)
+@click.option(
+    "-k",
+    "--filter",
+    "patterns",
+    multiple=True,
+    help="Only run benchmarks matching this glob pattern (can be repeated).",
+)
+@click.option(
+    "--sizes",
+    callback=_parse_sizes,
+    default=None,
+    help="Comma separated number of Gaussians of the synthetic scenes, e.g. 1e4,1e6.",
+)
+@click.option("--repeats", type=int, default=5, help="Maximum number of timed runs per case.")
+@click.option("--warmup", type=int, default=1, help="Number of untimed warmup runs per case.")
+@click.option(
+    "--max-time",
+    type=float,
+    default=10.0,
+    help="Stop repeating a case once its total run time exceeds this many seconds.",
+)
+@click.option("--num-threads", type=int, default=None, help="Number of torch CPU threads.")
+@click.option("--device", type=str, default="cpu", help="Device to run on. ['cpu', 'cuda']")
+@click.option("--list", "list_only", is_flag=True, help="Only list matching benchmarks.")
+@click.option("-v", "--verbose", is_flag=True, help="Activate debug logs.")
+def run_cli(
+    output_path: Path,
+    patterns: tuple[str, ...],
+    sizes: tuple[int, ...] | None,
+    repeats: int,
+    warmup: int,
+    max_time: float,
+    num_threads: int | None,
+    device: str,
+    list_only: bool,
+    verbose: bool,
+):
+    """Run benchmarks and store the results as JSON."""
+    logging_utils.configure(logging.DEBUG if verbose else logging.INFO)
+
+    cases = benchmarks.select_benchmarks(patterns)
+    if list_only:
+        for case in cases:
+            click.echo(case.name)
+        return
+    if len(cases) == 0:
+        LOGGER.error("No benchmarks match %s.", patterns)
+        sys.exit(1)
+
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    results = benchmarks.run_benchmarks(
+        cases,
+        scene_sizes=sizes or benchmarks.DEFAULT_SCENE_SIZES,
+        device=device,
+        warmup=warmup,
+        repeats=repeats,
+        max_time_s=max_time,
+    )
+    benchmarks.save_results(results, output_path, metadata=benchmarks.collect_metadata(device))
+    LOGGER.info("Saved %d results to %s.", len(results), output_path)
+
+
+@benchmark_cli.command("compare")
+@click.argument("baseline_path", type=click.Path(path_type=Path, exists=True, dir_okay=False))
+@click.argument("candidate_path", type=click.Path(path_type=Path, exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    type=float,
+    default=0.1,
+    help="Relative slowdown above which a case is reported as regression.",
+)
+@click.option("--fail-on-regression", is_flag=True, help="Exit with non-zero code on regressions.")
+def compare_cli(
+    baseline_path: Path, candidate_path: Path, threshold: float, fail_on_regression: bool
+):
+    """Compare two benchmark result files."""
+    baseline_metadata, baseline = benchmarks.load_results(baseline_path)
+    candidate_metadata, candidate = benchmarks.load_results(candidate_path)
+    comparisons = benchmarks.compare_results(baseline, candidate)
+
+    click.echo(f"baseline:  {baseline_metadata.get('git_revision')} ({baseline_path})")
+    click.echo(f"candidate: {candidate_metadata.get('git_revision')} ({candidate_path})")
+    click.echo(f"{'benchmark':<48} {'size':>10} {'baseline':>11} {'candidate':>11} {'speedup':>8}")
+
+    num_regressions = 0
+    for comparison in comparisons:
+        is_regression = comparison.candidate_s > (1.0 + threshold) * comparison.baseline_s
+        num_regressions += is_regression
+        click.echo(
+            f"{comparison.name:<48} {comparison.size:>10} "
+            f"{comparison.baseline_s:>10.4f}s {comparison.candidate_s:>10.4f}s "
+            f"{comparison.speedup:>7.2f}x" + ("  REGRESSION" if is_regression else "")
+        )
+
+    if num_regressions > 0:
+        click.echo(f"{num_regressions} regression(s) above {threshold:.0%}.")
+        if fail_on_regression:
+            sys.exit(1)
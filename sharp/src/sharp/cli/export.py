@@ -0,0 +1,83 @@
+"""Contains `sharp export` CLI implementation.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import click
+
+from sharp.models import PredictorPreset, create_predictor, create_predictor_params
+from sharp.models.export import EXPORT_SUFFIXES, ExportFormat, export_predictor
+from sharp.utils import logging as logging_utils
+
+from .predict import load_state_dict
+
+LOGGER = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(path_type=Path, dir_okay=False),
+    help="Path to save the exported model. The suffix is set from the export format.",
+    required=True,
+)
+@click.option(
+    "-c",
+    "--checkpoint-path",
+    type=click.Path(path_type=Path, dir_okay=False),
+    default=None,
+    help="Path to the .pt checkpoint. If not provided, downloads the default model automatically.",
+    required=False,
+)
+@click.option(
+    "--model-preset",
+    type=click.Choice(["sharp", "tiny"]),
+    default="sharp",
+    help="Model architecture. The 'tiny' preset runs with random weights unless a checkpoint "
+    "is provided and is only meant for debugging and benchmarking.",
+)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(["torch_export", "onnx"]),
+    default="torch_export",
+    help="Save a torch.export program (.pt2) or an ONNX graph (.onnx, requires onnxscript).",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Fixed batch size of the exported model. `sharp predict` uses batch size 1.",
+)
+@click.option("-v", "--verbose", is_flag=True, help="Activate debug logs.")
+def export_cli(
+    output_path: Path,
+    checkpoint_path: Path | None,
+    model_preset: PredictorPreset,
+    export_format: ExportFormat,
+    batch_size: int,
+    verbose: bool,
+):
+    """Export the predictor for runtime-independent inference.
+
+    The exported model maps an image resized to 1536x1536 and the disparity factor
+    to NDC Gaussians. Run it with `sharp predict --exported-model-path`.
+    """
+    logging_utils.configure(logging.DEBUG if verbose else logging.INFO)
+
+    gaussian_predictor = create_predictor(create_predictor_params(model_preset))
+    state_dict = load_state_dict(checkpoint_path, model_preset)
+    if state_dict is not None:
+        gaussian_predictor.load_state_dict(state_dict)
+    gaussian_predictor.eval()
+
+    output_path = output_path.with_suffix(EXPORT_SUFFIXES[export_format])
+    LOGGER.info("Exporting %s model with batch size %d.", export_format, batch_size)
+    export_predictor(gaussian_predictor, output_path, export_format, batch_size=batch_size)
@@ -6,7 +6,9 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import urllib.parse
 from pathlib import Path
 
 import click
@@ -16,11 +18,20 @@ import torch.nn.functional as F
 import torch.utils.data
 
 from sharp.models import (
-    PredictorParams,
+    PredictorPreset,
     RGBGaussianPredictor,
     create_predictor,
+    create_predictor_params,
+    export,
+    quantization,
 )
-from sharp.utils import io
+from sharp.models.feature_cache import (
+    FeatureCacheDType,
+    MonodepthFeatureCache,
+    compute_weights_version,
+)
+from sharp.models.presets import AttentionBackend
+from sharp.utils import io, ordering
 from sharp.utils import logging as logging_utils
 from sharp.utils.gaussians import (
     Gaussians3D,
@@ -59,6 +70,82 @@ DEFAULT_MODEL_URL = "https://ml-site.cdn-apple.com/models/sharp/sharp_2572gikvuh
     help="Path to the .pt checkpoint. If not provided, downloads the default model automatically.",
     required=False,
 )
+@click.option(
+    "--model-preset",
+    type=click.Choice(["sharp", "tiny"]),
+    default="sharp",
+    help="Model architecture. The 'tiny' preset runs with random weights unless a checkpoint "
+    "is provided and is only meant for debugging and benchmarking.",
+)
+@click.option(
+    "--patch-batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of image patches the ViT encodes at once. Lower values reduce the "
+    "peak memory at the cost of speed. Encodes all 35 patches at once by default.",
+)
+@click.option(
+    "--attention-backend",
+    type=click.Choice(["auto", "flash", "efficient", "math", "eager"]),
+    default="auto",
+    help="Attention kernel of the ViT encoders. 'auto' picks the fastest kernel available "
+    "for the device.",
+)
+@click.option(
+    "--quantize",
+    type=click.Choice(["none", "dynamic_int8"]),
+    default="none",
+    help="Quantize the ViT encoders to int8 for faster CPU inference. The quantized model "
+    "is cached next to the downloaded checkpoints.",
+)
+@click.option(
+    "-e",
+    "--exported-model-path",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+    default=None,
+    help="Path to a .pt2 or .onnx model written by `sharp export` to run instead of the "
+    "PyTorch model.",
+)
+@click.option(
+    "--feature-cache-dir",
+    type=click.Path(path_type=Path, file_okay=False),
+    default=None,
+    help="Cache the monodepth features of each image in this directory, so predicting the "
+    "same image again skips the monodepth model.",
+)
+@click.option(
+    "--feature-cache-max-gb",
+    type=click.FloatRange(min=0.0),
+    default=20.0,
+    help="Maximum size of the feature cache. Least recently used features are deleted first.",
+)
+@click.option(
+    "--feature-cache-dtype",
+    type=click.Choice(["original", "float16"]),
+    default="original",
+    help="Precision of the cached features. 'float16' halves the size of the cache, but "
+    "predictions from cached features deviate slightly from uncached ones.",
+)
+@click.option(
+    "--low-memory",
+    is_flag=True,
+    help="Release intermediate features as soon as possible to reduce the peak memory.",
+)
+@click.option(
+    "--memory-budget-gb",
+    type=click.FloatRange(min=0.0),
+    default=None,
+    help="On CUDA, offload monodepth features to host memory between stages while more "
+    "than this much device memory is allocated. Implies --low-memory.",
+)
+@click.option(
+    "--gaussian-order",
+    type=click.Choice(["none", "morton"]),
+    default="none",
+    help="Order of the Gaussians in the saved PLY. 'morton' sorts them along a space-filling "
+    "curve, which compresses better and streams with better locality. The permutation from "
+    "the (layer, row, col) order of the predictor is saved as <image>_order.npy.",
+)
 @click.option(
     "--render/--no-render",
     "with_rendering",
@@ -77,6 +164,17 @@ def predict_cli(
     input_path: Path,
     output_path: Path,
     checkpoint_path: Path,
+    model_preset: PredictorPreset,
+    patch_batch_size: int | None,
+    attention_backend: AttentionBackend,
+    quantize: quantization.QuantizationMode,
+    exported_model_path: Path | None,
+    feature_cache_dir: Path | None,
+    feature_cache_max_gb: float,
+    feature_cache_dtype: FeatureCacheDType,
+    low_memory: bool,
+    memory_budget_gb: float | None,
+    gaussian_order: ordering.GaussianOrder,
     with_rendering: bool,
     device: str,
     verbose: bool,
@@ -100,7 +198,23 @@ def predict_cli(
 
     LOGGER.info("Processing %d valid image files.", len(image_paths))
 
-    if device == "default":
+    if exported_model_path is not None and quantize != "none":
+        raise click.BadParameter("Exported models cannot be quantized.", param_hint="--quantize")
+    if exported_model_path is not None and feature_cache_dir is not None:
+        raise click.BadParameter(
+            "Exported models do not support the feature cache.", param_hint="--feature-cache-dir"
+        )
+    # Quantized models and ONNX graphs only run on CPU.
+    if quantize != "none" or (
+        exported_model_path is not None
+        and exported_model_path.suffix == export.EXPORT_SUFFIXES["onnx"]
+    ):
+        if device not in ("default", "cpu"):
+            raise click.BadParameter(
+                "Quantized and ONNX models only run on CPU.", param_hint="--device"
+            )
+        device = "cpu"
+    elif device == "default":
         if torch.cuda.is_available():
             device = "cuda"
         elif torch.mps.is_available():
@@ -109,22 +223,28 @@ def predict_cli(
             device = "cpu"
     LOGGER.info("Using device %s", device)
 
-    if with_rendering and device != "cuda":
-        LOGGER.warning("Can only run rendering with gsplat on CUDA. Rendering is disabled.")
-        with_rendering = False
-
-    # Load or download checkpoint
-    if checkpoint_path is None:
-        LOGGER.info("No checkpoint provided. Downloading default model from %s", DEFAULT_MODEL_URL)
-        state_dict = torch.hub.load_state_dict_from_url(DEFAULT_MODEL_URL, progress=True)
+    feature_cache = None
+    if exported_model_path is not None:
+        LOGGER.info("Loading exported model from %s", exported_model_path)
+        gaussian_predictor = export.ExportedPredictor(exported_model_path, device)
     else:
-        LOGGER.info("Loading checkpoint from %s", checkpoint_path)
-        state_dict = torch.load(checkpoint_path, weights_only=True)
-
-    gaussian_predictor = create_predictor(PredictorParams())
-    gaussian_predictor.load_state_dict(state_dict)
-    gaussian_predictor.eval()
-    gaussian_predictor.to(device)
+        gaussian_predictor = _create_predictor(
+            checkpoint_path, model_preset, patch_batch_size, attention_backend, quantize
+        ).to(device)
+        if feature_cache_dir is not None:
+            feature_cache = MonodepthFeatureCache(
+                feature_cache_dir,
+                compute_weights_version(gaussian_predictor.monodepth_model),
+                max_bytes=int(feature_cache_max_gb * 1024**3),
+                feature_dtype=feature_cache_dtype,
+            )
+            gaussian_predictor.feature_cache = feature_cache
+        if low_memory or memory_budget_gb is not None:
+            gaussian_predictor.set_low_memory(
+                memory_budget_bytes=None
+                if memory_budget_gb is None
+                else int(memory_budget_gb * 1024**3)
+            )
 
     output_path.mkdir(exist_ok=True, parents=True)
 
@@ -143,6 +263,12 @@ def predict_cli(
             dtype=torch.float32,
         )
         gaussians = predict_image(gaussian_predictor, image, f_px, torch.device(device))
+        if gaussian_order != "none":
+            gaussians, permutation = ordering.sort_gaussians(gaussians, gaussian_order)
+            np.save(
+                output_path / f"{image_path.stem}_order.npy",
+                permutation[0].cpu().numpy().astype(np.int32),
+            )
 
         LOGGER.info("Saving 3DGS to %s", output_path)
         save_ply(gaussians, f_px, (height, width), output_path / f"{image_path.stem}.ply")
@@ -154,10 +280,87 @@ def predict_cli(
             metadata = SceneMetaData(intrinsics[0, 0].item(), (width, height), "linearRGB")
             render_gaussians(gaussians, metadata, output_video_path)
 
+    if feature_cache is not None:
+        feature_cache.log_statistics()
+    if torch.device(device).type == "cuda":
+        LOGGER.info(
+            "Peak allocated CUDA memory: %.1fMB.", torch.cuda.max_memory_allocated() / 1024**2
+        )
+
+
+def _create_predictor(
+    checkpoint_path: Path | None,
+    model_preset: PredictorPreset,
+    patch_batch_size: int | None,
+    attention_backend: AttentionBackend,
+    quantize: quantization.QuantizationMode,
+) -> RGBGaussianPredictor:
+    """Create the predictor and load its (cached quantized) weights."""
+    predictor_params = create_predictor_params(model_preset)
+    predictor_params.monodepth.patch_batch_size = patch_batch_size
+    predictor_params.monodepth.attention_backend = attention_backend
+    gaussian_predictor = create_predictor(predictor_params)
+    gaussian_predictor.eval()
+
+    quantized_path = None
+    if quantize != "none" and (checkpoint_path is not None or model_preset == "sharp"):
+        quantized_path = _get_quantized_checkpoint_path(checkpoint_path, quantize)
+
+    if quantized_path is not None and quantized_path.exists():
+        LOGGER.info("Loading quantized model from %s", quantized_path)
+        quantization.load_quantized_state_dict(gaussian_predictor, quantized_path, quantize)
+    else:
+        state_dict = load_state_dict(checkpoint_path, model_preset)
+        if state_dict is not None:
+            gaussian_predictor.load_state_dict(state_dict)
+        quantization.quantize_predictor(gaussian_predictor, quantize)
+        if quantized_path is not None:
+            LOGGER.info("Caching quantized model at %s", quantized_path)
+            quantization.save_quantized_state_dict(gaussian_predictor, quantized_path)
+    return gaussian_predictor
+
+
+def load_state_dict(
+    checkpoint_path: Path | None, model_preset: PredictorPreset
+) -> dict[str, torch.Tensor] | None:
+    """Load or download the checkpoint of a predictor.
+
+    Returns:
+        The state dict, or None if the model should stay randomly initialized.
+    """
+    if checkpoint_path is not None:
+        LOGGER.info("Loading checkpoint from %s", checkpoint_path)
+        return torch.load(checkpoint_path, weights_only=True)
+    elif model_preset == "sharp":
+        LOGGER.info("No checkpoint provided. Downloading default model from %s", DEFAULT_MODEL_URL)
+        return torch.hub.load_state_dict_from_url(DEFAULT_MODEL_URL, progress=True)
+    else:
+        LOGGER.warning("No checkpoint provided. Using randomly initialized %s model.", model_preset)
+        return None
+
+
+def _get_quantized_checkpoint_path(
+    checkpoint_path: Path | None, mode: quantization.QuantizationMode
+) -> Path:
+    """Return the cache path of the quantized model of a checkpoint.
+
+    The name depends on the checkpoint file and the torch version, since the
+    serialization of quantized weights is not stable across versions.
+    """
+    if checkpoint_path is None:
+        name = Path(urllib.parse.urlparse(DEFAULT_MODEL_URL).path).stem
+        key = f"{DEFAULT_MODEL_URL}:{torch.__version__}"
+    else:
+        stat = checkpoint_path.stat()
+        name = checkpoint_path.stem
+        key = f"{checkpoint_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{torch.__version__}"
+    key_hash = hashlib.sha256(key.encode()).hexdigest()[:8]
+    return Path(torch.hub.get_dir()) / "checkpoints" / f"{name}_{mode}_{key_hash}.pt"
+
 
 @torch.no_grad()
 def predict_image(
-    predictor: RGBGaussianPredictor,
+    predictor: RGBGaussianPredictor | export.ExportedPredictor,
     image: np.ndarray,
     f_px: float,
     device: torch.device,
@@ -6,7 +6,10 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
 import logging
+import time
 from pathlib import Path
 
 import click
@@ -15,7 +18,13 @@ import torch.utils.data
 
 from sharp.utils import camera, gsplat, io
 from sharp.utils import logging as logging_utils
-from sharp.utils.gaussians import Gaussians3D, SceneMetaData, load_ply
+from sharp.utils.gaussians import (
+    Gaussians3D,
+    SceneMetaData,
+    compute_scene_statistics,
+    load_ply,
+)
+from sharp.utils.packed_gaussians import PackedGaussians
 
 LOGGER = logging.getLogger(__name__)
 
@@ -35,15 +44,24 @@ LOGGER = logging.getLogger(__name__)
     help="Path to save the rendered videos.",
     required=True,
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=2,
+    help="Number of threads to load scenes ahead of rendering.",
+)
+@click.option(
+    "--skip-existing",
+    is_flag=True,
+    help="Skip scenes whose video already exists in the output path.",
+)
 @click.option("-v", "--verbose", is_flag=True, help="Activate debug logs.")
-def render_cli(input_path: Path, output_path: Path, verbose: bool):
+def render_cli(
+    input_path: Path, output_path: Path, workers: int, skip_existing: bool, verbose: bool
+):
     """Predict Gaussians from input images."""
     logging_utils.configure(logging.DEBUG if verbose else logging.INFO)
 
-    if not torch.cuda.is_available():
-        LOGGER.error("Rendering a checkpoint requires CUDA.")
-        exit(1)
-
     output_path.mkdir(exist_ok=True, parents=True)
 
     params = camera.TrajectoryParams()
@@ -51,20 +69,100 @@ def render_cli(input_path: Path, output_path: Path, verbose: bool):
     if input_path.suffix == ".ply":
         scene_paths = [input_path]
     elif input_path.is_dir():
-        scene_paths = list(input_path.glob("*.ply"))
+        scene_paths = sorted(input_path.glob("*.ply"))
     else:
         LOGGER.error("Input path must be either directory or single PLY file.")
         exit(1)
 
-    for scene_path in scene_paths:
-        LOGGER.info("Rendering %s", scene_path)
-        gaussians, metadata = load_ply(scene_path)
-        render_gaussians(
-            gaussians=gaussians,
-            metadata=metadata,
-            params=params,
-            output_path=(output_path / scene_path.stem).with_suffix(".mp4"),
-        )
+    def _get_video_path(scene_path: Path) -> Path:
+        return (output_path / scene_path.stem).with_suffix(".mp4")
+
+    if skip_existing:
+        num_scenes = len(scene_paths)
+        scene_paths = [path for path in scene_paths if not _get_video_path(path).exists()]
+        LOGGER.info("Skipping %d already rendered scenes.", num_scenes - len(scene_paths))
+
+    start_time = time.perf_counter()
+    num_frames = 0
+    num_failures = 0
+    with (
+        concurrent.futures.ThreadPoolExecutor(max_workers=workers) as load_executor,
+        concurrent.futures.ThreadPoolExecutor(max_workers=workers) as close_executor,
+    ):
+        # Keep a bounded number of scenes loading ahead of the renderer.
+        pending_scenes: collections.deque[concurrent.futures.Future] = collections.deque()
+        pending_videos: collections.deque[concurrent.futures.Future] = collections.deque()
+        scene_iterator = iter(scene_paths)
+
+        def _prefetch() -> None:
+            while len(pending_scenes) < 2 * workers:
+                scene_path = next(scene_iterator, None)
+                if scene_path is None:
+                    return
+                pending_scenes.append(load_executor.submit(load_ply, scene_path))
+
+        _prefetch()
+        for scene_path in scene_paths:
+            future = pending_scenes.popleft()
+            _prefetch()
+            LOGGER.info("Rendering %s", scene_path)
+            try:
+                gaussians, metadata = future.result()
+            except Exception:
+                LOGGER.exception("Failed to load %s.", scene_path)
+                num_failures += 1
+                continue
+
+            video_writer = io.VideoWriter(_get_video_path(scene_path), asynchronous=True)
+            failed = False
+            try:
+                num_frames += render_trajectory(gaussians, metadata, video_writer, params)
+            except Exception:
+                LOGGER.exception("Failed to render %s.", scene_path)
+                failed = True
+
+            # Let the encoders of this scene finish while the next scene renders, but
+            # bound the number of open videos.
+            pending_videos.append(
+                close_executor.submit(_close_video, video_writer, scene_path, failed)
+            )
+            while len(pending_videos) > workers:
+                num_failures += not pending_videos.popleft().result()
+        for future in pending_videos:
+            num_failures += not future.result()
+
+    elapsed_time = time.perf_counter() - start_time
+    num_rendered = len(scene_paths) - num_failures
+    LOGGER.info(
+        "Rendered %d scenes (%d frames, %d failed) in %.1fs: %.2f scenes/min, %.2f frames/s.",
+        num_rendered,
+        num_frames,
+        num_failures,
+        elapsed_time,
+        60.0 * num_rendered / max(elapsed_time, 1e-6),
+        num_frames / max(elapsed_time, 1e-6),
+    )
+
+
+def _close_video(video_writer: io.VideoWriter, scene_path: Path, failed: bool) -> bool:
+    """Finish a video and delete the outputs of failed scenes.
+
+    Partial videos are deleted, so that --skip-existing renders the scene again.
+
+    Returns:
+        Whether the scene was rendered and encoded successfully.
+    """
+    try:
+        video_writer.close()
+    except Exception:
+        LOGGER.exception("Failed to encode %s.", scene_path)
+        failed = True
+
+    if failed:
+        video_path = video_writer.output_path
+        for path in (video_path, video_path.with_suffix(".depth.mp4")):
+            path.unlink(missing_ok=True)
+    return not failed
 
 
 def render_gaussians(
@@ -72,18 +170,42 @@ def render_gaussians(
     metadata: SceneMetaData,
     output_path: Path,
     params: camera.TrajectoryParams | None = None,
+    num_views_per_batch: int = 8,
 ) -> None:
     """Render a single gaussian checkpoint file."""
+    video_writer = io.VideoWriter(output_path, asynchronous=True)
+    try:
+        render_trajectory(gaussians, metadata, video_writer, params, num_views_per_batch)
+    finally:
+        video_writer.close()
+
+
+def render_trajectory(
+    gaussians: Gaussians3D,
+    metadata: SceneMetaData,
+    video_writer: io.OutputWriter,
+    params: camera.TrajectoryParams | None = None,
+    num_views_per_batch: int = 8,
+) -> int:
+    """Render a camera trajectory of a scene into an (open) output writer.
+
+    The scene is moved to the render device once and the trajectory is rendered in
+    batches of num_views_per_batch cameras.
+
+    Returns:
+        The number of rendered frames.
+    """
     (width, height) = metadata.resolution_px
     f_px = metadata.focal_length_px
 
     if params is None:
         params = camera.TrajectoryParams()
 
-    if not torch.cuda.is_available():
-        raise RuntimeError("Rendering a checkpoint requires CUDA.")
-
-    device = torch.device("cuda")
+    if torch.cuda.is_available():
+        device = torch.device("cuda")
+    else:
+        LOGGER.info("CUDA is not available. Rendering with the (slower) CPU rasterizer.")
+        device = torch.device("cpu")
 
     intrinsics = torch.tensor(
         [
@@ -95,26 +217,36 @@ def render_gaussians(
         device=device,
         dtype=torch.float32,
     )
+    # Scene statistics are stored in PLY files written by `sharp predict`, compute them
+    # once for all camera code otherwise.
+    statistics = metadata.statistics
+    if statistics is None:
+        statistics = compute_scene_statistics(gaussians)
     camera_model = camera.create_camera_model(
-        gaussians, intrinsics, resolution_px=metadata.resolution_px
+        gaussians, intrinsics, resolution_px=metadata.resolution_px, statistics=statistics
     )
 
     trajectory = camera.create_eye_trajectory(
-        gaussians, params, resolution_px=metadata.resolution_px, f_px=f_px
+        gaussians, params, resolution_px=metadata.resolution_px, f_px=f_px, statistics=statistics
     )
+    camera_info = camera_model.compute(trajectory)
     renderer = gsplat.GSplatRenderer(color_space=metadata.color_space)
-    video_writer = io.VideoWriter(output_path)
-
-    for _, eye_position in enumerate(trajectory):
-        camera_info = camera_model.compute(eye_position)
-        rendering_output = renderer(
-            gaussians.to(device),
-            extrinsics=camera_info.extrinsics[None].to(device),
-            intrinsics=camera_info.intrinsics[None].to(device),
+    if device.type != "cpu" and len(gaussians.mean_vectors) == 1:
+        # Upload the scene as a single packed buffer instead of one copy per attribute.
+        gaussians = PackedGaussians.from_gaussians(gaussians).to(device).to_gaussians()
+    else:
+        gaussians = gaussians.to(device)
+
+    for start in range(0, len(trajectory), num_views_per_batch):
+        end = start + num_views_per_batch
+        rendering_output = renderer.render_views(
+            gaussians,
+            extrinsics=camera_info.extrinsics[start:end].to(device),
+            intrinsics=camera_info.intrinsics[start:end].to(device),
             image_width=camera_info.width,
             image_height=camera_info.height,
         )
-        color = (rendering_output.color[0].permute(1, 2, 0) * 255.0).to(dtype=torch.uint8)
-        depth = rendering_output.depth[0]
-        video_writer.add_frame(color, depth)
-    video_writer.close()
+        colors = (rendering_output.color.permute(0, 2, 3, 1) * 255.0).to(dtype=torch.uint8)
+        for color, depth in zip(colors, rendering_output.depth):
+            video_writer.add_frame(color, depth)
+    return len(trajectory)
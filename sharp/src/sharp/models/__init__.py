@@ -7,6 +7,7 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 from __future__ import annotations
 
 from sharp.models.monodepth import (
+    MonodepthWithEncodingAdaptor,
     create_monodepth_adaptor,
     create_monodepth_dpt,
 )
@@ -16,9 +17,31 @@ from .composer import GaussianComposer
 from .gaussian_decoder import create_gaussian_decoder
 from .heads import DirectPredictionHead
 from .initializer import create_initializer
-from .params import PredictorParams
+from .params import PredictorParams, PredictorPreset, create_predictor_params
 from .predictor import RGBGaussianPredictor
 
+# Prefix of the monodepth model weights in the state dict of RGBGaussianPredictor.
+MONODEPTH_STATE_DICT_PREFIX = "monodepth_model."
+
+
+def create_monodepth_model(params: PredictorParams) -> MonodepthWithEncodingAdaptor:
+    """Create the monodepth model of a gaussian predictor.
+
+    The weights of the model are stored under MONODEPTH_STATE_DICT_PREFIX in
+    checkpoints of the predictor.
+    """
+    monodepth_model = create_monodepth_dpt(params.monodepth)
+    monodepth_adaptor = create_monodepth_adaptor(
+        monodepth_model,
+        params.monodepth_adaptor,
+        params.num_monodepth_layers,
+        params.sorting_monodepth,
+    )
+
+    if params.num_monodepth_layers == 2:
+        monodepth_adaptor.replicate_head(params.num_monodepth_layers)
+    return monodepth_adaptor
+
 
 def create_predictor(params: PredictorParams) -> RGBGaussianPredictor:
     """Create gaussian predictor model specified by name."""
@@ -41,17 +64,7 @@ def create_predictor(params: PredictorParams) -> RGBGaussianPredictor:
     if params.num_monodepth_layers > 1 and params.initializer.num_layers != 2:
         raise KeyError("We only support num_layers = 2 when num_monodepth_layers > 1.")
 
-    monodepth_model = create_monodepth_dpt(params.monodepth)
-    monodepth_adaptor = create_monodepth_adaptor(
-        monodepth_model,
-        params.monodepth_adaptor,
-        params.num_monodepth_layers,
-        params.sorting_monodepth,
-    )
-
-    if params.num_monodepth_layers == 2:
-        monodepth_adaptor.replicate_head(params.num_monodepth_layers)
-
+    monodepth_adaptor = create_monodepth_model(params)
     gaussian_decoder = create_gaussian_decoder(
         params.gaussian_decoder,
         dims_depth_features=monodepth_adaptor.get_feature_dims(),
@@ -62,7 +75,7 @@ def create_predictor(params: PredictorParams) -> RGBGaussianPredictor:
     prediction_head = DirectPredictionHead(
         feature_dim=gaussian_decoder.dim_out, num_layers=initializer.num_layers
     )
-    decoder_dim = monodepth_model.decoder.dims_decoder[-1]
+    decoder_dim = monodepth_adaptor.monodepth_predictor.decoder.dims_decoder[-1]
     return RGBGaussianPredictor(
         init_model=initializer,
         feature_model=gaussian_decoder,
@@ -74,6 +87,10 @@ def create_predictor(params: PredictorParams) -> RGBGaussianPredictor:
 
 
 __all__ = [
+    "MONODEPTH_STATE_DICT_PREFIX",
     "PredictorParams",
+    "PredictorPreset",
+    "create_monodepth_model",
     "create_predictor",
+    "create_predictor_params",
 ]
@@ -6,6 +6,8 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import functools
+
 import torch
 from torch import nn
 from torch.nn import functional as F
@@ -18,6 +20,7 @@ from sharp.utils.gaussians import Gaussians3D
 from .params import DeltaFactor
 
 
+@functools.lru_cache
 def _get_scale_activation_constant(max_scale: float, min_scale: float) -> tuple[float, float]:
     """Return constants for scale activation function."""
     # To ensure for delta = 0, the value of scale_factor is 1 and the gradient is 1.
@@ -155,51 +158,25 @@ class GaussianComposer(nn.Module):
         )
 
     def _forward_mean(self, base_values: GaussianBaseValues, delta: torch.Tensor) -> torch.Tensor:
-        # Concatenate base vectors and apply mean activation.
-        delta_factor = torch.tensor(
-            [self.delta_factor.xy, self.delta_factor.xy, self.delta_factor.z],
-            device=delta.device,
-        )[None, :, None, None, None]
-
-        dtype = base_values.mean_x_ndc.dtype
-        device = base_values.mean_x_ndc.device
-        target_shape = (1, 3, 1, 1, 1)
-        mean_x_mask = torch.tensor([1.0, 0.0, 0.0], dtype=dtype, device=device).reshape(
-            target_shape
-        )
-        mean_y_mask = torch.tensor([0.0, 1.0, 0.0], dtype=dtype, device=device).reshape(
-            target_shape
-        )
-        mean_z_mask = torch.tensor([0.0, 0.0, 1.0], dtype=dtype, device=device).reshape(
-            target_shape
-        )
-
-        mean_vectors_ndc = (
-            base_values.mean_x_ndc.repeat(target_shape) * mean_x_mask
-            + base_values.mean_y_ndc.repeat(target_shape) * mean_y_mask
-            + base_values.mean_inverse_z_ndc.repeat(target_shape) * mean_z_mask
-        )
-
-        mean_vectors = self._mean_activation(mean_vectors_ndc, delta_factor * delta[:, :3])
-        return mean_vectors
-
-    def _mean_activation(self, base: torch.Tensor, learned_delta: torch.Tensor) -> torch.Tensor:
         """Mean activation function.
 
+        The base values broadcast against the deltas, so they are never materialized
+        for the full batch.
+
         Args:
-            base: Tensor of shape [B, 3, H, W], where first two feature dimensions
-                (x,y) are in normalized device coordinates (NDC) where (-1, -1) is
-                the top, while the third dimension is inverse depth.
-            learned_delta: Tensor of shape [B, 3, H, W] with predicted delta values.
+            base_values: The gaussian base values, where x and y are in normalized device
+                coordinates (NDC) where (-1, -1) is the top, and z is inverse depth.
+            delta: Tensor of shape [B, C, N, H, W] with predicted delta values, of which
+                the first three channels offset the mean.
 
         Returns:
             Returns: The final mean vector after combining base and delta and applying nonlinearies.
         """
-        xx = base[:, 0:1] + learned_delta[:, 0:1]
-        yy = base[:, 1:2] + learned_delta[:, 1:2]
+        xx = base_values.mean_x_ndc + self.delta_factor.xy * delta[:, 0:1]
+        yy = base_values.mean_y_ndc + self.delta_factor.xy * delta[:, 1:2]
 
-        a = base[:, 2:3]
-        b = learned_delta[:, 2:3]
+        a = base_values.mean_inverse_z_ndc
+        b = self.delta_factor.z * delta[:, 2:3]
 
         # Original formula:
         inverse_zz = F.softplus(math_utils.inverse_softplus(a) + b)
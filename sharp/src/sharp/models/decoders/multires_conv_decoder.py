@@ -94,8 +94,16 @@ class MultiresConvDecoder(BaseDecoder):
         """Enable grad checkpointing."""
         self.grad_checkpointing = is_enabled
 
-    def forward(self, encodings: list[torch.Tensor]) -> torch.Tensor:
-        """Decode the multi-resolution encodings."""
+    def forward(
+        self, encodings: list[torch.Tensor], release_encodings: bool = False
+    ) -> torch.Tensor:
+        """Decode the multi-resolution encodings.
+
+        Args:
+            encodings: The encodings from the highest to the lowest resolution.
+            release_encodings: Whether to remove each encoding from the list once it is
+                projected, so it can be freed before the next level is decoded.
+        """
         num_levels = len(encodings)
         num_encoders = len(self.dims_encoder)
 
@@ -108,9 +116,16 @@ class MultiresConvDecoder(BaseDecoder):
         # Project features of different encoder dims to the same decoder dim.
         # Fuse features from the lowest resolution (num_levels-1)
         # to the highest (0).
-        features = self.convs[-1](encodings[-1])
+        # Encodings may have been offloaded to host memory to reduce the peak memory,
+        # see RGBGaussianPredictor.set_low_memory(). Move them back one at a time.
+        device = next(self.fusions.parameters()).device
+        encoding = encodings.pop() if release_encodings else encodings[-1]
+        features = self.convs[-1](encoding.to(device, non_blocking=True))
+        del encoding
         features = checkpoint_wrapper(self, self.fusions[-1], features)
         for i in range(num_levels - 2, -1, -1):
-            features_i = self.convs[i](encodings[i])
+            encoding = encodings.pop() if release_encodings else encodings[i]
+            features_i = self.convs[i](encoding.to(device, non_blocking=True))
+            del encoding
             features = checkpoint_wrapper(self, self.fusions[i], features, features_i)
         return features
@@ -12,10 +12,11 @@ from .monodepth_encoder import (
 )
 from .spn_encoder import SlidingPyramidNetwork
 from .unet_encoder import UNetEncoder
-from .vit_encoder import create_vit
+from .vit_encoder import TimmViT, create_vit
 
 __all__ = [
     "create_vit",
+    "TimmViT",
     "BaseEncoder",
     "UNetEncoder",
     "SlidingPyramidNetwork",
@@ -14,6 +14,7 @@ import torch.nn as nn
 from sharp.models.presets import (
     MONODEPTH_ENCODER_DIMS_MAP,
     MONODEPTH_HOOK_IDS_MAP,
+    AttentionBackend,
     ViTPreset,
 )
 
@@ -27,6 +28,8 @@ def create_monodepth_encoder(
     image_encoder_preset: ViTPreset,
     use_patch_overlap: bool = True,
     last_encoder: int = 256,
+    patch_batch_size: int | None = None,
+    attention_backend: AttentionBackend = "auto",
 ) -> SlidingPyramidNetwork:
     """Creates DepthDensePredictionTransformer model.
 
@@ -35,6 +38,8 @@ def create_monodepth_encoder(
         image_encoder_preset: The preset image encoder architecture in SPN.
         use_patch_overlap: Whether to use overlap between patches in SPN.
         last_encoder: last number of encoder features.
+        patch_batch_size: Maximum number of patches to encode at once.
+        attention_backend: The attention kernel of both ViT backbones.
     """
     dims_encoder = [last_encoder] + MONODEPTH_ENCODER_DIMS_MAP[patch_encoder_preset]
     patch_encoder_block_ids = MONODEPTH_HOOK_IDS_MAP[patch_encoder_preset]
@@ -43,10 +48,12 @@ def create_monodepth_encoder(
         preset=patch_encoder_preset,
         intermediate_features_ids=patch_encoder_block_ids,
         # We always need to output intermediate features for assembly.
+        attention_backend=attention_backend,
     )
     image_encoder = create_vit(
         preset=image_encoder_preset,
         intermediate_features_ids=None,
+        attention_backend=attention_backend,
     )
 
     encoder = SlidingPyramidNetwork(
@@ -54,6 +61,7 @@ def create_monodepth_encoder(
         patch_encoder=patch_encoder,
         image_encoder=image_encoder,
         use_patch_overlap=use_patch_overlap,
+        patch_batch_size=patch_batch_size,
     )
 
     return encoder
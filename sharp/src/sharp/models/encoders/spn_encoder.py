@@ -14,6 +14,7 @@ import torch.fx
 import torch.nn as nn
 import torch.nn.functional as F
 
+from sharp.models.presets import AttentionBackend
 from sharp.utils.training import checkpoint_wrapper
 
 from .base_encoder import BaseEncoder
@@ -42,6 +43,7 @@ class SlidingPyramidNetwork(BaseEncoder):
         patch_encoder: TimmViT,
         image_encoder: TimmViT,
         use_patch_overlap: bool = True,
+        patch_batch_size: int | None = None,
     ):
         """Initialize Sliding Pyramid Network.
 
@@ -56,6 +58,9 @@ class SlidingPyramidNetwork(BaseEncoder):
             patch_encoder: Backbone used for highres part of the pyramid.
             image_encoder: Backbone used for lowres part of the pyramid.
             use_patch_overlap: Whether to use overlap between patches in SPN.
+            patch_batch_size: Maximum number of patches to encode at once. Bounds the
+                peak activation memory of the patch encoder. None encodes all patches
+                in a single batch.
         """
         super().__init__()
 
@@ -71,6 +76,9 @@ class SlidingPyramidNetwork(BaseEncoder):
 
         self.grad_checkpointing = False
         self.use_patch_overlap = use_patch_overlap
+        if patch_batch_size is not None and patch_batch_size < 1:
+            raise ValueError("Patch batch size must be positive.")
+        self.patch_batch_size = patch_batch_size
 
         # Retrieve intermediate feature ids registered in create_monodepth_encoder.
         self.patch_intermediate_features_ids = patch_encoder.intermediate_features_ids
@@ -165,6 +173,12 @@ class SlidingPyramidNetwork(BaseEncoder):
         self.patch_encoder.set_grad_checkpointing(is_enabled)
         self.image_encoder.set_grad_checkpointing(is_enabled)
 
+    @torch.jit.ignore
+    def set_attention_backend(self, attention_backend: AttentionBackend):
+        """Select the attention kernel of both ViT backbones."""
+        self.patch_encoder.set_attention_backend(attention_backend)
+        self.image_encoder.set_attention_backend(attention_backend)
+
     @torch.jit.ignore
     def set_requires_grad_(self, patch_encoder: bool, image_encoder: bool):
         """Set requires grad for separate components."""
@@ -246,25 +260,29 @@ class SlidingPyramidNetwork(BaseEncoder):
         # be preserved during graph transformation, leading to unexpected behavior.
         # To avoid such issues it is safer not to use them because they are not
         # essential here.
-        x_pyramid_encodings, patch_intermediate_features = self.patch_encoder(x_pyramid_patches)
+        if self.patch_batch_size is None:
+            x_pyramid_encodings, patch_intermediate_features = self.patch_encoder(x_pyramid_patches)
+            # NOTE: list type check has completed in init.
+            x_latent0_encodings = self.patch_encoder.reshape_feature(
+                patch_intermediate_features[self.patch_intermediate_features_ids[0]]  # type:ignore[index]
+            )[:x0_tile_size]
+            x_latent1_encodings = self.patch_encoder.reshape_feature(
+                patch_intermediate_features[self.patch_intermediate_features_ids[1]]  # type:ignore[index]
+            )[:x0_tile_size]
+        else:
+            x_pyramid_encodings, x_latent0_encodings, x_latent1_encodings = (
+                self._encode_patches_in_batches(x_pyramid_patches, x0_tile_size)
+            )
 
         # Step 3: merging.
         # Merge highres latent encoding.
-        # NOTE: list type check has completed in init.
-        x_latent0_encodings = self.patch_encoder.reshape_feature(
-            patch_intermediate_features[self.patch_intermediate_features_ids[0]]  # type:ignore[index]
-        )
         x_latent0_features = merge(
-            x_latent0_encodings[: batch_size * x0_tile_size],
+            x_latent0_encodings,
             batch_size=batch_size,
             padding=padding,
         )
-
-        x_latent1_encodings = self.patch_encoder.reshape_feature(
-            patch_intermediate_features[self.patch_intermediate_features_ids[1]]  # type:ignore[index]
-        )
         x_latent1_features = merge(
-            x_latent1_encodings[: batch_size * x0_tile_size],
+            x_latent1_encodings,
             batch_size=batch_size,
             padding=padding,
         )
@@ -311,59 +329,123 @@ class SlidingPyramidNetwork(BaseEncoder):
 
         return output
 
+    def _encode_patches_in_batches(
+        self, patches: torch.Tensor, num_latent_patches: int
+    ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Run the patch encoder on batches of at most patch_batch_size patches.
+
+        The outputs of each batch are written into preallocated buffers, so only the
+        activations of a single batch are alive at any time.
+
+        Args:
+            patches: All pyramid patches.
+            num_latent_patches: Number of leading (highres) patches to return the
+                latent intermediate features for.
+
+        Returns:
+            The encodings of all patches and the two latent intermediate features of
+            the highres patches.
+        """
+        assert self.patch_batch_size is not None
+        num_patches = len(patches)
+        latent_ids = self.patch_intermediate_features_ids[:2]  # type:ignore[index]
+
+        encodings: torch.Tensor | None = None
+        latent_encodings: list[torch.Tensor | None] = [None, None]
+        for start in range(0, num_patches, self.patch_batch_size):
+            end = min(start + self.patch_batch_size, num_patches)
+            batch_encodings, intermediate_features = self.patch_encoder(patches[start:end])
+            if encodings is None:
+                encodings = batch_encodings.new_empty((num_patches, *batch_encodings.shape[1:]))
+            encodings[start:end] = batch_encodings
+
+            if start >= num_latent_patches:
+                continue
+            num_latent = min(end, num_latent_patches) - start
+            for index, feature_id in enumerate(latent_ids):
+                latent = self.patch_encoder.reshape_feature(intermediate_features[feature_id])
+                if latent_encodings[index] is None:
+                    latent_encodings[index] = latent.new_empty(
+                        (num_latent_patches, *latent.shape[1:])
+                    )
+                latent_encodings[index][start : start + num_latent] = latent[:num_latent]  # type:ignore[index]
+
+        assert encodings is not None
+        assert latent_encodings[0] is not None and latent_encodings[1] is not None
+        return encodings, latent_encodings[0], latent_encodings[1]
+
 
 # It seems that torch.fx.wrap can only be applied to functions, not methods.
 # Hence, split and merge were converted into functions to be marked as atomic
 # operations for symbolic tracing.
 @torch.fx.wrap
 def split(image: torch.Tensor, overlap_ratio: float = 0.25, patch_size: int = 384) -> torch.Tensor:
-    """Split the input into small patches with sliding window."""
-    patch_stride = int(patch_size * (1 - overlap_ratio))
-
-    image_size = image.shape[-1]
-    steps = int(math.ceil((image_size - patch_size) / patch_stride)) + 1
+    """Split the input into small patches with sliding window.
 
-    x_patch_list = []
-    for j in range(steps):
-        j0 = j * patch_stride
-        j1 = j0 + patch_size
+    The patches are ordered by row, column and batch index and are gathered from a
+    strided view of the image with a single copy.
+    """
+    patch_stride = int(patch_size * (1 - overlap_ratio))
 
-        for i in range(steps):
-            i0 = i * patch_stride
-            i1 = i0 + patch_size
-            x_patch_list.append(image[..., j0:j1, i0:i1])
+    _, channels, image_height, image_width = image.shape
+    for image_size in (image_height, image_width):
+        if (image_size - patch_size) % patch_stride != 0:
+            raise ValueError(
+                f"Image size {image_size} cannot be split into patches of size {patch_size} "
+                f"with stride {patch_stride}."
+            )
 
-    return torch.cat(x_patch_list, dim=0)
+    # B x C x rows x cols x patch_size x patch_size view of the sliding windows.
+    patches = image.unfold(2, patch_size, patch_stride).unfold(3, patch_size, patch_stride)
+    return patches.permute(2, 3, 0, 1, 4, 5).reshape(-1, channels, patch_size, patch_size)
 
 
 # Decorator marking function as an atomic operator for symbolic tracing.
 @torch.fx.wrap
 def merge(image_patches: torch.Tensor, batch_size: int, padding: int = 3) -> torch.Tensor:
-    """Merge the patched input into a image with sliding window."""
-    steps = int(math.sqrt(image_patches.shape[0] // batch_size))
+    """Merge the patched input into a image with sliding window.
 
-    idx = 0
-
-    output_list = []
-    for j in range(steps):
-        output_row_list = []
-        for i in range(steps):
-            output = image_patches[batch_size * idx : batch_size * (idx + 1)]
-
-            if padding != 0:
-                if j != 0:
-                    output = output[..., padding:, :]
-                if i != 0:
-                    output = output[..., :, padding:]
-                if j != steps - 1:
-                    output = output[..., :-padding, :]
-                if i != steps - 1:
-                    output = output[..., :, :-padding]
-
-            output_row_list.append(output)
-            idx += 1
-
-        output_row = torch.cat(output_row_list, dim=-1)
-        output_list.append(output_row)
-    output = torch.cat(output_list, dim=-2)
+    Patches are cropped by padding at inner borders. The cropped patches tile the
+    output, which consists of a regular grid of patch interiors surrounded by the
+    outer borders of the first and last patches. Each of these (at most 9) regions is
+    copied from a strided view of the patches, so the number of copies does not
+    depend on the number of patches.
+    """
+    steps = int(math.sqrt(image_patches.shape[0] // batch_size))
+    _, channels, patch_height, patch_width = image_patches.shape
+
+    # B x C x rows x patch_height x cols x patch_width view of the patches. Trailing
+    # patches beyond the steps x steps grid are ignored.
+    patches = (
+        image_patches[: steps * steps * batch_size]
+        .view(steps, steps, batch_size, channels, patch_height, patch_width)
+        .permute(2, 3, 0, 4, 1, 5)
+    )
+
+    output_height, row_regions = _get_merge_regions(steps, patch_height, padding)
+    output_width, col_regions = _get_merge_regions(steps, patch_width, padding)
+    output = image_patches.new_empty(batch_size, channels, output_height, output_width)
+    for patch_rows, rows, output_rows in row_regions:
+        for patch_cols, cols, output_cols in col_regions:
+            source = patches[:, :, patch_rows, rows, patch_cols, cols]
+            target = output[..., output_rows, output_cols]
+            target = target.unflatten(2, source.shape[2:4]).unflatten(4, source.shape[4:6])
+            target.copy_(source)
     return output
+
+
+def _get_merge_regions(
+    steps: int, patch_size: int, padding: int
+) -> tuple[int, list[tuple[slice, slice, slice]]]:
+    """Return the merged size and the (patches, pixels, output pixels) of each region."""
+    output_size = steps * (patch_size - 2 * padding) + 2 * padding
+    if padding == 0:
+        return output_size, [(slice(None), slice(None), slice(None))]
+    return output_size, [
+        # Outer border of the first patch.
+        (slice(0, 1), slice(0, padding), slice(0, padding)),
+        # Interiors of all patches.
+        (slice(None), slice(padding, -padding), slice(padding, -padding)),
+        # Outer border of the last patch.
+        (slice(-1, None), slice(-padding, None), slice(-padding, None)),
+    ]
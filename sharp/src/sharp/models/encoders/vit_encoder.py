@@ -6,15 +6,40 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import contextlib
+import dataclasses
+import functools
 import logging
 
 import timm
 import torch
+from torch.nn.attention import SDPBackend, sdpa_kernel
 
-from sharp.models.presets.vit import VIT_CONFIG_DICT, ViTConfig, ViTPreset
+from sharp.models.presets.vit import VIT_CONFIG_DICT, AttentionBackend, ViTConfig, ViTPreset
 
 LOGGER = logging.getLogger(__name__)
 
+# Kernels of scaled_dot_product_attention for attention backends that force one.
+SDPA_BACKENDS: dict[AttentionBackend, SDPBackend] = {
+    "flash": SDPBackend.FLASH_ATTENTION,
+    "efficient": SDPBackend.EFFICIENT_ATTENTION,
+    "math": SDPBackend.MATH,
+}
+
+
+@functools.lru_cache
+def _get_sdpa_backend_error(
+    attention_backend: AttentionBackend, device: torch.device, dtype: torch.dtype, head_dim: int
+) -> str | None:
+    """Run a tiny attention with a forced kernel and return the error if it fails."""
+    query = torch.zeros(1, 1, 8, head_dim, device=device, dtype=dtype)
+    try:
+        with sdpa_kernel(SDPA_BACKENDS[attention_backend]):
+            torch.nn.functional.scaled_dot_product_attention(query, query, query)
+    except RuntimeError as error:
+        return str(error).splitlines()[0]
+    return None
+
 
 class TimmViT(timm.models.VisionTransformer):
     """Contains TIMM implementation for Vanilla ViT."""
@@ -43,6 +68,45 @@ class TimmViT(timm.models.VisionTransformer):
         self.dim_in = config.in_chans
         self.intermediate_features_ids = config.intermediate_features_ids
 
+        self.set_attention_backend(config.attention_backend)
+
+    @torch.jit.ignore
+    def set_attention_backend(self, attention_backend: AttentionBackend) -> None:
+        """Select the attention kernel of all blocks.
+
+        "auto" keeps the default of timm, which respects TIMM_FUSED_ATTN. The forced
+        kernels ("flash", "efficient") raise an error in forward if they do not support
+        the device or dtype, e.g. flash attention on CUDA requires float16 or bfloat16
+        inputs and memory-efficient attention is not available on CPU.
+        """
+        self.attention_backend = attention_backend
+        if attention_backend == "auto":
+            fused_attn = timm.layers.use_fused_attn()
+        else:
+            fused_attn = attention_backend != "eager"
+        for block in self.blocks:
+            block.attn.fused_attn = fused_attn
+
+    @torch.jit.ignore
+    def _check_attention_backend(self, x: torch.Tensor) -> None:
+        """Raise a clear error if the forced attention kernel cannot run on the input."""
+        if self.attention_backend not in SDPA_BACKENDS or torch.compiler.is_compiling():
+            return
+        error = _get_sdpa_backend_error(
+            self.attention_backend, x.device, x.dtype, self.blocks[0].attn.head_dim
+        )
+        if error is not None:
+            raise RuntimeError(
+                f"Attention backend '{self.attention_backend}' does not support "
+                f"{x.dtype} inputs on {x.device}. Use 'auto' or 'math' instead. "
+                f"Reason: {error}"
+            )
+
+    def _attention_context(self) -> contextlib.AbstractContextManager:
+        if self.attention_backend in SDPA_BACKENDS:
+            return sdpa_kernel(SDPA_BACKENDS[self.attention_backend])
+        return contextlib.nullcontext()
+
     def reshape_feature(self, embeddings: torch.Tensor):
         """Discard class token and reshape 1D feature map to a 2D grid."""
         batch_size, seq_len, channel = embeddings.shape
@@ -74,10 +138,15 @@ class TimmViT(timm.models.VisionTransformer):
         x = self.patch_drop(x)
         x = self.norm_pre(x)
 
-        for idx, block in enumerate(self.blocks):
-            x = block(x)
-            if self.intermediate_features_ids is not None and idx in self.intermediate_features_ids:
-                intermediate_features[idx] = x
+        self._check_attention_backend(x)
+        with self._attention_context():
+            for idx, block in enumerate(self.blocks):
+                x = block(x)
+                if (
+                    self.intermediate_features_ids is not None
+                    and idx in self.intermediate_features_ids
+                ):
+                    intermediate_features[idx] = x
         x = self.norm(x)
 
         x = self.reshape_feature(x)
@@ -95,8 +164,17 @@ def create_vit(
     config: ViTConfig | None = None,
     preset: ViTPreset | None = "dinov2l16_384",
     intermediate_features_ids: list[int] | None = None,
+    attention_backend: AttentionBackend | None = None,
 ) -> TimmViT:
-    """Factory function for creating a ViT model."""
+    """Factory function for creating a ViT model.
+
+    Args:
+        config: User-defined config, takes precedence over preset.
+        preset: The preset config to use.
+        intermediate_features_ids: The blocks whose outputs to return as intermediate
+            features.
+        attention_backend: The attention backend. Defaults to the one of the config.
+    """
     if config is not None:
         LOGGER.info("Using user-defined config.")
     else:
@@ -105,7 +183,10 @@ def create_vit(
         LOGGER.info("Using preset ViT %s.", preset)
         config = VIT_CONFIG_DICT[preset]
 
-    config.intermediate_features_ids = intermediate_features_ids
+    # Copy the config to not modify the presets.
+    config = dataclasses.replace(config, intermediate_features_ids=intermediate_features_ids)
+    if attention_backend is not None:
+        config.attention_backend = attention_backend
     model = TimmViT(config)
     LOGGER.debug(model)
     return model
@@ -0,0 +1,146 @@
+"""Contains export of the predictor to torch.export programs and ONNX.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Literal
+
+import torch
+from torch import nn
+
+from sharp.utils.gaussians import Gaussians3D
+
+from .predictor import RGBGaussianPredictor
+
+LOGGER = logging.getLogger(__name__)
+
+ExportFormat = Literal["torch_export", "onnx"]
+
+EXPORT_SUFFIXES: dict[ExportFormat, str] = {"torch_export": ".pt2", "onnx": ".onnx"}
+EXPORT_INPUT_NAMES = ("image", "disparity_factor")
+EXPORT_OUTPUT_NAMES = Gaussians3D._fields
+
+
+class ExportablePredictor(nn.Module):
+    """Wrap a predictor to map image and disparity factor to a tuple of tensors.
+
+    Exported programs and ONNX graphs only have flat tensor outputs, so the NDC
+    Gaussians are returned in the order of EXPORT_OUTPUT_NAMES.
+    """
+
+    def __init__(self, predictor: RGBGaussianPredictor):
+        """Initialize ExportablePredictor.
+
+        Args:
+            predictor: The predictor to export.
+        """
+        super().__init__()
+        self.predictor = predictor
+
+    def forward(
+        self, image: torch.Tensor, disparity_factor: torch.Tensor
+    ) -> tuple[torch.Tensor, ...]:
+        """Predict NDC Gaussians as tuple of tensors."""
+        return tuple(self.predictor(image, disparity_factor))
+
+
+def export_predictor(
+    predictor: RGBGaussianPredictor,
+    output_path: Path,
+    export_format: ExportFormat = "torch_export",
+    batch_size: int = 1,
+    internal_shape: tuple[int, int] = (1536, 1536),
+) -> None:
+    """Export a predictor for inference on CPU.
+
+    Args:
+        predictor: The (evaluation mode) predictor to export.
+        output_path: Path to save the .pt2 or .onnx file to.
+        export_format: Whether to save a torch.export program or an ONNX graph.
+        batch_size: The fixed batch size of the exported predictor. The batch
+            dimension cannot be dynamic, since the sliding pyramid network computes
+            the number of patches per image in Python.
+        internal_shape: The (width, height) of the images fed to the predictor.
+    """
+    model = ExportablePredictor(predictor).eval()
+    width, height = internal_shape
+    example_inputs = (
+        torch.rand(batch_size, 3, height, width),
+        torch.full((batch_size,), 0.5),
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if export_format == "torch_export":
+        with torch.no_grad():
+            program = torch.export.export(model, example_inputs)
+        torch.export.save(program, output_path)
+    elif export_format == "onnx":
+        if importlib.util.find_spec("onnxscript") is None:
+            raise ImportError("ONNX export requires onnxscript: pip install onnx onnxscript")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                example_inputs,
+                output_path,
+                input_names=list(EXPORT_INPUT_NAMES),
+                output_names=list(EXPORT_OUTPUT_NAMES),
+                dynamo=True,
+            )
+    else:
+        raise ValueError(f"Unsupported export format {export_format}.")
+    LOGGER.info("Exported predictor to %s.", output_path)
+
+
+class ExportedPredictor:
+    """Runs an exported predictor as drop-in replacement of RGBGaussianPredictor.
+
+    Programs saved by torch.export run on any torch device, ONNX graphs run on CPU
+    with onnxruntime.
+    """
+
+    def __init__(self, path: Path, device: torch.device | str = "cpu"):
+        """Initialize ExportedPredictor.
+
+        Args:
+            path: Path to the .pt2 or .onnx file written by export_predictor().
+            device: The device to run the program on.
+        """
+        self.path = path
+        self.device = torch.device(device)
+        if path.suffix == EXPORT_SUFFIXES["onnx"]:
+            if self.device.type != "cpu":
+                raise ValueError("ONNX models are only supported on CPU.")
+            try:
+                import onnxruntime
+            except ImportError as error:
+                raise ImportError(
+                    "Running ONNX models requires onnxruntime: pip install onnxruntime"
+                ) from error
+            self._session = onnxruntime.InferenceSession(
+                str(path), providers=["CPUExecutionProvider"]
+            )
+            self._module = None
+        else:
+            self._session = None
+            self._module = torch.export.load(path).module().to(self.device)
+
+    def __call__(self, image: torch.Tensor, disparity_factor: torch.Tensor) -> Gaussians3D:
+        """Predict NDC Gaussians, see RGBGaussianPredictor.forward()."""
+        if self._session is not None:
+            outputs = self._session.run(
+                list(EXPORT_OUTPUT_NAMES),
+                {
+                    "image": image.detach().cpu().numpy(),
+                    "disparity_factor": disparity_factor.detach().cpu().numpy(),
+                },
+            )
+            return Gaussians3D(*(torch.from_numpy(output) for output in outputs))
+        else:
+            assert self._module is not None
+            with torch.no_grad():
+                return Gaussians3D(*self._module(image, disparity_factor))
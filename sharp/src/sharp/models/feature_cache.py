@@ -0,0 +1,179 @@
+"""Contains an on-disk cache of monodepth outputs for repeated predictions.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Literal
+
+import torch
+from torch import nn
+
+from .monodepth import MonodepthOutput, MonodepthWithEncodingAdaptor
+
+LOGGER = logging.getLogger(__name__)
+
+# "original" stores the features in the dtype of the model, so cached predictions
+# match uncached ones. "float16" halves the size of the cache, but rounds the features.
+# The disparity is always stored in the dtype of the model, since it determines the
+# positions of the Gaussians and is small in comparison.
+FeatureCacheDType = Literal["original", "float16"]
+
+
+def compute_weights_version(module: nn.Module) -> str:
+    """Return a hash of the weights of a module to key cached outputs with."""
+    hasher = hashlib.blake2b(digest_size=8)
+
+    def _update(name: str, value: Any) -> None:
+        hasher.update(name.encode())
+        if isinstance(value, torch.Tensor):
+            if value.is_quantized:
+                value = value.int_repr()
+            hasher.update(value.detach().cpu().contiguous().view(torch.uint8).numpy().data)
+        elif isinstance(value, (tuple, list)):
+            for index, item in enumerate(value):
+                _update(f"{name}.{index}", item)
+        else:
+            hasher.update(repr(value).encode())
+
+    for name, value in module.state_dict().items():
+        _update(name, value)
+    return hasher.hexdigest()
+
+
+class MonodepthFeatureCache:
+    """Disk cache of monodepth outputs keyed by input image and monodepth weights.
+
+    Only the outputs the predictor consumes at inference are stored: the disparity,
+    the encoder features and, if the model returns them, the decoder features. The
+    least recently used entries are deleted once the cache exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        weights_version: str,
+        max_bytes: int | None = None,
+        feature_dtype: FeatureCacheDType = "original",
+    ):
+        """Initialize MonodepthFeatureCache.
+
+        Args:
+            cache_dir: The directory to store the cached outputs in.
+            weights_version: Version of the monodepth weights, see
+                compute_weights_version().
+            max_bytes: Maximum size of the cache directory.
+            feature_dtype: The dtype to store the features in.
+        """
+        self.cache_dir = cache_dir
+        self.weights_version = weights_version
+        self.max_bytes = max_bytes
+        self.feature_dtype = feature_dtype
+        self.num_hits = 0
+        self.num_misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of all cached outputs on disk."""
+        return sum(path.stat().st_size for path in self.cache_dir.glob("*.pt"))
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups which were served from the cache."""
+        num_lookups = self.num_hits + self.num_misses
+        return self.num_hits / num_lookups if num_lookups > 0 else 0.0
+
+    def get_key(self, image: torch.Tensor) -> str:
+        """Return the cache key of a (preprocessed) input image."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(self.weights_version.encode())
+        # Entries of different feature dtypes are kept apart.
+        hasher.update(self.feature_dtype.encode())
+        hasher.update(str((image.dtype, tuple(image.shape))).encode())
+        hasher.update(image.detach().cpu().contiguous().view(torch.uint8).numpy().data)
+        return hasher.hexdigest()
+
+    def get(
+        self, key: str, monodepth_model: MonodepthWithEncodingAdaptor, device: torch.device
+    ) -> MonodepthOutput | None:
+        """Load a cached output to device or return None on a cache miss."""
+        path = self._get_path(key)
+        try:
+            entry = torch.load(path, map_location=device, weights_only=True)
+        except FileNotFoundError:
+            self.num_misses += 1
+            return None
+        self.num_hits += 1
+        # Mark the entry as recently used for the eviction.
+        os.utime(path)
+
+        dtype = entry["disparity"].dtype
+        encoder_features = [feature.to(dtype) for feature in entry["encoder_features"]]
+        decoder_features = entry.get("decoder_features")
+        if decoder_features is not None:
+            decoder_features = decoder_features.to(dtype)
+        return MonodepthOutput(
+            disparity=entry["disparity"],
+            encoder_features=encoder_features,
+            decoder_features=decoder_features,
+            output_features=monodepth_model.get_output_features(encoder_features, decoder_features),
+        )
+
+    def put(
+        self, key: str, output: MonodepthOutput, monodepth_model: MonodepthWithEncodingAdaptor
+    ) -> None:
+        """Store an output of the monodepth model."""
+        entry = {
+            "disparity": output.disparity.detach().cpu(),
+            "encoder_features": [self._to_storage(feature) for feature in output.encoder_features],
+        }
+        if monodepth_model.return_decoder_features:
+            entry["decoder_features"] = self._to_storage(output.decoder_features)
+
+        path = self._get_path(key)
+        # Write to a temporary file first to never leave a truncated entry behind.
+        tmp_path = path.with_suffix(".tmp")
+        torch.save(entry, tmp_path)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def log_statistics(self) -> None:
+        """Log the size and hit rate of the cache."""
+        LOGGER.info(
+            "Feature cache: %d hits, %d misses (hit rate %.0f%%), %.1fMB in %s.",
+            self.num_hits,
+            self.num_misses,
+            100.0 * self.hit_rate,
+            self.nbytes / 1024**2,
+            self.cache_dir,
+        )
+
+    def _to_storage(self, feature: torch.Tensor) -> torch.Tensor:
+        feature = feature.detach().cpu()
+        if self.feature_dtype == "float16":
+            return feature.to(torch.float16)
+        return feature
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pt"
+
+    def _evict(self) -> None:
+        if self.max_bytes is None:
+            return
+        entries = [(path, path.stat()) for path in self.cache_dir.glob("*.pt")]
+        entries.sort(key=lambda entry: entry[1].st_mtime)
+        nbytes = sum(stat.st_size for _, stat in entries)
+        # Always keep the most recent entry.
+        for path, stat in entries[:-1]:
+            if nbytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            nbytes -= stat.st_size
+            LOGGER.debug("Evicted cached features %s.", path.name)
@@ -237,14 +237,26 @@ class GaussianDensePredictionTransformer(nn.Module):
         else:
             raise ValueError(f"Unsupported image encoder type: {self.image_encoder_type}")
 
-    def forward(self, input_features: torch.Tensor, encodings: list[torch.Tensor]) -> ImageFeatures:
+    def forward(
+        self,
+        input_features: torch.Tensor,
+        encodings: list[torch.Tensor],
+        release_encodings: bool = False,
+    ) -> ImageFeatures:
         """Run monodepth and fuse features with input image to predict Gaussians.
 
         Args:
             input_features: The input features to use.
             encodings: Feature encodings (e.g. from monodepth network).
+            release_encodings: Whether the decoder removes each encoding from the list
+                once it is consumed, so it can be freed before the next decoder level.
+                Requires a MultiresConvDecoder.
         """
-        features = self.decoder(encodings).contiguous()
+        if release_encodings:
+            features = self.decoder(encodings, release_encodings=True)
+        else:
+            features = self.decoder(encodings)
+        features = features.contiguous()
         features = self.upsample(features)
 
         if self.use_depth_input:
@@ -252,6 +264,7 @@ class GaussianDensePredictionTransformer(nn.Module):
         else:
             skip_features = self.image_encoder(input_features[:, :3].contiguous())
         features = self.fusion(features, skip_features)
+        del skip_features
 
         texture_features = self.texture_head(features)
         geometry_features = self.geometry_head(features)
@@ -69,7 +69,9 @@ class MultiLayerInitializer(nn.Module):
         batch_size x dim x num_layers x height x width
 
     where dim indicates the dimensionality of the property.
-    Some of the dimensions might be set to 1 for efficiency reasons.
+    Some of the dimensions might be set to 1 for efficiency reasons. Base values which
+    are identical across the batch or layers are broadcast views, which are created
+    anew on every call. Clone them before modifying them in place.
     """
 
     def __init__(
@@ -152,8 +154,8 @@ class MultiLayerInitializer(nn.Module):
         def _create_disparity_layers(num_layers: int = 1) -> torch.Tensor:
             """Create multiple disparity layers."""
             disparity = torch.linspace(1.0 / self.base_depth, 0.0, num_layers + 1, device=device)
-            return disparity[None, None, :-1, None, None].repeat(
-                batch_size, 1, 1, base_height, base_width
+            return disparity[None, None, :-1, None, None].expand(
+                batch_size, 1, num_layers, base_height, base_width
             )
 
         def _create_surface_layer(
@@ -231,7 +233,7 @@ class MultiLayerInitializer(nn.Module):
             base_colors[:, :, 0] = torch.nn.functional.avg_pool2d(image, self.stride, self.stride)
         elif self.color_option == "all_layers":
             temp = torch.nn.functional.avg_pool2d(image, self.stride, self.stride)
-            base_colors = temp[:, :, None, :, :].repeat(1, 1, self.num_layers, 1, 1)
+            base_colors = temp[:, :, None, :, :].expand(-1, -1, self.num_layers, -1, -1)
         else:
             raise ValueError(f"Unknown color init option: {self.color_option}.")
 
@@ -256,7 +258,10 @@ class MultiLayerInitializer(nn.Module):
 def _create_base_xy(
     depth: torch.Tensor, stride: int, num_layers: int
 ) -> tuple[torch.Tensor, torch.Tensor]:
-    """Create base x and y coordinates for the gaussians in NDC space."""
+    """Create base x and y coordinates for the gaussians in NDC space.
+
+    The coordinates are broadcast views of a single grid per call.
+    """
     device = depth.device
     batch_size, _, image_height, image_width = depth.shape
     xx = torch.arange(0.5 * stride, image_width, stride, device=device)
@@ -265,15 +270,15 @@ def _create_base_xy(
     yy = 2 * yy / image_height - 1.0
 
     xx, yy = torch.meshgrid(xx, yy, indexing="xy")
-    base_x_ndc = xx[None, None, None].repeat(batch_size, 1, num_layers, 1, 1)
-    base_y_ndc = yy[None, None, None].repeat(batch_size, 1, num_layers, 1, 1)
+    base_x_ndc = xx[None, None, None].expand(batch_size, 1, num_layers, -1, -1)
+    base_y_ndc = yy[None, None, None].expand(batch_size, 1, num_layers, -1, -1)
 
     return base_x_ndc, base_y_ndc
 
 
 def _create_base_scale(disparity: torch.Tensor, disparity_scale_factor: float) -> torch.Tensor:
     """Create base scale for the gaussians."""
-    inverse_disparity = torch.ones_like(disparity) / disparity
+    inverse_disparity = torch.reciprocal(disparity)
     base_scales = inverse_disparity * disparity_scale_factor
     return base_scales
 
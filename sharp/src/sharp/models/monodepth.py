@@ -120,6 +120,8 @@ def create_monodepth_dpt(
         params.image_encoder_preset,
         use_patch_overlap=params.use_patch_overlap,
         last_encoder=params.dims_decoder[0],
+        patch_batch_size=params.patch_batch_size,
+        attention_backend=params.attention_backend,
     )
 
     decoder: MultiresConvDecoder = create_monodepth_decoder(
@@ -156,8 +158,9 @@ class MonodepthOutput(NamedTuple):
     disparity: torch.Tensor
     # Multi-level features from monodepth encoder.
     encoder_features: list[torch.Tensor]
-    # Single-level feature from monodepth decoder.
-    decoder_features: torch.Tensor
+    # Single-level feature from monodepth decoder. None if restored from a feature
+    # cache which does not store them.
+    decoder_features: torch.Tensor | None
     # List of monodepth features to be used in gaussian predictor.
     output_features: list[torch.Tensor]
     # List of intermediate encoder features to be used in distillation.
@@ -211,21 +214,27 @@ class MonodepthWithEncodingAdaptor(nn.Module):
             second_layer_disparity = disparity.min(dim=1, keepdims=True).values
             disparity = torch.cat([first_layer_disparity, second_layer_disparity], dim=1)
 
-        output_features = []
-        if self.return_encoder_features:
-            output_features.extend(encoder_features)
-
-        if self.return_decoder_features:
-            output_features.append(decoder_features)
-
         return MonodepthOutput(
             disparity=disparity,
             encoder_features=encoder_features,
             decoder_features=decoder_features,
-            output_features=output_features,
+            output_features=self.get_output_features(encoder_features, decoder_features),
             intermediate_features=intermediate_features,
         )
 
+    def get_output_features(
+        self, encoder_features: list[torch.Tensor], decoder_features: torch.Tensor | None
+    ) -> list[torch.Tensor]:
+        """Return the monodepth features to be used in the gaussian predictor."""
+        output_features = []
+        if self.return_encoder_features:
+            output_features.extend(encoder_features)
+
+        if self.return_decoder_features:
+            assert decoder_features is not None
+            output_features.append(decoder_features)
+        return output_features
+
     def get_feature_dims(self) -> list[int]:
         """Return dimensions of output feature maps."""
         dims = []
@@ -9,7 +9,7 @@ from typing import Literal
 
 import sharp.utils.math as math_utils
 from sharp.models.blocks import NormLayerName, UpsamplingMode
-from sharp.models.presets import ViTPreset
+from sharp.models.presets import AttentionBackend, ViTPreset
 from sharp.utils.color_space import ColorSpace
 
 DimsDecoder = tuple[int, int, int, int, int]
@@ -118,6 +118,10 @@ class MonodepthParams:
     grad_checkpointing: bool = False
     use_patch_overlap: bool = True
     dims_decoder: DimsDecoder = (256, 256, 256, 256, 256)
+    # Maximum number of SPN patches to encode at once (None encodes all at once).
+    patch_batch_size: int | None = None
+    # Attention kernel of the ViT encoders.
+    attention_backend: AttentionBackend = "auto"
 
 
 @dataclasses.dataclass
@@ -201,3 +205,45 @@ class PredictorParams:
     sorting_monodepth: bool = False
     # Whether to account the z offsets for estimating base scale.
     base_scale_on_predicted_mean: bool = True
+
+
+PredictorPreset = Literal[
+    # Architecture of the released checkpoint.
+    "sharp",
+    # Tiny architecture to exercise the full pipeline without pretrained weights.
+    "tiny",
+]
+
+
+def create_predictor_params(preset: PredictorPreset = "sharp") -> PredictorParams:
+    """Create predictor parameters for a preset architecture.
+
+    The "tiny" preset replaces the ViT backbones with a 4-block, 64-dim ViT and shrinks
+    all decoders. It does not have a checkpoint and is only meant for debugging and for
+    benchmarking the non-model stages of the pipeline with randomly initialized weights.
+    The internal resolution and number of predicted Gaussians are the same as for the
+    "sharp" preset.
+
+    Args:
+        preset: Which preset to use.
+
+    Returns:
+        The predictor parameters.
+    """
+    if preset == "sharp":
+        return PredictorParams()
+    elif preset == "tiny":
+        return PredictorParams(
+            monodepth=MonodepthParams(
+                patch_encoder_preset="tiny16_384",
+                image_encoder_preset="tiny16_384",
+                dims_decoder=(32, 32, 32, 32, 32),
+            ),
+            gaussian_decoder=GaussianDecoderParams(
+                patch_encoder_preset="tiny16_384",
+                image_encoder_preset="tiny16_384",
+                dims_decoder=(32, 32, 32, 32, 32),
+            ),
+        )
+    else:
+        raise ValueError(f"Unsupported predictor preset: {preset}.")
@@ -11,10 +11,11 @@ import logging
 import torch
 from torch import nn
 
-from sharp.models.monodepth import MonodepthWithEncodingAdaptor
+from sharp.models.monodepth import MonodepthOutput, MonodepthWithEncodingAdaptor
 from sharp.utils.gaussians import Gaussians3D
 
 from .composer import GaussianComposer
+from .feature_cache import MonodepthFeatureCache
 
 LOGGER = logging.getLogger(__name__)
 
@@ -99,6 +100,28 @@ class RGBGaussianPredictor(nn.Module):
         self.prediction_head = prediction_head
         self.gaussian_composer = gaussian_composer
         self.depth_alignment = DepthAlignment(scale_map_estimator)
+        # Optional cache to skip the monodepth model for previously seen images.
+        self.feature_cache: MonodepthFeatureCache | None = None
+        # Low-memory inference, see set_low_memory().
+        self.low_memory = False
+        self.memory_budget_bytes: int | None = None
+
+    def set_low_memory(self, enabled: bool = True, memory_budget_bytes: int | None = None):
+        """Configure low-memory inference.
+
+        In low-memory mode, each monodepth encoding is released as soon as the level
+        of the Gaussian decoder that uses it has run. If the allocated CUDA memory
+        exceeds memory_budget_bytes after the monodepth stage, the largest encodings
+        are moved to pinned host memory. Each of them is moved back to the device just
+        before its decoder level and freed right after it.
+
+        Args:
+            enabled: Whether to enable low-memory inference.
+            memory_budget_bytes: Allocated CUDA memory above which encodings are
+                offloaded. Encodings are never offloaded if None.
+        """
+        self.low_memory = enabled
+        self.memory_budget_bytes = memory_budget_bytes
 
     def forward(
         self,
@@ -124,7 +147,10 @@ class RGBGaussianPredictor(nn.Module):
         model instead to compute depth.
         """
         # Estimate depth and align to ground truth (if available).
-        monodepth_output = self.monodepth_model(image)
+        if self.feature_cache is not None and depth is None:
+            monodepth_output = self._run_monodepth_cached(image)
+        else:
+            monodepth_output = self.monodepth_model(image)
         monodepth_disparity = monodepth_output.disparity
 
         disparity_factor = disparity_factor[:, None, None, None]
@@ -179,18 +205,73 @@ class RGBGaussianPredictor(nn.Module):
             monodepth_output.decoder_features,
         )
 
+        # Only the output features of the monodepth model are used from here on, so
+        # release the remaining outputs (e.g. the decoder features) right away. Each
+        # intermediate below is likewise released after its last consumer.
+        encodings = monodepth_output.output_features
+        del monodepth_output, monodepth_disparity
+        if self.low_memory and self.memory_budget_bytes is not None:
+            encodings = self._offload_encodings(encodings)
+
         init_output = self.init_model(image, monodepth)
+        base_values, global_scale = init_output.gaussian_base_values, init_output.global_scale
         image_features = self.feature_model(
-            init_output.feature_input, encodings=monodepth_output.output_features
+            init_output.feature_input, encodings=encodings, release_encodings=self.low_memory
         )
+        del init_output, encodings
         delta_values = self.prediction_head(image_features)
+        del image_features
         gaussians = self.gaussian_composer(
             delta=delta_values,
-            base_values=init_output.gaussian_base_values,
-            global_scale=init_output.global_scale,
+            base_values=base_values,
+            global_scale=global_scale,
         )
         return gaussians
 
+    @torch.jit.ignore
+    def _offload_encodings(self, encodings: list[torch.Tensor]) -> list[torch.Tensor]:
+        """Move the largest encodings to pinned host memory while over the memory budget.
+
+        The Gaussian decoder moves each encoding back to the device right before the
+        level that consumes it.
+        """
+        assert self.memory_budget_bytes is not None
+        if not encodings or encodings[0].device.type != "cuda":
+            return encodings
+
+        device = encodings[0].device
+        allocated_bytes = torch.cuda.memory_allocated(device)
+        order = sorted(range(len(encodings)), key=lambda index: -encodings[index].nbytes)
+        offloaded = list(encodings)
+        for index in order:
+            if allocated_bytes <= self.memory_budget_bytes:
+                break
+            encoding = encodings[index]
+            host_encoding = torch.empty(
+                encoding.shape, dtype=encoding.dtype, device="cpu", pin_memory=True
+            )
+            host_encoding.copy_(encoding)
+            offloaded[index] = host_encoding
+            allocated_bytes -= encoding.nbytes
+        # Drop the device copies of the offloaded encodings.
+        encodings.clear()
+        LOGGER.debug(
+            "Offloaded %d encodings to host memory.",
+            sum(encoding.device.type == "cpu" for encoding in offloaded),
+        )
+        return offloaded
+
+    @torch.jit.ignore
+    def _run_monodepth_cached(self, image: torch.Tensor) -> MonodepthOutput:
+        """Run the monodepth model unless its output is in the feature cache."""
+        assert self.feature_cache is not None
+        key = self.feature_cache.get_key(image)
+        monodepth_output = self.feature_cache.get(key, self.monodepth_model, image.device)
+        if monodepth_output is None:
+            monodepth_output = self.monodepth_model(image)
+            self.feature_cache.put(key, monodepth_output, self.monodepth_model)
+        return monodepth_output
+
     def internal_resolution(self) -> int:
         """Internal resolution."""
         return self.monodepth_model.internal_resolution()
@@ -10,11 +10,13 @@ from .monodepth import (
 )
 from .vit import (
     VIT_CONFIG_DICT,
+    AttentionBackend,
     ViTConfig,
     ViTPreset,
 )
 
 __all__ = [
+    "AttentionBackend",
     "ViTConfig",
     "ViTPreset",
     "VIT_CONFIG_DICT",
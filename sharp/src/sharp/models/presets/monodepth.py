@@ -13,9 +13,11 @@ from .vit import ViTPreset
 MONODEPTH_ENCODER_DIMS_MAP: dict[ViTPreset, list[int]] = {
     # For publication
     "dinov2l16_384": [256, 512, 1024, 1024],
+    "tiny16_384": [32, 32, 64, 64],
 }
 
 MONODEPTH_HOOK_IDS_MAP: dict[ViTPreset, list[int]] = {
     # For publication
     "dinov2l16_384": [5, 11, 17, 23],
+    "tiny16_384": [0, 1, 2, 3],
 }
@@ -9,10 +9,19 @@ from __future__ import annotations
 import dataclasses
 from typing import Literal
 
-ViTPreset = Literal["dinov2l16_384",]
+ViTPreset = Literal[
+    "dinov2l16_384",
+    # Randomly initialized tiny ViT for debugging and benchmarking.
+    "tiny16_384",
+]
 
 MLPMode = Literal["vanilla", "glu"]
 
+# Attention kernel of the ViT blocks. "auto" lets scaled_dot_product_attention pick the
+# fastest available kernel, "flash", "efficient" and "math" force the respective
+# kernel and "eager" uses the explicit softmax(q @ k^T) @ v implementation of timm.
+AttentionBackend = Literal["auto", "flash", "efficient", "math", "eager"]
+
 
 @dataclasses.dataclass
 class ViTConfig:
@@ -37,6 +46,7 @@ class ViTConfig:
 
     # Properties for timm_vit.
     mlp_mode: MLPMode = "vanilla"
+    attention_backend: AttentionBackend = "auto"
 
     # Properties for SPN.
     intermediate_features_ids: list[int] | None = None
@@ -55,4 +65,13 @@ VIT_CONFIG_DICT: dict[ViTPreset, ViTConfig] = {
         init_values=1e-5,
         global_pool="",
     ),
+    "tiny16_384": ViTConfig(
+        in_chans=3,
+        embed_dim=64,
+        depth=4,
+        num_heads=2,
+        init_values=1e-5,
+        global_pool="",
+        num_classes=0,
+    ),
 }
@@ -0,0 +1,83 @@
+"""Contains int8 quantization of the predictor for CPU inference.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import warnings
+from pathlib import Path
+from typing import Literal
+
+import torch
+from torch import nn
+
+from sharp.models.encoders import TimmViT
+
+LOGGER = logging.getLogger(__name__)
+
+# "dynamic_int8" stores the weights of the ViT linear layers in int8 and quantizes
+# their activations on the fly, so int8 matrix multiplications are used on CPU.
+QuantizationMode = Literal["none", "dynamic_int8"]
+
+
+def quantize_predictor(model: nn.Module, mode: QuantizationMode = "dynamic_int8") -> nn.Module:
+    """Quantize the linear layers of all ViT encoders of a model in place.
+
+    The linear layers of the ViT blocks dominate the compute of the predictor on CPU.
+    The convolutions of the decoders are kept in float32, since dynamic quantization
+    only supports linear layers.
+
+    Quantized models only run on CPU.
+
+    Args:
+        model: The (evaluation mode) model to quantize, e.g. an RGBGaussianPredictor.
+        mode: The quantization mode.
+
+    Returns:
+        The quantized model.
+    """
+    if mode == "none":
+        return model
+    elif mode != "dynamic_int8":
+        raise ValueError(f"Unsupported quantization mode {mode}.")
+
+    vits = [module for module in model.modules() if isinstance(module, TimmViT)]
+    if not vits:
+        raise ValueError("Model does not contain any ViT encoder to quantize.")
+
+    with warnings.catch_warnings():
+        # Eager mode quantization is deprecated in favor of torchao, which we do not
+        # depend on.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.filterwarnings("ignore", message=".*quantize_per_tensor.*")
+        for vit in vits:
+            torch.ao.quantization.quantize_dynamic(
+                vit, {nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+    LOGGER.info("Quantized linear layers of %d ViT encoders to int8.", len(vits))
+    return model
+
+
+def save_quantized_state_dict(model: nn.Module, path: Path) -> None:
+    """Save the state of a quantized model, see load_quantized_state_dict()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first to never leave a truncated artifact behind.
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_quantized_state_dict(
+    model: nn.Module, path: Path, mode: QuantizationMode = "dynamic_int8"
+) -> nn.Module:
+    """Quantize a freshly created model and load a quantized state into it.
+
+    This skips loading the float32 checkpoint and quantizing its weights.
+    """
+    quantize_predictor(model, mode)
+    model.load_state_dict(torch.load(path, weights_only=True))
+    return model
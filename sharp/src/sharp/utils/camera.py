@@ -12,8 +12,14 @@ from typing import Literal, NamedTuple
 import numpy as np
 import torch
 
-from .gaussians import Gaussians3D
+from .gaussians import (
+    SCENE_DEPTH_QUANTILES,
+    Gaussians3D,
+    SceneStatistics,
+    compute_scene_statistics,
+)
 from .linalg import eyes
+from .math import approximate_quantile
 
 TrajetoryType = Literal["swipe", "shake", "rotate", "rotate_forward"]
 LookAtMode = Literal["point", "ahead"]
@@ -55,11 +61,15 @@ def compute_max_offset(
     params: TrajectoryParams,
     resolution_px: tuple[int, int],
     f_px: float,
+    statistics: SceneStatistics | None = None,
 ) -> np.ndarray:
-    """Compute the maximum offset for camera along X/Y/Z axis."""
-    scene_points = scene.mean_vectors
-    extrinsics = torch.eye(4).to(scene_points.device)
-    min_depth, _, _ = _compute_depth_quantiles(scene_points, extrinsics)
+    """Compute the maximum offset for camera along X/Y/Z axis.
+
+    Pass precomputed statistics of the scene to avoid recomputing them.
+    """
+    if statistics is None:
+        statistics = compute_scene_statistics(scene)
+    min_depth = statistics.min_depth
 
     r_px = resolution_px
     diagonal = np.sqrt((r_px[0] / f_px) ** 2 + (r_px[1] / f_px) ** 2)
@@ -76,14 +86,14 @@ def create_eye_trajectory(
     params: TrajectoryParams,
     resolution_px: tuple[int, int],
     f_px: float,
-) -> list[torch.Tensor]:
-    """Create eye trajectory for trajectory type."""
-    max_offset_xyz_m = compute_max_offset(
-        scene,
-        params,
-        resolution_px,
-        f_px,
-    )
+    statistics: SceneStatistics | None = None,
+) -> torch.Tensor:
+    """Create eye trajectory for trajectory type.
+
+    Returns:
+        The eye positions with shape T x 3.
+    """
+    max_offset_xyz_m = compute_max_offset(scene, params, resolution_px, f_px, statistics)
     # We place the eye trajectory at z=distance plane (default=0),
     # assuming portal plane is placed at z=natural_distance.
     if params.type == "swipe":
@@ -111,14 +121,12 @@ def create_eye_trajectory_swipe(
     distance_m: float,
     num_steps: int,
     num_repeats: int,
-) -> list[torch.Tensor]:
+) -> torch.Tensor:
     """Create a left to right swipe trajectory."""
     offset_x_m, _, _ = offset_xyz_m
-    eye_positions = [
-        torch.tensor([x, 0, distance_m], dtype=torch.float32)
-        for x in np.linspace(-offset_x_m, offset_x_m, num_steps)
-    ]
-    return eye_positions * num_repeats
+    x = torch.linspace(-offset_x_m, offset_x_m, num_steps, dtype=torch.float64)
+    eye_positions = _stack_eye_positions(x, torch.zeros_like(x), torch.full_like(x, distance_m))
+    return eye_positions.repeat(num_repeats, 1)
 
 
 def create_eye_trajectory_shake(
@@ -126,30 +134,22 @@ def create_eye_trajectory_shake(
     distance_m: float,
     num_steps: int,
     num_repeats: int,
-) -> list[torch.Tensor]:
+) -> torch.Tensor:
     """Create a left right shake followed by an up down shake trajectory."""
     num_steps_total = num_steps * num_repeats
     num_steps_horizontal = num_steps_total // 2
     num_steps_vertical = num_steps_total - num_steps_horizontal
 
     offset_x_m, offset_y_m, _ = offset_xyz_m
-    eye_positions: list[torch.Tensor] = []
-    eye_positions.extend(
-        torch.tensor(
-            [offset_x_m * np.sin(2 * np.pi * t), 0.0, distance_m],
-            dtype=torch.float32,
-        )
-        for t in np.linspace(0, num_repeats, num_steps_horizontal)
-    )
-    eye_positions.extend(
-        torch.tensor(
-            [0.0, offset_y_m * np.sin(2 * np.pi * t), distance_m],
-            dtype=torch.float32,
-        )
-        for t in np.linspace(0, num_repeats, num_steps_vertical)
-    )
+    t = torch.linspace(0, num_repeats, num_steps_horizontal, dtype=torch.float64)
+    x = offset_x_m * torch.sin(2 * np.pi * t)
+    horizontal = _stack_eye_positions(x, torch.zeros_like(t), torch.full_like(t, distance_m))
+
+    t = torch.linspace(0, num_repeats, num_steps_vertical, dtype=torch.float64)
+    y = offset_y_m * torch.sin(2 * np.pi * t)
+    vertical = _stack_eye_positions(torch.zeros_like(t), y, torch.full_like(t, distance_m))
 
-    return eye_positions
+    return torch.cat([horizontal, vertical])
 
 
 def create_eye_trajectory_rotate(
@@ -157,23 +157,16 @@ def create_eye_trajectory_rotate(
     distance_m: float,
     num_steps: int,
     num_repeats: int,
-) -> list[torch.Tensor]:
+) -> torch.Tensor:
     """Create a rotating trajectory."""
     num_steps_total = num_steps * num_repeats
     offset_x_m, offset_y_m, _ = offset_xyz_m
-    eye_positions = [
-        torch.tensor(
-            [
-                offset_x_m * np.sin(2 * np.pi * t),
-                offset_y_m * np.cos(2 * np.pi * t),
-                distance_m,
-            ],
-            dtype=torch.float32,
-        )
-        for t in np.linspace(0, num_repeats, num_steps_total)
-    ]
-
-    return eye_positions
+    t = torch.linspace(0, num_repeats, num_steps_total, dtype=torch.float64)
+    return _stack_eye_positions(
+        offset_x_m * torch.sin(2 * np.pi * t),
+        offset_y_m * torch.cos(2 * np.pi * t),
+        torch.full_like(t, distance_m),
+    )
 
 
 def create_eye_trajectory_rotate_forward(
@@ -181,23 +174,21 @@ def create_eye_trajectory_rotate_forward(
     distance_m: float,
     num_steps: int,
     num_repeats: int,
-) -> list[torch.Tensor]:
+) -> torch.Tensor:
     """Create a rotating trajectory."""
     num_steps_total = num_steps * num_repeats
     offset_x_m, _, offset_z_m = offset_xyz_m
-    eye_positions = [
-        torch.tensor(
-            [
-                offset_x_m * np.sin(2 * np.pi * t),
-                0.0,
-                distance_m + offset_z_m * (1.0 - np.cos(2 * np.pi * t)) / 2,
-            ],
-            dtype=torch.float32,
-        )
-        for t in np.linspace(0, num_repeats, num_steps_total)
-    ]
+    t = torch.linspace(0, num_repeats, num_steps_total, dtype=torch.float64)
+    return _stack_eye_positions(
+        offset_x_m * torch.sin(2 * np.pi * t),
+        torch.zeros_like(t),
+        distance_m + offset_z_m * (1.0 - torch.cos(2 * np.pi * t)) / 2,
+    )
 
-    return eye_positions
+
+def _stack_eye_positions(x: torch.Tensor, y: torch.Tensor, z: torch.Tensor) -> torch.Tensor:
+    # Positions are computed in double precision like the original numpy trajectories.
+    return torch.stack([x, y, z], dim=-1).to(torch.float32)
 
 
 def create_camera_model(
@@ -205,6 +196,7 @@ def create_camera_model(
     intrinsics: torch.Tensor,
     resolution_px: tuple[int, int],
     lookat_mode: LookAtMode = "point",
+    statistics: SceneStatistics | None = None,
 ) -> PinholeCameraModel:
     """Create camera model to simulate general pinhole camera."""
     screen_extrinsics = torch.eye(4)
@@ -226,6 +218,7 @@ def create_camera_model(
         focus_depth_quantile=0.1,
         min_depth_focus=2.0,
         lookat_mode=lookat_mode,
+        statistics=statistics,
     )
     return camera_model
 
@@ -281,6 +274,7 @@ class PinholeCameraModel:
         min_depth_focus: float = 2.0,
         lookat_point: tuple[float, float, float] | None = None,
         lookat_mode: LookAtMode = "point",
+        statistics: SceneStatistics | None = None,
     ) -> None:
         """Initialize GeneralPinholeCameraModel.
 
@@ -294,6 +288,8 @@ class PinholeCameraModel:
             lookat_point: a point that the camera's Z axis directs towards.
             lookat_mode: "point" to look at a fixed point,
                 "ahead" to look straight ahead.
+            statistics: Precomputed statistics of the scene in the frame of
+                screen_extrinsics. Only used with the default focus_depth_quantile.
         """
         self.scene = scene
         self.screen_extrinsics = screen_extrinsics
@@ -312,14 +308,22 @@ class PinholeCameraModel:
             raise ValueError("Unsupported dimensionality of scene points.")
         self._scene_points = scene_points.cpu()
 
-        self.depth_quantiles = _compute_depth_quantiles(
-            self._scene_points,
-            self.screen_extrinsics,
-            q_focus=self.focus_depth_quantile,
-        )
+        if statistics is not None and focus_depth_quantile == SCENE_DEPTH_QUANTILES[1]:
+            self.depth_quantiles = FocusRange(*statistics)
+        else:
+            self.depth_quantiles = _compute_depth_quantiles(
+                self._scene_points,
+                self.screen_extrinsics,
+                q_focus=self.focus_depth_quantile,
+            )
 
     def compute(self, eye_pos: torch.Tensor) -> CameraInfo:
-        """Compute camera for eye position."""
+        """Compute camera for eye position.
+
+        Args:
+            eye_pos: The eye position with shape 3 or a trajectory with shape T x 3, in
+                which case the camera info holds batches of T intrinsics and extrinsics.
+        """
         extrinsics = self.screen_extrinsics.clone()
 
         origin = eye_pos if self.lookat_mode == "ahead" else torch.zeros(3)
@@ -337,7 +341,7 @@ class PinholeCameraModel:
         extrinsics = extrinsics_modifier @ self.screen_extrinsics
 
         camera_info = CameraInfo(
-            intrinsics=self.screen_intrinsics,
+            intrinsics=self.screen_intrinsics.expand(*eye_pos.shape[:-1], 4, 4),
             extrinsics=extrinsics,
             width=self.screen_resolution_px[0],
             height=self.screen_resolution_px[1],
@@ -376,8 +380,7 @@ def _compute_depth_quantiles(
     points_local = points @ extrinsics[:3, :3].T + extrinsics[:3, 3]
     depth_values = points_local[..., 2].flatten()
     depth_values = depth_values[depth_values > 0]
-    q_values = torch.tensor([q_near, q_focus, q_far])
-    depth_quantiles_pt = torch.quantile(depth_values.cpu(), q_values)
+    depth_quantiles_pt = approximate_quantile(depth_values.cpu(), [q_near, q_focus, q_far])
     depth_quantiles = FocusRange(
         min=float(depth_quantiles_pt[0]),
         focus=float(depth_quantiles_pt[1]),
@@ -0,0 +1,105 @@
+"""Contains utilities to process per-Gaussian operations in memory-bounded chunks.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+from typing import Callable, Sequence, TypeVar
+
+import numpy as np
+import torch
+
+LOGGER = logging.getLogger(__name__)
+
+# Default upper bound for the temporary memory used by a chunked operation.
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 2**20
+
+ArrayT = TypeVar("ArrayT", torch.Tensor, np.ndarray)
+
+
+def get_chunk_size(
+    bytes_per_item: int,
+    memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+    num_workers: int = 0,
+    min_chunk_size: int = 1024,
+) -> int:
+    """Compute how many items to process at once to stay within a memory budget.
+
+    Args:
+        bytes_per_item: The (estimated) temporary memory required per item.
+        memory_budget_bytes: The memory budget shared by all workers.
+        num_workers: How many chunks are processed concurrently.
+        min_chunk_size: Lower bound of the chunk size to avoid excessive overhead.
+
+    Returns:
+        The number of items per chunk.
+    """
+    num_concurrent_chunks = max(num_workers, 1)
+    chunk_size = memory_budget_bytes // (bytes_per_item * num_concurrent_chunks)
+    return max(int(chunk_size), min_chunk_size)
+
+
+def _slice(array: ArrayT, dim: int, start: int, end: int) -> ArrayT:
+    dim = dim % array.ndim
+    return array[(slice(None),) * dim + (slice(start, end),)]
+
+
+def map_chunks(
+    fn: Callable[..., Sequence[torch.Tensor]],
+    inputs: Sequence[torch.Tensor],
+    outputs: Sequence[torch.Tensor | np.ndarray],
+    chunk_size: int,
+    dim: int = 0,
+    num_workers: int = 0,
+) -> None:
+    """Apply a function to chunks of the inputs and write the results into the outputs.
+
+    The function is called with one chunk of each input and has to return one chunk for
+    each output. Outputs have to be preallocated and can be tensors or numpy arrays, so
+    results can be written into their final location without concatenation.
+
+    Args:
+        fn: The function to apply to each chunk.
+        inputs: The tensors to split into chunks.
+        outputs: The preallocated outputs.
+        chunk_size: How many items to process at once.
+        dim: The dimension along which to split inputs and outputs.
+        num_workers: How many chunks to process concurrently in a thread pool. Chunks
+            are processed sequentially in the calling thread if set to 0.
+    """
+    if len(inputs) == 0:
+        raise ValueError("Expected at least one input.")
+    num_items = inputs[0].shape[dim]
+    for array in list(inputs) + list(outputs):
+        if array.shape[dim] != num_items:
+            raise ValueError(
+                f"Expected {num_items} items along dim {dim}, but received {array.shape}."
+            )
+    if chunk_size <= 0:
+        raise ValueError(f"Chunk size must be positive, but received {chunk_size}.")
+
+    def _process_chunk(start: int) -> None:
+        end = min(start + chunk_size, num_items)
+        results = fn(*(_slice(array, dim, start, end) for array in inputs))
+        if len(results) != len(outputs):
+            raise ValueError(f"Expected {len(outputs)} results, but received {len(results)}.")
+        for output, result in zip(outputs, results):
+            output_chunk = _slice(output, dim, start, end)
+            if isinstance(output_chunk, np.ndarray):
+                output_chunk[...] = result.detach().cpu().numpy()
+            else:
+                output_chunk.copy_(result)
+
+    starts = range(0, num_items, chunk_size)
+    LOGGER.debug("Processing %d items in %d chunks.", num_items, len(starts))
+    if num_workers > 0 and len(starts) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # Consume the iterator to propagate exceptions.
+            list(executor.map(_process_chunk, starts))
+    else:
+        for start in starts:
+            _process_chunk(start)
@@ -7,16 +7,21 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import NamedTuple
+from typing import Literal, NamedTuple
 
 import gsplat
 import torch
 from torch import nn
 
 from sharp.utils import color_space as cs_utils
-from sharp.utils import io, vis
+from sharp.utils import io, rasterizer, vis
 from sharp.utils.gaussians import BackgroundColor, Gaussians3D
 
+# The "cpu" backend uses a tile-based torch rasterizer, which renders inputs of other
+# devices on the CPU. "auto" selects gsplat for CUDA inputs and the CPU rasterizer
+# otherwise.
+RenderBackend = Literal["gsplat", "cpu", "auto"]
+
 
 class RenderingOutputs(NamedTuple):
     """Outputs of 3D Gaussians renderer."""
@@ -33,7 +38,7 @@ def write_renderings(rendering: RenderingOutputs, output_folder: Path, filename:
         raise RuntimeError("We only support saving rendering of batch size = 1")
 
     def _save_image_tensor(tensor: torch.Tensor, suffix: str):
-        np_array = tensor.permute(1, 2, 0).numpy()
+        np_array = tensor.permute(1, 2, 0).cpu().numpy()
         io.save_image(np_array, (output_folder / filename).with_suffix(suffix))
 
     color = (rendering.color[0].cpu() * 255.0).to(dtype=torch.uint8)
@@ -50,12 +55,15 @@ class GSplatRenderer(nn.Module):
 
     color_space: cs_utils.ColorSpace
     background_color: BackgroundColor
+    backend: RenderBackend
 
     def __init__(
         self,
         color_space: cs_utils.ColorSpace = "sRGB",
         background_color: BackgroundColor = "black",
         low_pass_filter_eps: float = 0.0,
+        backend: RenderBackend = "auto",
+        num_cpu_workers: int = 4,
     ) -> None:
         """Initialize gsplat renderer.
 
@@ -63,11 +71,21 @@ class GSplatRenderer(nn.Module):
             color_space: The color space to use for rendering.
             background_color: The background color to use for rendering.
             low_pass_filter_eps: The epsilon value for the low pass filter.
+            backend: The rasterizer to use.
+            num_cpu_workers: How many threads the CPU rasterizer uses for tiles.
         """
         super().__init__()
         self.color_space = color_space
         self.background_color = background_color
         self.low_pass_filter_eps = low_pass_filter_eps
+        self.backend = backend
+        self.num_cpu_workers = num_cpu_workers
+
+    def get_backend(self, device: torch.device) -> RenderBackend:
+        """Resolve the backend used to render on a device."""
+        if self.backend == "auto":
+            return "gsplat" if device.type == "cuda" else "cpu"
+        return self.backend
 
     def forward(
         self,
@@ -87,17 +105,67 @@ class GSplatRenderer(nn.Module):
             image_height: The desired output image height.
         """
         batch_size = len(gaussians.mean_vectors)
-        outputs_list: list[RenderingOutputs] = []
-
-        for ib in range(batch_size):
-            colors, alphas, meta = gsplat.rendering.rasterization(
-                means=gaussians.mean_vectors[ib],
-                quats=gaussians.quaternions[ib],
-                scales=gaussians.singular_values[ib],
-                opacities=gaussians.opacities[ib],
-                colors=gaussians.colors[ib],
-                viewmats=extrinsics[ib : ib + 1],
-                Ks=intrinsics[ib : ib + 1, :3, :3],
+        outputs_list = [
+            self._render_scene(
+                gaussians,
+                ib,
+                extrinsics[ib : ib + 1],
+                intrinsics[ib : ib + 1],
+                image_width,
+                image_height,
+            )
+            for ib in range(batch_size)
+        ]
+        return RenderingOutputs(
+            color=torch.cat([item.color for item in outputs_list], dim=0).contiguous(),
+            depth=torch.cat([item.depth for item in outputs_list], dim=0).contiguous(),
+            alpha=torch.cat([item.alpha for item in outputs_list], dim=0).contiguous(),
+        )
+
+    def render_views(
+        self,
+        gaussians: Gaussians3D,
+        extrinsics: torch.Tensor,
+        intrinsics: torch.Tensor,
+        image_width: int,
+        image_height: int,
+    ) -> RenderingOutputs:
+        """Render a single scene from multiple cameras in one call.
+
+        Args:
+            gaussians: The Gaussians to render with batch size 1.
+            extrinsics: The extrinsics of the V cameras with shape V x 4 x 4.
+            intrinsics: The intrinsics of the V cameras with shape V x 4 x 4.
+            image_width: The desired output image width.
+            image_height: The desired output image height.
+
+        Returns:
+            The renderings with batch size V.
+        """
+        if len(gaussians.mean_vectors) != 1:
+            raise ValueError("Multi-view rendering only supports Gaussians with batch size 1.")
+        return self._render_scene(gaussians, 0, extrinsics, intrinsics, image_width, image_height)
+
+    def _render_scene(
+        self,
+        gaussians: Gaussians3D,
+        index: int,
+        extrinsics: torch.Tensor,
+        intrinsics: torch.Tensor,
+        image_width: int,
+        image_height: int,
+    ) -> RenderingOutputs:
+        """Render one scene of a batch from one or more cameras."""
+        backend = self.get_backend(gaussians.mean_vectors.device)
+        if backend == "gsplat":
+            colors, alphas, _ = gsplat.rendering.rasterization(
+                means=gaussians.mean_vectors[index],
+                quats=gaussians.quaternions[index],
+                scales=gaussians.singular_values[index],
+                opacities=gaussians.opacities[index],
+                colors=gaussians.colors[index],
+                viewmats=extrinsics,
+                Ks=intrinsics[:, :3, :3],
                 width=image_width,
                 height=image_height,
                 render_mode="RGB+D",
@@ -106,46 +174,51 @@ class GSplatRenderer(nn.Module):
                 packed=False,
                 eps2d=self.low_pass_filter_eps,
             )
+        elif backend == "cpu":
+            # The CPU rasterizer also serves other devices, e.g. MPS, by rendering on the
+            # CPU and moving the images back.
+            device = gaussians.mean_vectors.device
+            colors, alphas = rasterizer.rasterize(
+                means=gaussians.mean_vectors[index].cpu(),
+                quats=gaussians.quaternions[index].cpu(),
+                scales=gaussians.singular_values[index].cpu(),
+                opacities=gaussians.opacities[index].cpu(),
+                colors=gaussians.colors[index].cpu(),
+                viewmats=extrinsics.cpu(),
+                Ks=intrinsics[:, :3, :3].cpu(),
+                width=image_width,
+                height=image_height,
+                eps2d=self.low_pass_filter_eps,
+                num_workers=self.num_cpu_workers,
+            )
+            colors, alphas = colors.to(device), alphas.to(device)
+        else:
+            raise ValueError(f"Unsupported render backend {backend}.")
 
-            rendered_color = colors[..., 0:3].permute([0, 3, 1, 2])
-            rendered_depth_unnormalized = colors[..., 3:4].permute([0, 3, 1, 2])
-            rendered_alpha = alphas.permute([0, 3, 1, 2])
+        rendered_color = colors[..., 0:3].permute([0, 3, 1, 2])
+        rendered_depth_unnormalized = colors[..., 3:4].permute([0, 3, 1, 2])
+        rendered_alpha = alphas.permute([0, 3, 1, 2])
 
-            # Compose with background color.
-            rendered_color = self.compose_with_background(
-                rendered_color, rendered_alpha, self.background_color
-            )
+        # Compose with background color.
+        rendered_color = self.compose_with_background(
+            rendered_color, rendered_alpha, self.background_color
+        )
 
-            # Colorspace conversion.
-            if self.color_space == "sRGB":
-                pass
-            elif self.color_space == "linearRGB":
-                rendered_color = cs_utils.linearRGB2sRGB(rendered_color)
-            else:
-                ValueError("Unsupported ColorSpace type.")
-
-            # splats: (B, N, 10)
-            cov2d = self._conics_to_covars2d(meta["conics"])
-            # Set the cov2d of invisible splats to 1 to avoid nan in condition number calculation..
-            splats_visible_mask = meta["depths"] > 1e-2
-            cov2d[~splats_visible_mask][..., 0, 0] = 1
-            cov2d[~splats_visible_mask][..., 1, 1] = 1
-            cov2d[~splats_visible_mask][..., 0, 1] = 0
-
-            # Normalize the depth by alpha.
-            rendered_depth = rendered_depth_unnormalized / torch.clip(rendered_alpha, min=1e-8)
-
-            outputs = RenderingOutputs(
-                color=rendered_color,
-                depth=rendered_depth,
-                alpha=rendered_alpha,
-            )
-            outputs_list.append(outputs)
+        # Colorspace conversion.
+        if self.color_space == "sRGB":
+            pass
+        elif self.color_space == "linearRGB":
+            rendered_color = cs_utils.linearRGB2sRGB(rendered_color)
+        else:
+            ValueError("Unsupported ColorSpace type.")
+
+        # Normalize the depth by alpha.
+        rendered_depth = rendered_depth_unnormalized / torch.clip(rendered_alpha, min=1e-8)
 
         return RenderingOutputs(
-            color=torch.cat([item.color for item in outputs_list], dim=0).contiguous(),
-            depth=torch.cat([item.depth for item in outputs_list], dim=0).contiguous(),
-            alpha=torch.cat([item.alpha for item in outputs_list], dim=0).contiguous(),
+            color=rendered_color,
+            depth=rendered_depth,
+            alpha=rendered_alpha,
         )
 
     @staticmethod
@@ -171,21 +244,3 @@ class GSplatRenderer(nn.Module):
             return rendered_rgb + (1.0 - rendered_alpha) * torch.rand_like(rendered_rgb)
         else:
             raise ValueError("Unsupported BackgroundColor type.")
-
-    @staticmethod
-    def _conics_to_covars2d(conics: torch.Tensor, eps=1e-8) -> torch.Tensor:
-        """Convert conics to covariance matrices."""
-        a = conics[..., 0]
-        b = conics[..., 1]
-        c = conics[..., 2]
-        # Reconstruct determinant.
-        det = 1 / (a * c - b**2 + eps)
-        det = det.clamp(min=eps)
-        # Reconstruct covars2d.
-        covars2d = torch.zeros(*conics.shape[:-1], 2, 2, device=conics.device)
-        covars2d[..., 1, 1] = a * det
-        covars2d[..., 0, 0] = c * det
-        covars2d[..., 0, 1] = -b * det
-        covars2d[..., 1, 0] = -b * det
-        covars2d = torch.nan_to_num(covars2d, nan=0.0, posinf=0.0, neginf=0.0)
-        return covars2d
@@ -8,8 +8,10 @@ from __future__ import annotations
 
 import io
 import logging
+import queue
+import threading
 from pathlib import Path
-from typing import IO, Any, Protocol
+from typing import IO, Any, Callable, Protocol
 
 import imageio.v2 as iio
 import numpy as np
@@ -179,35 +181,124 @@ class OutputWriter(Protocol):
         ...
 
 
-class VideoWriter(OutputWriter):
-    """Output writer for video output."""
+class _EncoderThread(threading.Thread):
+    """Thread which encodes frames from a bounded queue in the background."""
+
+    def __init__(self, encode_fn: Callable[[torch.Tensor], None], max_queued_frames: int):
+        """Start the encoder thread.
+
+        Args:
+            encode_fn: The function to call for each frame.
+            max_queued_frames: How many frames can be queued before put() blocks.
+        """
+        super().__init__(daemon=True)
+        self._encode_fn = encode_fn
+        self._queue: queue.Queue[torch.Tensor | None] = queue.Queue(maxsize=max_queued_frames)
+        self._error: BaseException | None = None
+        self.start()
+
+    def run(self) -> None:
+        """Encode frames until the end of the stream."""
+        while (frame := self._queue.get()) is not None:
+            # Keep draining the queue after an error so put() never blocks forever.
+            if self._error is not None:
+                continue
+            try:
+                self._encode_fn(frame)
+            except BaseException as error:
+                self._error = error
+
+    def put(self, frame: torch.Tensor) -> None:
+        """Queue a frame, blocking while the queue is full."""
+        self._raise_error()
+        self._queue.put(frame)
+
+    def close(self) -> None:
+        """Wait until all queued frames are encoded."""
+        self._queue.put(None)
+        self.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Encoding frames failed.") from self._error
 
-    def __init__(self, output_path: Path, fps: float = 30.0, render_depth: bool = True) -> None:
+
+class VideoWriter(OutputWriter):
+    """Output writer for video output.
+
+    In asynchronous mode, the color and depth streams are encoded by one background
+    thread each, so rendering and encoding overlap. add_frame() only blocks when
+    max_queued_frames frames are waiting to be encoded. Frames must not be modified
+    after they were added.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        fps: float = 30.0,
+        render_depth: bool = True,
+        asynchronous: bool = False,
+        max_queued_frames: int = 8,
+    ) -> None:
         """Initialize VideoWriter."""
         output_path.parent.mkdir(exist_ok=True, parents=True)
         self.output_path = output_path
         self.image_writer = iio.get_writer(output_path, fps=fps)
 
         self.max_depth_estimate = None
+        self.depth_writer = None
         if render_depth:
             self.depth_writer = iio.get_writer(output_path.with_suffix(".depth.mp4"), fps=fps)
 
+        self._image_encoder: _EncoderThread | None = None
+        self._depth_encoder: _EncoderThread | None = None
+        if asynchronous:
+            self._image_encoder = _EncoderThread(self._write_image, max_queued_frames)
+            if self.depth_writer is not None:
+                self._depth_encoder = _EncoderThread(self._write_depth, max_queued_frames)
+
     def add_frame(self, image: torch.Tensor, depth: torch.Tensor) -> None:
         """Add a single frame to output."""
+        if self._image_encoder is not None:
+            self._image_encoder.put(image.detach())
+        else:
+            self._write_image(image)
+
+        if self._depth_encoder is not None:
+            self._depth_encoder.put(depth.detach())
+        elif self.depth_writer is not None:
+            self._write_depth(depth)
+
+    def _write_image(self, image: torch.Tensor) -> None:
         image_np = image.detach().cpu().numpy()
         self.image_writer.append_data(image_np)
 
-        if self.depth_writer is not None:
-            if self.max_depth_estimate is None:
-                self.max_depth_estimate = depth.max().item()
+    def _write_depth(self, depth: torch.Tensor) -> None:
+        if self.depth_writer is None:
+            return
+        if self.max_depth_estimate is None:
+            self.max_depth_estimate = depth.max().item()
 
-            colored_depth_pt = colorize_depth(
-                depth,
-                min(self.max_depth_estimate, METRIC_DEPTH_MAX_CLAMP_METER),  # type: ignore[call-overload]
-            )
-            colored_depth_np = colored_depth_pt.squeeze(0).permute(1, 2, 0).cpu().numpy()
-            self.depth_writer.append_data(colored_depth_np)
+        colored_depth_pt = colorize_depth(
+            depth,
+            min(self.max_depth_estimate, METRIC_DEPTH_MAX_CLAMP_METER),  # type: ignore[call-overload]
+        )
+        colored_depth_np = colored_depth_pt.squeeze(0).permute(1, 2, 0).cpu().numpy()
+        self.depth_writer.append_data(colored_depth_np)
 
     def close(self):
         """Finish writing."""
+        errors = []
+        for encoder in (self._image_encoder, self._depth_encoder):
+            if encoder is not None:
+                try:
+                    encoder.close()
+                except RuntimeError as error:
+                    errors.append(error)
+
         self.image_writer.close()
+        if self.depth_writer is not None:
+            self.depth_writer.close()
+        if len(errors) > 0:
+            raise errors[0]
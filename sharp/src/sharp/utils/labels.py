@@ -0,0 +1,67 @@
+"""Contains utility functions to transfer 2D image labels to 3D Gaussians.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+
+def map_mask_to_gaussians(
+    mask: np.ndarray,
+    mean_vectors: np.ndarray,
+    focal_length_px: tuple[float, float],
+    principal_point_px: tuple[float, float],
+    image_size: tuple[int, int],
+    threshold: int = 127,
+    min_depth: float = 0.01,
+) -> np.ndarray:
+    """Map a binary 2D mask to Gaussians by projecting their mean vectors.
+
+    The Gaussians are assumed to be in the camera frame of the input image (OpenCV
+    convention, camera at the origin looking down +Z), which is how SHARP exports them.
+
+    Args:
+        mask: Mask at the original image resolution (H x W) with values 0-255.
+        mean_vectors: The Gaussian positions with shape N x 3.
+        focal_length_px: The focal lengths (fx, fy) in pixels.
+        principal_point_px: The principal point (cx, cy) in pixels.
+        image_size: The (width, height) of the image.
+        threshold: Mask values above this threshold are considered foreground.
+        min_depth: Gaussians closer than this depth are never labeled.
+
+    Returns:
+        Boolean array of length N indicating which Gaussians project onto the mask.
+    """
+    fx, fy = focal_length_px
+    cx, cy = principal_point_px
+    image_width, image_height = image_size
+    num_gaussians = len(mean_vectors)
+
+    z = mean_vectors[:, 2]
+    valid_depth = z > min_depth
+
+    # Standard pinhole projection: u = fx * (x/z) + cx, v = fy * (y/z) + cy.
+    u = fx * (mean_vectors[:, 0] / np.maximum(z, min_depth)) + cx
+    v = fy * (mean_vectors[:, 1] / np.maximum(z, min_depth)) + cy
+
+    u_px = np.round(u).astype(int)
+    v_px = np.round(v).astype(int)
+
+    in_bounds = (
+        (u_px >= 0) & (u_px < image_width) & (v_px >= 0) & (v_px < image_height) & valid_depth
+    )
+
+    gaussian_mask = np.zeros(num_gaussians, dtype=bool)
+    for i in range(num_gaussians):
+        if in_bounds[i]:
+            gaussian_mask[i] = mask[v_px[i], u_px[i]] > threshold
+
+    LOGGER.debug("Gaussians in bounds: %d / %d", np.sum(in_bounds), num_gaussians)
+    return gaussian_mask
@@ -6,57 +6,295 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import logging
+from typing import Literal
+
 import torch
 import torch.nn.functional as F
-from scipy.spatial.transform import Rotation
+
+LOGGER = logging.getLogger(__name__)
 
 
 def rotation_matrices_from_quaternions(quaternions: torch.Tensor) -> torch.Tensor:
     """Convert batch of quaternions into rotations matrices.
 
+    Half precision inputs are converted in float32 and the result is cast back.
+
     Args:
         quaternions: The quaternions convert to matrices.
 
     Returns:
         The rotations matrices corresponding to the (normalized) quaternions.
     """
-    device = quaternions.device
-    shape = quaternions.shape[:-1]
-
+    dtype = quaternions.dtype
+    quaternions = quaternions.to(_get_compute_dtype(dtype))
     quaternions = quaternions / torch.linalg.norm(quaternions, dim=-1, keepdim=True)
-    real_part = quaternions[..., 0]
-    vector_part = quaternions[..., 1:]
-
-    vector_cross = get_cross_product_matrix(vector_part)
-    real_part = real_part[..., None, None]
-
-    matrix_outer = vector_part[..., :, None] * vector_part[..., None, :]
-    matrix_diag = real_part.square() * eyes(3, shape=shape, device=device)
-    matrix_cross_1 = 2 * real_part * vector_cross
-    matrix_cross_2 = vector_cross @ vector_cross
+    w, x, y, z = quaternions.unbind(dim=-1)
 
-    return matrix_outer + matrix_diag + matrix_cross_1 + matrix_cross_2
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    matrices = torch.stack(
+        [
+            1 - 2 * (yy + zz),
+            2 * (xy - wz),
+            2 * (xz + wy),
+            2 * (xy + wz),
+            1 - 2 * (xx + zz),
+            2 * (yz - wx),
+            2 * (xz - wy),
+            2 * (yz + wx),
+            1 - 2 * (xx + yy),
+        ],
+        dim=-1,
+    )
+    return matrices.unflatten(-1, (3, 3)).to(dtype)
 
 
 def quaternions_from_rotation_matrices(matrices: torch.Tensor) -> torch.Tensor:
     """Convert batch of rotation matrices to quaternions.
 
+    We use Shepperd's method, i.e. we compute the quaternion from the largest of its
+    four squared components to avoid cancellation. All four candidates are computed
+    and the best one is gathered per matrix without branching, so the operation runs
+    on the device of the input. Half precision inputs are converted in float32 and
+    the result is cast back.
+
     Args:
         matrices: The matrices to convert to quaternions.
 
     Returns:
-        The quaternions corresponding to the rotation matrices.
+        The quaternions (w, x, y, z) corresponding to the rotation matrices.
+
+    Note: this operation is not differentiable.
+    """
+    if not matrices.shape[-2:] == (3, 3):
+        raise ValueError(f"matrices have invalid shape {matrices.shape}")
+    dtype = matrices.dtype
+    matrices = matrices.detach().to(_get_compute_dtype(dtype))
+    m00, m01, m02 = matrices[..., 0, 0], matrices[..., 0, 1], matrices[..., 0, 2]
+    m10, m11, m12 = matrices[..., 1, 0], matrices[..., 1, 1], matrices[..., 1, 2]
+    m20, m21, m22 = matrices[..., 2, 0], matrices[..., 2, 1], matrices[..., 2, 2]
+
+    # Each row contains 4 times the quaternion scaled by one of its (w, x, y, z) components.
+    candidates = torch.stack(
+        [
+            torch.stack([1 + m00 + m11 + m22, m21 - m12, m02 - m20, m10 - m01], dim=-1),
+            torch.stack([m21 - m12, 1 + m00 - m11 - m22, m01 + m10, m02 + m20], dim=-1),
+            torch.stack([m02 - m20, m01 + m10, 1 - m00 + m11 - m22, m12 + m21], dim=-1),
+            torch.stack([m10 - m01, m02 + m20, m12 + m21, 1 - m00 - m11 + m22], dim=-1),
+        ],
+        dim=-2,
+    )
+    # The diagonal of the candidates contains 4 times the squared components.
+    best_index = torch.diagonal(candidates, dim1=-2, dim2=-1).argmax(dim=-1)
+    best_index = best_index[..., None, None].expand(best_index.shape + (1, 4))
+    quaternions = torch.gather(candidates, dim=-2, index=best_index).squeeze(-2)
+    return F.normalize(quaternions, dim=-1).to(dtype)
+
+
+def _get_compute_dtype(dtype: torch.dtype) -> torch.dtype:
+    """Return the dtype to compute rotation conversions in."""
+    return torch.float32 if dtype in (torch.float16, torch.bfloat16) else dtype
+
+
+SymmetricEigenMethod = Literal["analytic", "jacobi"]
+
+
+def eigh_symmetric_3x3(
+    matrices: torch.Tensor,
+    method: SymmetricEigenMethod = "analytic",
+    num_jacobi_sweeps: int = 8,
+    fallback_tolerance: float = 1e-6,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Compute eigenvalues and eigenvectors of a batch of symmetric 3x3 matrices.
+
+    The analytic method computes the eigenvalues in closed form and the eigenvectors of
+    the best separated eigenvalue via cross products, followed by a 2x2 problem in the
+    orthogonal complement. Matrices for which the result has a large residual are
+    recomputed with cyclic Jacobi iterations.
+
+    Args:
+        matrices: The symmetric matrices to decompose.
+        method: Which method to use.
+        num_jacobi_sweeps: How many sweeps to perform for the Jacobi method.
+        fallback_tolerance: Relative residual above which the Jacobi method is used as
+            fallback for the analytic method.
 
-    Note: this operation is not differentiable and will be performed on the CPU.
+    Returns:
+        The eigenvalues in descending order and the rotation matrices which contain the
+        corresponding eigenvectors as columns.
     """
     if not matrices.shape[-2:] == (3, 3):
         raise ValueError(f"matrices have invalid shape {matrices.shape}")
-    matrices_np = matrices.detach().cpu().numpy()
-    quaternions_np = Rotation.from_matrix(matrices_np.reshape(-1, 3, 3)).as_quat()
-    # We use a convention where the w component is at the start of the quaternion.
-    quaternions_np = quaternions_np[:, [3, 0, 1, 2]]
-    quaternions_np = quaternions_np.reshape(matrices_np.shape[:-2] + (4,))
-    return torch.as_tensor(quaternions_np, device=matrices.device, dtype=matrices.dtype)
+    batch_shape = matrices.shape[:-2]
+    matrices = matrices.reshape(-1, 3, 3)
+    matrices = 0.5 * (matrices + matrices.transpose(-1, -2))
+
+    # Normalize the matrices to avoid over- and underflow.
+    scale = matrices.abs().amax(dim=(-2, -1)).clamp_min(torch.finfo(matrices.dtype).tiny)
+    matrices = matrices / scale[:, None, None]
+
+    if method == "analytic":
+        eigenvalues, eigenvectors = _eigh_symmetric_3x3_analytic(matrices)
+        # The eigenvectors are orthonormal by construction unless the computation broke
+        # down, which we detect via the determinant.
+        residuals = (
+            torch.linalg.matrix_norm(
+                matrices @ eigenvectors - eigenvectors * eigenvalues[:, None, :]
+            )
+            + (_det_3x3(eigenvectors) - 1.0).abs()
+        )
+        (fallback_indices,) = torch.where(~(residuals <= fallback_tolerance))
+        if len(fallback_indices) > 0:
+            LOGGER.debug("Using Jacobi fallback for %d matrices.", len(fallback_indices))
+            eigenvalues[fallback_indices], eigenvectors[fallback_indices] = (
+                _eigh_symmetric_3x3_jacobi(matrices[fallback_indices], num_jacobi_sweeps)
+            )
+    elif method == "jacobi":
+        eigenvalues, eigenvectors = _eigh_symmetric_3x3_jacobi(matrices, num_jacobi_sweeps)
+    else:
+        raise ValueError(f"Unsupported eigen decomposition method: {method}.")
+
+    eigenvalues = eigenvalues * scale[:, None]
+    return eigenvalues.reshape(batch_shape + (3,)), eigenvectors.reshape(batch_shape + (3, 3))
+
+
+def _eigh_symmetric_3x3_analytic(matrices: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    """Closed-form eigen decomposition of normalized symmetric 3x3 matrices."""
+    eye = torch.eye(3, dtype=matrices.dtype, device=matrices.device)
+
+    # Eigenvalues via the trigonometric solution of the characteristic polynomial.
+    mean = torch.diagonal(matrices, dim1=-2, dim2=-1).mean(dim=-1)
+    deviation = matrices - mean[:, None, None] * eye
+    p = (deviation.square().sum(dim=(-2, -1)) / 6.0).sqrt()
+    half_det = _det_3x3(deviation / p.clamp_min(1e-30)[:, None, None]) / 2.0
+    phi = torch.acos(half_det.clamp(-1.0, 1.0)) / 3.0
+    eigenvalue_max = mean + 2.0 * p * torch.cos(phi)
+    eigenvalue_min = mean + 2.0 * p * torch.cos(phi + 2.0 * torch.pi / 3.0)
+    eigenvalue_mid = 3.0 * mean - eigenvalue_max - eigenvalue_min
+
+    # Compute the eigenvector of the eigenvalue which is best separated from the others.
+    use_max = (eigenvalue_max - eigenvalue_mid) >= (eigenvalue_mid - eigenvalue_min)
+    eigenvalue_far = torch.where(use_max, eigenvalue_max, eigenvalue_min)
+    vector_far = _null_vector_symmetric_3x3(matrices - eigenvalue_far[:, None, None] * eye)
+
+    # Solve the remaining 2x2 problem in the orthogonal complement.
+    basis_u = _any_orthonormal_vector(vector_far)
+    basis_v = torch.cross(vector_far, basis_u, dim=-1)
+    matrix_u = (matrices * basis_u[:, None, :]).sum(dim=-1)
+    matrix_v = (matrices * basis_v[:, None, :]).sum(dim=-1)
+    a_uu = (basis_u * matrix_u).sum(dim=-1)
+    a_uv = (basis_u * matrix_v).sum(dim=-1)
+    a_vv = (basis_v * matrix_v).sum(dim=-1)
+    theta = 0.5 * torch.atan2(2.0 * a_uv, a_uu - a_vv)
+    cos_theta = torch.cos(theta)
+    sin_theta = torch.sin(theta)
+    eigenvalue_larger = (
+        cos_theta.square() * a_uu + 2.0 * cos_theta * sin_theta * a_uv + sin_theta.square() * a_vv
+    )
+    eigenvalue_smaller = (
+        sin_theta.square() * a_uu - 2.0 * cos_theta * sin_theta * a_uv + cos_theta.square() * a_vv
+    )
+    cos_theta = cos_theta[:, None]
+    sin_theta = sin_theta[:, None]
+    vector_larger = cos_theta * basis_u + sin_theta * basis_v
+    vector_smaller = cos_theta * basis_v - sin_theta * basis_u
+
+    eigenvalues = torch.where(
+        use_max[:, None],
+        torch.stack([eigenvalue_far, eigenvalue_larger, eigenvalue_smaller], dim=-1),
+        torch.stack([eigenvalue_larger, eigenvalue_smaller, eigenvalue_far], dim=-1),
+    )
+    # Rounding can swap (nearly) repeated eigenvalues, so enforce the descending order.
+    eigenvalues = torch.cummin(eigenvalues, dim=-1).values
+    use_max = use_max[:, None]
+    vector_max = torch.where(use_max, vector_far, vector_larger)
+    vector_mid = torch.where(use_max, vector_larger, vector_smaller)
+    vector_min = torch.where(use_max, vector_smaller, vector_far)
+    eigenvectors = torch.stack([vector_max, vector_mid, vector_min], dim=-1)
+    return eigenvalues, _make_right_handed(eigenvectors)
+
+
+def _eigh_symmetric_3x3_jacobi(
+    matrices: torch.Tensor, num_sweeps: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Eigen decomposition of symmetric 3x3 matrices using cyclic Jacobi rotations."""
+    diagonalized = matrices.clone()
+    eigenvectors = eyes(3, shape=matrices.shape[:-2], device=matrices.device).to(matrices.dtype)
+    for _ in range(num_sweeps):
+        for i, j in ((0, 1), (0, 2), (1, 2)):
+            # Rotate in the (i, j) plane such that the (i, j) entry vanishes.
+            theta = 0.5 * torch.atan2(
+                2.0 * diagonalized[:, i, j], diagonalized[:, j, j] - diagonalized[:, i, i]
+            )
+            cos_theta = torch.cos(theta)
+            sin_theta = torch.sin(theta)
+            rotations = eyes(3, shape=matrices.shape[:-2], device=matrices.device).to(
+                matrices.dtype
+            )
+            rotations[:, i, i] = cos_theta
+            rotations[:, j, j] = cos_theta
+            rotations[:, i, j] = sin_theta
+            rotations[:, j, i] = -sin_theta
+            diagonalized = rotations.transpose(-1, -2) @ diagonalized @ rotations
+            eigenvectors = eigenvectors @ rotations
+
+    eigenvalues, order = torch.diagonal(diagonalized, dim1=-2, dim2=-1).sort(
+        dim=-1, descending=True
+    )
+    eigenvectors = torch.gather(eigenvectors, dim=-1, index=order[:, None, :].expand(-1, 3, -1))
+    return eigenvalues, _make_right_handed(eigenvectors)
+
+
+def _make_right_handed(eigenvectors: torch.Tensor) -> torch.Tensor:
+    """Flip the last eigenvector to turn reflections into rotations."""
+    sign = torch.where(_det_3x3(eigenvectors) < 0, -1.0, 1.0).to(eigenvectors.dtype)
+    return torch.cat([eigenvectors[..., :2], eigenvectors[..., 2:] * sign[:, None, None]], -1)
+
+
+def _det_3x3(matrices: torch.Tensor) -> torch.Tensor:
+    """Compute the determinant of 3x3 matrices via the triple product."""
+    return (
+        matrices[..., 0, :] * torch.cross(matrices[..., 1, :], matrices[..., 2, :], dim=-1)
+    ).sum(dim=-1)
+
+
+def _null_vector_symmetric_3x3(matrices: torch.Tensor) -> torch.Tensor:
+    """Compute a unit vector in the null space of rank-deficient symmetric matrices."""
+    row_0, row_1, row_2 = matrices[:, 0], matrices[:, 1], matrices[:, 2]
+    candidates = torch.stack(
+        [
+            torch.cross(row_0, row_1, dim=-1),
+            torch.cross(row_0, row_2, dim=-1),
+            torch.cross(row_1, row_2, dim=-1),
+        ],
+        dim=1,
+    )
+    norms = torch.linalg.vector_norm(candidates, dim=-1)
+    best_index = norms.argmax(dim=-1)
+    vectors = candidates[torch.arange(len(matrices), device=matrices.device), best_index]
+    best_norm = norms.amax(dim=-1, keepdim=True)
+    # All rows are (close to) parallel if all cross products vanish. In this case, any
+    # vector orthogonal to the largest row lies in the null space.
+    is_degenerate = best_norm <= 1e-30
+    row_norms = torch.linalg.vector_norm(matrices, dim=-1)
+    largest_row = matrices[
+        torch.arange(len(matrices), device=matrices.device), row_norms.argmax(-1)
+    ]
+    fallback = _any_orthonormal_vector(F.normalize(largest_row, dim=-1))
+    return torch.where(is_degenerate, fallback, vectors / best_norm.clamp_min(1e-30))
+
+
+def _any_orthonormal_vector(vectors: torch.Tensor) -> torch.Tensor:
+    """Compute a unit vector orthogonal to each of the given unit vectors."""
+    # Cross with the coordinate axis which is least aligned with the vector. Any axis
+    # is a valid solution for zero vectors.
+    axis_index = vectors.abs().argmin(dim=-1)
+    axes = torch.eye(3, dtype=vectors.dtype, device=vectors.device)[axis_index]
+    orthogonal = torch.cross(vectors, axes, dim=-1)
+    norms = torch.linalg.vector_norm(orthogonal, dim=-1, keepdim=True)
+    return torch.where(norms > 1e-30, orthogonal / norms.clamp_min(1e-30), axes)
 
 
 def get_cross_product_matrix(vectors: torch.Tensor) -> torch.Tensor:
@@ -86,7 +324,7 @@ def quaternion_product(q1, q2):
     vector_2 = q2[..., 1:]
 
     real_out = real_1 * real_2 - (vector_1 * vector_2).sum(dim=-1, keepdim=True)
-    vector_out = real_1 * vector_2 + real_2 * vector_1 + torch.cross(vector_1, vector_2)
+    vector_out = real_1 * vector_2 + real_2 * vector_1 + torch.cross(vector_1, vector_2, dim=-1)
     return torch.concatenate([real_out, vector_out], dim=-1)
 
 
@@ -6,6 +6,7 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
+import functools
 from typing import Any, Callable, Literal, NamedTuple, Tuple, Union
 
 import torch
@@ -29,9 +30,12 @@ class ActivationPair(NamedTuple):
     inverse: ActivationFunction
 
 
+@functools.lru_cache
 def create_activation_pair(activation_type: ActivationType) -> ActivationPair:
     """Create activation function and corresponding inverse function.
 
+    The pairs are cached, since they are created in the forward pass of modules.
+
     Args:
         activation_type: The activation type to create.
 
@@ -67,6 +71,30 @@ def inverse_softplus(tensor: torch.Tensor, eps: float = 1e-06) -> torch.Tensor:
     return tensor + torch.log(-exp + 1.0)
 
 
+def approximate_quantile(
+    values: torch.Tensor, q: torch.Tensor | list[float], max_samples: int = 2**18
+) -> torch.Tensor:
+    """Compute quantiles on an evenly strided subset of at most max_samples values.
+
+    The result is exact if values holds at most max_samples elements. Unlike
+    torch.quantile, this also supports tensors with more than 2**24 elements.
+
+    Args:
+        values: The values to compute the quantiles of (flattened).
+        q: The quantiles to compute in [0, 1].
+        max_samples: Maximum number of values to sort.
+
+    Returns:
+        The quantiles with the same shape as q.
+    """
+    values = values.flatten()
+    if len(values) > max_samples:
+        stride = -(-len(values) // max_samples)
+        values = values[::stride]
+    q = torch.as_tensor(q, dtype=values.dtype, device=values.device)
+    return torch.quantile(values, q)
+
+
 # The first value describes the threshold from where clamping will be applied, while
 # the second value describes the value to clamp with.
 SoftClampRange = Tuple[Union[torch.Tensor, float], Union[torch.Tensor, float]]
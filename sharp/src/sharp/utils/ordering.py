@@ -0,0 +1,120 @@
+"""Contains space-filling-curve orderings of Gaussians.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Literal
+
+import torch
+
+from sharp.utils.gaussians import Gaussians3D
+
+LOGGER = logging.getLogger(__name__)
+
+# "none" keeps the (layer, row, col) order of the predictor, "morton" sorts the
+# Gaussians along the Z-order curve of their positions.
+GaussianOrder = Literal["none", "morton"]
+
+# Bits per axis of the Morton codes, so the interleaved code fits into int64.
+MORTON_BITS_PER_AXIS = 21
+
+
+def _spread_bits(values: torch.Tensor) -> torch.Tensor:
+    """Insert two zero bits before each of the lower 21 bits of int64 values."""
+    values = values & 0x1FFFFF
+    values = (values | (values << 32)) & 0x1F00000000FFFF
+    values = (values | (values << 16)) & 0x1F0000FF0000FF
+    values = (values | (values << 8)) & 0x100F00F00F00F00F
+    values = (values | (values << 4)) & 0x10C30C30C30C30C3
+    values = (values | (values << 2)) & 0x1249249249249249
+    return values
+
+
+def compute_morton_codes(
+    points: torch.Tensor, num_bits: int = MORTON_BITS_PER_AXIS
+) -> torch.Tensor:
+    """Compute the 3D Morton codes of points within their bounding box.
+
+    The points are quantized to a grid of 2**num_bits cells per axis spanning the
+    bounding box of all points along the second to last dimension. Non-finite
+    coordinates are mapped to the last cell of their axis.
+
+    Args:
+        points: The points with shape ... x N x 3.
+        num_bits: Bits per axis in [1, MORTON_BITS_PER_AXIS].
+
+    Returns:
+        The int64 Morton codes with shape ... x N.
+    """
+    if not 1 <= num_bits <= MORTON_BITS_PER_AXIS:
+        raise ValueError(f"Expected 1 to {MORTON_BITS_PER_AXIS} bits, but received {num_bits}.")
+    if points.shape[-1] != 3:
+        raise ValueError(f"Expected points with shape ... x N x 3, but received {points.shape}.")
+
+    points = points.detach().float()
+    is_finite = points.isfinite()
+    min_corner = torch.where(is_finite, points, torch.inf).amin(dim=-2, keepdim=True)
+    max_corner = torch.where(is_finite, points, -torch.inf).amax(dim=-2, keepdim=True)
+    extent = (max_corner - min_corner).clamp_min(1e-12)
+
+    max_cell = 2**num_bits - 1
+    cells = ((points - min_corner) / extent * max_cell).round()
+    cells = torch.where(is_finite, cells, max_cell).clamp(0, max_cell).long()
+    return (
+        _spread_bits(cells[..., 0])
+        | (_spread_bits(cells[..., 1]) << 1)
+        | (_spread_bits(cells[..., 2]) << 2)
+    )
+
+
+@torch.no_grad()
+def compute_gaussian_order(gaussians: Gaussians3D, order: GaussianOrder = "morton") -> torch.Tensor:
+    """Compute the permutation which sorts Gaussians by a space-filling curve.
+
+    Spatially close Gaussians end up close in memory, which improves the compression
+    of exported files and the locality of chunked streaming and renderers.
+
+    Args:
+        gaussians: The Gaussians to sort.
+        order: The order to sort the Gaussians in.
+
+    Returns:
+        The int64 permutation with shape B x N, see reorder_gaussians().
+    """
+    batch_size, num_gaussians = gaussians.mean_vectors.shape[:2]
+    if order == "none":
+        permutation = torch.arange(num_gaussians, device=gaussians.mean_vectors.device)
+        return permutation.expand(batch_size, -1)
+    elif order == "morton":
+        codes = compute_morton_codes(gaussians.mean_vectors)
+        return torch.argsort(codes, dim=-1, stable=True)
+    else:
+        raise ValueError(f"Unsupported Gaussian order {order}.")
+
+
+def reorder_gaussians(gaussians: Gaussians3D, permutation: torch.Tensor) -> Gaussians3D:
+    """Reorder Gaussians, such that Gaussian i of batch b is Gaussian permutation[b, i].
+
+    Per-Gaussian values of the original order, e.g. labels, are reordered the same way
+    with values[b, permutation[b]]. The inverse permutation, which maps original to new
+    indices, is torch.argsort(permutation, dim=-1).
+    """
+    batch_index = torch.arange(permutation.shape[0], device=permutation.device)[:, None]
+    return Gaussians3D(*(value[batch_index, permutation] for value in gaussians))
+
+
+def sort_gaussians(
+    gaussians: Gaussians3D, order: GaussianOrder = "morton"
+) -> tuple[Gaussians3D, torch.Tensor]:
+    """Sort Gaussians by a space-filling curve.
+
+    Returns:
+        The sorted Gaussians and the permutation with shape B x N, see
+        reorder_gaussians().
+    """
+    permutation = compute_gaussian_order(gaussians, order)
+    return reorder_gaussians(gaussians, permutation), permutation
@@ -0,0 +1,313 @@
+"""Contains a compact, contiguous storage format for 3D Gaussians.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Literal, NamedTuple
+
+import numpy as np
+import torch
+
+from sharp.utils import chunking
+from sharp.utils import color_space as cs_utils
+from sharp.utils.gaussians import (
+    Gaussians3D,
+    convert_gaussians_to_ply_vertices,
+    convert_spherical_harmonics_to_rgb,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+GaussianAttribute = Literal["mean_vectors", "singular_values", "quaternions", "colors", "opacities"]
+StorageDType = Literal["float32", "float16", "uint8"]
+
+ATTRIBUTE_WIDTHS: dict[GaussianAttribute, int] = {
+    "mean_vectors": 3,
+    "singular_values": 3,
+    "quaternions": 4,
+    "colors": 3,
+    "opacities": 1,
+}
+
+_TORCH_DTYPES: dict[StorageDType, torch.dtype] = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "uint8": torch.uint8,
+}
+
+
+class PackedColumn(NamedTuple):
+    """Location of an attribute inside a packed row."""
+
+    name: GaussianAttribute
+    storage: StorageDType
+    # Offset of the column in bytes from the start of the row.
+    offset: int
+    width: int
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of the column per Gaussian."""
+        return self.width * _TORCH_DTYPES[self.storage].itemsize
+
+
+@dataclasses.dataclass(frozen=True)
+class PackedLayout:
+    """Storage precision of the attributes of packed Gaussians.
+
+    Positions and scales always use float32 since they span several orders of
+    magnitude. Colors and opacities lie in [0, 1] and can be quantized to 8 bits.
+    """
+
+    quaternions: StorageDType = "float32"
+    colors: StorageDType = "float32"
+    opacities: StorageDType = "float32"
+
+    def __post_init__(self):
+        """Validate the layout."""
+        if self.quaternions == "uint8":
+            raise ValueError("Quaternions cannot be stored as uint8.")
+
+    def get_storage(self, name: GaussianAttribute) -> StorageDType:
+        """Return the storage dtype of an attribute."""
+        if name in ("mean_vectors", "singular_values"):
+            return "float32"
+        return getattr(self, name)
+
+    @property
+    def columns(self) -> dict[GaussianAttribute, PackedColumn]:
+        """The columns of a row, sorted by element size to keep them aligned."""
+        names = sorted(
+            ATTRIBUTE_WIDTHS,
+            key=lambda name: -_TORCH_DTYPES[self.get_storage(name)].itemsize,
+        )
+        columns = {}
+        offset = 0
+        for name in names:
+            column = PackedColumn(name, self.get_storage(name), offset, ATTRIBUTE_WIDTHS[name])
+            columns[name] = column
+            offset += column.nbytes
+        return columns
+
+    @property
+    def row_nbytes(self) -> int:
+        """Number of bytes per Gaussian, padded to a multiple of 4 for alignment."""
+        nbytes = sum(column.nbytes for column in self.columns.values())
+        return (nbytes + 3) // 4 * 4
+
+    @property
+    def numpy_dtype(self) -> np.dtype:
+        """Numpy structured dtype which matches the memory layout of a row."""
+        columns = self.columns.values()
+        return np.dtype(
+            {
+                "names": [column.name for column in columns],
+                "formats": [(np.dtype(column.storage), (column.width,)) for column in columns],
+                "offsets": [column.offset for column in columns],
+                "itemsize": self.row_nbytes,
+            }
+        )
+
+
+FLOAT32_LAYOUT = PackedLayout()
+COMPACT_LAYOUT = PackedLayout(quaternions="float16", colors="uint8", opacities="uint8")
+
+
+class PackedGaussians:
+    """Gaussians stored as a single contiguous buffer with one row per Gaussian.
+
+    Attributes are accessed through views into the buffer, which avoids copies for
+    float32 columns. Unlike Gaussians3D, packed Gaussians have no batch dimension.
+    """
+
+    def __init__(self, data: torch.Tensor, layout: PackedLayout = FLOAT32_LAYOUT):
+        """Initialize PackedGaussians.
+
+        Args:
+            data: The uint8 buffer with shape num_gaussians x layout.row_nbytes.
+            layout: The layout of a row.
+        """
+        if data.dtype != torch.uint8 or data.ndim != 2 or data.shape[1] != layout.row_nbytes:
+            raise ValueError(
+                f"Expected uint8 buffer with {layout.row_nbytes} bytes per row, "
+                f"but received {data.dtype} buffer with shape {tuple(data.shape)}."
+            )
+        if not data.is_contiguous():
+            raise ValueError("Packed buffer must be contiguous.")
+        self.data = data
+        self.layout = layout
+
+    @classmethod
+    def empty(
+        cls,
+        num_gaussians: int,
+        layout: PackedLayout = FLOAT32_LAYOUT,
+        device: torch.device | str = "cpu",
+    ) -> PackedGaussians:
+        """Allocate an uninitialized buffer."""
+        data = torch.empty(num_gaussians, layout.row_nbytes, dtype=torch.uint8, device=device)
+        return cls(data, layout)
+
+    @classmethod
+    def from_gaussians(
+        cls, gaussians: Gaussians3D, layout: PackedLayout = FLOAT32_LAYOUT
+    ) -> PackedGaussians:
+        """Pack Gaussians. All batch elements are concatenated."""
+        num_gaussians = gaussians.mean_vectors.shape[0] * gaussians.mean_vectors.shape[1]
+        packed = cls.empty(num_gaussians, layout, device=gaussians.mean_vectors.device)
+        for name in ATTRIBUTE_WIDTHS:
+            values = getattr(gaussians, name).detach()
+            packed.set_column(name, values.reshape(num_gaussians, ATTRIBUTE_WIDTHS[name]))
+        return packed
+
+    @classmethod
+    def from_numpy(cls, array: np.ndarray, layout: PackedLayout | None = None) -> PackedGaussians:
+        """Wrap a structured array created by to_numpy() without copying.
+
+        Args:
+            array: The structured array.
+            layout: The layout of the array. If None, the array has to use FLOAT32_LAYOUT
+                or COMPACT_LAYOUT.
+
+        Returns:
+            The packed Gaussians sharing the memory of the array.
+        """
+        if layout is None:
+            layout = next(
+                (
+                    layout
+                    for layout in (FLOAT32_LAYOUT, COMPACT_LAYOUT)
+                    if array.dtype == layout.numpy_dtype
+                ),
+                None,
+            )
+            if layout is None:
+                raise ValueError(f"Unsupported dtype {array.dtype} of packed Gaussians.")
+        elif array.dtype != layout.numpy_dtype:
+            raise ValueError(f"Dtype {array.dtype} does not match the layout {layout}.")
+        if not array.flags.c_contiguous:
+            raise ValueError("Structured array must be contiguous.")
+        data = torch.from_numpy(array.view(np.uint8).reshape(len(array), layout.row_nbytes))
+        return cls(data, layout)
+
+    @classmethod
+    def from_ply_vertices(
+        cls,
+        vertices: np.ndarray,
+        color_space: cs_utils.ColorSpace = "sRGB",
+        layout: PackedLayout = FLOAT32_LAYOUT,
+    ) -> PackedGaussians:
+        """Decode the records of a PLY vertex element written by save_ply().
+
+        Args:
+            vertices: The structured array of the vertex element.
+            color_space: The color space the colors are stored in.
+            layout: The layout of the packed Gaussians.
+
+        Returns:
+            The packed Gaussians with linearRGB colors.
+        """
+
+        def _stack(names: list[str]) -> torch.Tensor:
+            return torch.from_numpy(
+                np.stack([np.asarray(vertices[name], dtype=np.float32) for name in names], -1)
+            )
+
+        packed = cls.empty(len(vertices), layout)
+        packed.set_column("mean_vectors", _stack(["x", "y", "z"]))
+        packed.set_column("singular_values", _stack([f"scale_{i}" for i in range(3)]).exp())
+        packed.set_column("quaternions", _stack([f"rot_{i}" for i in range(4)]))
+        colors = convert_spherical_harmonics_to_rgb(_stack([f"f_dc_{i}" for i in range(3)]))
+        if color_space == "sRGB":
+            colors = cs_utils.sRGB2linearRGB(colors)
+        packed.set_column("colors", colors)
+        packed.set_column("opacities", _stack(["opacity"]).sigmoid())
+        return packed
+
+    def __len__(self) -> int:
+        """Return the number of Gaussians."""
+        return self.data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the buffer in bytes."""
+        return self.data.numel()
+
+    def get_storage_view(self, name: GaussianAttribute) -> torch.Tensor:
+        """Return a view of a column in its storage dtype."""
+        column = self.layout.columns[name]
+        raw = self.data[:, column.offset : column.offset + column.nbytes]
+        return raw.view(_TORCH_DTYPES[column.storage])
+
+    def get_column(self, name: GaussianAttribute) -> torch.Tensor:
+        """Return a float32 column, which is a view for float32 storage."""
+        values = self.get_storage_view(name)
+        if values.dtype == torch.uint8:
+            return values.float() / 255.0
+        return values.float()
+
+    def set_column(self, name: GaussianAttribute, values: torch.Tensor) -> None:
+        """Encode values of shape num_gaussians x width into a column."""
+        view = self.get_storage_view(name)
+        if view.dtype == torch.uint8:
+            values = (values.clamp(0.0, 1.0) * 255.0).round()
+        view.copy_(values.reshape(view.shape))
+
+    @property
+    def mean_vectors(self) -> torch.Tensor:
+        """The centers of the Gaussians."""
+        return self.get_column("mean_vectors")
+
+    @property
+    def singular_values(self) -> torch.Tensor:
+        """The scales of the Gaussians."""
+        return self.get_column("singular_values")
+
+    @property
+    def quaternions(self) -> torch.Tensor:
+        """The orientations of the Gaussians."""
+        return self.get_column("quaternions")
+
+    @property
+    def colors(self) -> torch.Tensor:
+        """The linearRGB colors of the Gaussians."""
+        return self.get_column("colors")
+
+    @property
+    def opacities(self) -> torch.Tensor:
+        """The opacities of the Gaussians."""
+        return self.get_column("opacities")[:, 0]
+
+    def to(self, device: torch.device | str) -> PackedGaussians:
+        """Move the buffer to a device with a single copy."""
+        return PackedGaussians(self.data.to(device), self.layout)
+
+    def to_gaussians(self) -> Gaussians3D:
+        """Convert to Gaussians3D with a batch dimension of 1.
+
+        Float32 columns are returned as (strided) views into the buffer.
+        """
+        return Gaussians3D(
+            mean_vectors=self.mean_vectors[None],
+            singular_values=self.singular_values[None],
+            quaternions=self.quaternions[None],
+            colors=self.colors[None],
+            opacities=self.opacities[None],
+        )
+
+    def to_numpy(self) -> np.ndarray:
+        """Return a structured array view of the buffer (CPU only)."""
+        if self.data.device.type != "cpu":
+            raise ValueError("Structured array views are only available on CPU.")
+        return self.data.numpy().view(self.layout.numpy_dtype).reshape(len(self))
+
+    def to_ply_vertices(
+        self, memory_budget_bytes: int = chunking.DEFAULT_MEMORY_BUDGET_BYTES
+    ) -> np.ndarray:
+        """Encode into the records of a PLY vertex element as written by save_ply()."""
+        return convert_gaussians_to_ply_vertices(self.to_gaussians(), memory_budget_bytes)
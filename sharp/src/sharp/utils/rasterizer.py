@@ -0,0 +1,398 @@
+"""Contains a tile-based CPU rasterizer for 3D Gaussians.
+
+The rasterizer follows the classic rasterization mode of gsplat: Gaussians are
+projected with the EWA splatting approximation, binned into screen-space tiles,
+sorted by depth within each tile and alpha-composited front to back.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import math
+from typing import NamedTuple
+
+import torch
+
+from sharp.utils import linalg
+
+LOGGER = logging.getLogger(__name__)
+
+# Same thresholds as the gsplat CUDA kernels.
+MIN_ALPHA = 1.0 / 255.0
+MAX_ALPHA = 0.999
+MIN_TRANSMITTANCE = 1e-4
+
+
+class ProjectedGaussians(NamedTuple):
+    """Screen-space parameters of the visible Gaussians."""
+
+    # Indices of the visible Gaussians into the input arrays.
+    indices: torch.Tensor
+    means2d: torch.Tensor
+    # Upper triangle (a, b, c) of the inverse 2D covariance matrices.
+    conics: torch.Tensor
+    depths: torch.Tensor
+    # Half extents of the screen-space bounding boxes in x and y.
+    radii: torch.Tensor
+
+
+def compute_principal_axes(quats: torch.Tensor, scales: torch.Tensor) -> torch.Tensor:
+    """Compute the scaled principal axes R S of Gaussians, which are view independent.
+
+    Args:
+        quats: The (unnormalized) quaternions with shape N x 4.
+        scales: The scales of the Gaussians with shape N x 3.
+
+    Returns:
+        The matrices R S with shape N x 3 x 3 whose columns are the scaled axes.
+    """
+    return linalg.rotation_matrices_from_quaternions(quats) * scales[:, None, :]
+
+
+def project_gaussians(
+    means: torch.Tensor,
+    principal_axes: torch.Tensor,
+    opacities: torch.Tensor,
+    viewmat: torch.Tensor,
+    K: torch.Tensor,
+    width: int,
+    height: int,
+    eps2d: float = 0.3,
+    near_plane: float = 0.01,
+    far_plane: float = 1e10,
+) -> ProjectedGaussians:
+    """Project 3D Gaussians to 2D with the EWA splatting approximation.
+
+    Args:
+        means: The centers of the Gaussians with shape N x 3.
+        principal_axes: The scaled principal axes from compute_principal_axes().
+        opacities: The opacities of the Gaussians with shape N.
+        viewmat: The 4x4 world-to-camera matrix in OpenCV format.
+        K: The 3x3 intrinsics matrix.
+        width: The image width.
+        height: The image height.
+        eps2d: Value added to the diagonal of the 2D covariances (low pass filter).
+        near_plane: Gaussians closer to the camera are culled.
+        far_plane: Gaussians further away from the camera are culled.
+
+    Returns:
+        The projected Gaussians which are visible in the image.
+    """
+    rotation_view = viewmat[:3, :3]
+    means_cam = means @ rotation_view.T + viewmat[:3, 3]
+    x, y, z = means_cam.unbind(-1)
+    fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+
+    # Clamp the points used for the Jacobian to a slightly enlarged frustum to avoid
+    # extreme distortions of Gaussians close to the image plane.
+    z_safe = z.clamp(min=near_plane)
+    lim_x_pos = (width - cx) / fx + 0.15 * width / fx
+    lim_x_neg = cx / fx + 0.15 * width / fx
+    lim_y_pos = (height - cy) / fy + 0.15 * height / fy
+    lim_y_neg = cy / fy + 0.15 * height / fy
+    tx = z_safe * torch.clamp(x / z_safe, min=-lim_x_neg, max=lim_x_pos)
+    ty = z_safe * torch.clamp(y / z_safe, min=-lim_y_neg, max=lim_y_pos)
+
+    # Rows of the Jacobian J = [[fx / z, 0, -fx * tx / z^2], [0, fy / z, -fy * ty / z^2]].
+    zero = torch.zeros_like(z)
+    jacobian = torch.stack(
+        [
+            torch.stack([fx / z_safe, zero, -fx * tx / z_safe**2], dim=-1),
+            torch.stack([zero, fy / z_safe, -fy * ty / z_safe**2], dim=-1),
+        ],
+        dim=-2,
+    )
+    # Covariance 2D = J W R S (J W R S)^T with W the view rotation and R S the
+    # principal axes of the Gaussian.
+    axes = rotation_view @ principal_axes
+    axes_2d = (jacobian[:, :, :, None] * axes[:, None, :, :]).sum(dim=-2)
+    cov_a = axes_2d[:, 0].square().sum(-1) + eps2d
+    cov_b = (axes_2d[:, 0] * axes_2d[:, 1]).sum(-1)
+    cov_c = axes_2d[:, 1].square().sum(-1) + eps2d
+    det = cov_a * cov_c - cov_b.square()
+
+    # Half extents of the bounding box. Like gsplat, the box is shrunk for
+    # transparent Gaussians to where their alpha drops below the threshold.
+    extend = torch.sqrt(2.0 * torch.log(opacities.clamp(min=MIN_ALPHA) / MIN_ALPHA))
+    extend = extend.clamp(max=3.33)
+    radii = torch.ceil(extend[:, None] * torch.stack([cov_a, cov_c], -1).sqrt())
+
+    means2d = torch.stack([fx * x / z_safe + cx, fy * y / z_safe + cy], dim=-1)
+    is_visible = (
+        (z > near_plane)
+        & (z < far_plane)
+        & (det > 0)
+        & (opacities >= MIN_ALPHA)
+        & (radii > 0).all(dim=-1)
+        & (means2d + radii > 0).all(dim=-1)
+        & (means2d[:, 0] - radii[:, 0] < width)
+        & (means2d[:, 1] - radii[:, 1] < height)
+    )
+    indices = torch.nonzero(is_visible).squeeze(-1)
+    det = det[indices]
+    conics = torch.stack([cov_c[indices] / det, -cov_b[indices] / det, cov_a[indices] / det], -1)
+    return ProjectedGaussians(
+        indices=indices,
+        means2d=means2d[indices],
+        conics=conics,
+        depths=z[indices],
+        radii=radii[indices],
+    )
+
+
+def _bin_gaussians_to_tiles(
+    projected: ProjectedGaussians, num_tiles_x: int, num_tiles_y: int, tile_size: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Assign Gaussians to all tiles their bounding box overlaps.
+
+    Returns:
+        The depth-sorted (local) Gaussian indices of all tiles concatenated, and the
+        offsets of each tile into that list with shape num_tiles + 1.
+    """
+    num_tiles = num_tiles_x * num_tiles_y
+    # Sort by depth once. A stable sort by tile id afterwards keeps the depth order
+    # within each tile.
+    depth_order = torch.argsort(projected.depths)
+    means2d = projected.means2d[depth_order]
+    radii = projected.radii[depth_order]
+
+    tile_min = torch.floor((means2d - radii) / tile_size).long()
+    tile_max = torch.floor((means2d + radii) / tile_size).long() + 1
+    tile_min[:, 0].clamp_(0, num_tiles_x)
+    tile_min[:, 1].clamp_(0, num_tiles_y)
+    tile_max[:, 0].clamp_(0, num_tiles_x)
+    tile_max[:, 1].clamp_(0, num_tiles_y)
+    tile_extents = tile_max - tile_min
+    num_tiles_per_gaussian = tile_extents[:, 0] * tile_extents[:, 1]
+
+    # Enumerate the tiles of each Gaussian's bounding box.
+    gaussian_ids = torch.repeat_interleave(torch.arange(len(depth_order)), num_tiles_per_gaussian)
+    first_entry = torch.cumsum(num_tiles_per_gaussian, 0) - num_tiles_per_gaussian
+    local_ids = torch.arange(len(gaussian_ids)) - first_entry[gaussian_ids]
+    extent_x = tile_extents[gaussian_ids, 0]
+    tile_x = tile_min[gaussian_ids, 0] + local_ids % extent_x
+    tile_y = tile_min[gaussian_ids, 1] + local_ids // extent_x
+    tile_ids = tile_y * num_tiles_x + tile_x
+
+    tile_ids, order = torch.sort(tile_ids, stable=True)
+    tile_offsets = torch.zeros(num_tiles + 1, dtype=torch.long)
+    tile_offsets[1:] = torch.cumsum(torch.bincount(tile_ids, minlength=num_tiles), 0)
+    return depth_order[gaussian_ids[order]], tile_offsets
+
+
+def rasterize(
+    means: torch.Tensor,
+    quats: torch.Tensor,
+    scales: torch.Tensor,
+    opacities: torch.Tensor,
+    colors: torch.Tensor,
+    viewmats: torch.Tensor,
+    Ks: torch.Tensor,
+    width: int,
+    height: int,
+    eps2d: float = 0.3,
+    tile_size: int = 8,
+    tiles_per_batch: int = 256,
+    gaussians_per_batch: int = 32,
+    num_workers: int = 4,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Render Gaussians from one or more views on CPU.
+
+    Tiles are processed in batches of tiles_per_batch tiles, sorted by the number of
+    Gaussians they contain. Within a batch, Gaussians are composited front to back in
+    steps of gaussians_per_batch until all pixels are saturated. View-independent
+    quantities are computed once for all views.
+
+    Args:
+        means: The centers of the Gaussians with shape N x 3.
+        quats: The quaternions of the Gaussians with shape N x 4.
+        scales: The scales of the Gaussians with shape N x 3.
+        opacities: The opacities of the Gaussians with shape N.
+        colors: The colors of the Gaussians with shape N x 3.
+        viewmats: The world-to-camera matrices in OpenCV format with shape V x 4 x 4.
+        Ks: The intrinsics matrices with shape V x 3 x 3.
+        width: The image width.
+        height: The image height.
+        eps2d: Value added to the diagonal of the 2D covariances (low pass filter).
+        tile_size: The side length of the square tiles in pixels.
+        tiles_per_batch: How many tiles to composite at once.
+        gaussians_per_batch: How many Gaussians per tile to composite at once.
+        num_workers: How many tile batches to process concurrently.
+
+    Returns:
+        The rendered colors and (unnormalized) depth with shape V x height x width x 4
+        and the rendered alpha with shape V x height x width x 1.
+    """
+    if means.device.type != "cpu":
+        raise ValueError("The CPU rasterizer expects all inputs on CPU.")
+    if viewmats.ndim != 3 or Ks.ndim != 3 or len(viewmats) != len(Ks):
+        raise ValueError("Expected viewmats and Ks with shapes V x 4 x 4 and V x 3 x 3.")
+    dtype = torch.float32
+    means, quats, scales, opacities, colors, viewmats, Ks = (
+        tensor.detach().to(dtype)
+        for tensor in (means, quats, scales, opacities, colors, viewmats, Ks)
+    )
+    principal_axes = compute_principal_axes(quats, scales)
+
+    executor = (
+        concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) if num_workers > 0 else None
+    )
+    try:
+        outputs = [
+            _rasterize_view(
+                project_gaussians(
+                    means, principal_axes, opacities, viewmat, K, width, height, eps2d=eps2d
+                ),
+                opacities,
+                colors,
+                width,
+                height,
+                tile_size=tile_size,
+                tiles_per_batch=tiles_per_batch,
+                gaussians_per_batch=gaussians_per_batch,
+                executor=executor,
+            )
+            for viewmat, K in zip(viewmats, Ks)
+        ]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return (
+        torch.stack([rendered for rendered, _ in outputs]),
+        torch.stack([alpha for _, alpha in outputs]),
+    )
+
+
+def _rasterize_view(
+    projected: ProjectedGaussians,
+    opacities: torch.Tensor,
+    colors: torch.Tensor,
+    width: int,
+    height: int,
+    tile_size: int,
+    tiles_per_batch: int,
+    gaussians_per_batch: int,
+    executor: concurrent.futures.Executor | None,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Composite projected Gaussians into an image, see rasterize()."""
+    dtype = torch.float32
+    num_tiles_x = math.ceil(width / tile_size)
+    num_tiles_y = math.ceil(height / tile_size)
+    sorted_ids, tile_offsets = _bin_gaussians_to_tiles(
+        projected, num_tiles_x, num_tiles_y, tile_size
+    )
+    num_gaussians = len(projected.indices)
+    # Per-Gaussian parameters of the compositing loop with an additional transparent
+    # Gaussian at the end, which is used to pad tiles with fewer Gaussians.
+    conics = projected.conics
+    params = torch.cat(
+        [
+            projected.means2d,
+            0.5 * conics[:, :1],
+            conics[:, 1:2],
+            0.5 * conics[:, 2:],
+            torch.log(opacities[projected.indices, None]),
+        ],
+        dim=-1,
+    )
+    params = torch.cat([params, params.new_tensor([[0, 0, 0, 0, 0, -torch.inf]])])
+    # Features composited per pixel: color and depth.
+    features = torch.cat([colors[projected.indices], projected.depths[:, None]], dim=-1)
+    features = torch.cat([features, features.new_zeros(1, features.shape[-1])])
+    num_features = features.shape[-1]
+    sorted_ids = torch.cat([sorted_ids, sorted_ids.new_tensor([num_gaussians])])
+
+    num_pixels_per_tile = tile_size * tile_size
+    pixel_y, pixel_x = torch.meshgrid(
+        torch.arange(tile_size, dtype=dtype), torch.arange(tile_size, dtype=dtype), indexing="ij"
+    )
+    # Pixel centers relative to the tile origin.
+    pixel_x = pixel_x.flatten() + 0.5
+    pixel_y = pixel_y.flatten() + 0.5
+
+    tile_counts = tile_offsets[1:] - tile_offsets[:-1]
+    tile_order = torch.argsort(tile_counts, descending=True)
+    tile_order = tile_order[tile_counts[tile_order] > 0]
+    LOGGER.debug(
+        "Rasterizing %d Gaussians to %d non-empty tiles with %d tile entries.",
+        num_gaussians,
+        len(tile_order),
+        len(sorted_ids) - 1,
+    )
+
+    output = torch.zeros(num_tiles_y * num_tiles_x, num_pixels_per_tile, num_features + 1)
+    steps = torch.arange(gaussians_per_batch)
+
+    def _composite_tiles(tile_ids: torch.Tensor) -> None:
+        num_tiles = len(tile_ids)
+        starts = tile_offsets[tile_ids]
+        counts = tile_counts[tile_ids]
+        tile_x = ((tile_ids % num_tiles_x) * tile_size).to(dtype)
+        tile_y = ((tile_ids // num_tiles_x) * tile_size).to(dtype)
+        pixels_x = (tile_x[:, None] + pixel_x)[:, None, :]
+        pixels_y = (tile_y[:, None] + pixel_y)[:, None, :]
+
+        accumulated = torch.zeros(num_tiles, num_pixels_per_tile, num_features)
+        transmittance = torch.ones(num_tiles, num_pixels_per_tile)
+        # Transmittance of pixels which are saturated, whose running transmittance is
+        # set to zero instead to exclude them from further updates.
+        final_transmittance = torch.zeros(num_tiles, num_pixels_per_tile)
+
+        for batch_start in range(0, int(counts.max()), gaussians_per_batch):
+            entries = batch_start + steps
+            entry_ids = torch.where(
+                entries < counts[:, None], starts[:, None] + entries, len(sorted_ids) - 1
+            )
+            gaussian_ids = sorted_ids[entry_ids]
+
+            mean_x, mean_y, half_a, b, half_c, log_opacity = params[gaussian_ids, :, None].unbind(2)
+            delta_x = pixels_x - mean_x
+            delta_y = pixels_y - mean_y
+            # Exponent of the Gaussian, which is non-negative as conics are positive definite.
+            sigma = (half_a * delta_x + b * delta_y) * delta_x + half_c * delta_y.square()
+            # Clamping the exponent avoids slow denormal results far below the threshold.
+            alpha = torch.exp((log_opacity - sigma).clamp_(min=-10.0)).clamp_(max=MAX_ALPHA)
+            alpha = torch.where(alpha >= MIN_ALPHA, alpha, 0.0)
+
+            # Transmittance before and after each Gaussian. A pixel stops at the first
+            # Gaussian which would reduce its transmittance below the threshold.
+            transmittance_after = transmittance[:, None, :] * torch.cumprod(1.0 - alpha, dim=1)
+            transmittance_before = torch.cat(
+                [transmittance[:, None, :], transmittance_after[:, :-1]], dim=1
+            )
+            weights = torch.where(
+                transmittance_after > MIN_TRANSMITTANCE,
+                transmittance_before - transmittance_after,
+                0.0,
+            )
+            accumulated += torch.bmm(weights.transpose(1, 2), features[gaussian_ids])
+            # The weights telescope to the change of transmittance.
+            transmittance = transmittance - weights.sum(dim=1)
+            is_saturated = (transmittance_after[:, -1] <= MIN_TRANSMITTANCE) & (transmittance > 0)
+            final_transmittance = torch.where(is_saturated, transmittance, final_transmittance)
+            transmittance = torch.where(is_saturated, 0.0, transmittance)
+            if not bool(transmittance.any()):
+                break
+
+        output[tile_ids, :, :num_features] = accumulated
+        output[tile_ids, :, num_features] = 1.0 - (transmittance + final_transmittance)
+
+    # Splitting an empty tensor returns one empty batch, which would fail below.
+    batches = torch.split(tile_order, tiles_per_batch) if len(tile_order) > 0 else ()
+    if executor is not None and len(batches) > 1:
+        # Consume the iterator to propagate exceptions.
+        list(executor.map(_composite_tiles, batches))
+    else:
+        for batch in batches:
+            _composite_tiles(batch)
+
+    image = output.reshape(num_tiles_y, num_tiles_x, tile_size, tile_size, num_features + 1)
+    image = image.permute(0, 2, 1, 3, 4).reshape(
+        num_tiles_y * tile_size, num_tiles_x * tile_size, num_features + 1
+    )
+    image = image[:height, :width]
+    return image[..., :num_features].contiguous(), image[..., num_features:].contiguous()
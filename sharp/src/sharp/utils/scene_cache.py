@@ -0,0 +1,124 @@
+"""Contains an LRU cache of scenes which are kept resident on a device.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import logging
+import threading
+from typing import Callable
+
+import torch
+
+from sharp.utils.gaussians import Gaussians3D, SceneMetaData
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class CachedScene:
+    """A scene resident on the device of the cache."""
+
+    gaussians: Gaussians3D
+    metadata: SceneMetaData
+    nbytes: int
+
+
+def get_gaussians_nbytes(gaussians: Gaussians3D) -> int:
+    """Return the memory used by the tensors of Gaussians."""
+    return sum(
+        tensor.numel() * tensor.element_size()
+        for tensor in (
+            gaussians.mean_vectors,
+            gaussians.singular_values,
+            gaussians.quaternions,
+            gaussians.colors,
+            gaussians.opacities,
+        )
+    )
+
+
+class SceneCache:
+    """Thread-safe LRU cache of scenes on a device.
+
+    Scenes are loaded with load_fn on a cache miss and the least recently used
+    scenes are evicted once either max_scenes or max_bytes is exceeded. The most
+    recently used scene is always kept, even if it exceeds max_bytes on its own.
+    """
+
+    def __init__(
+        self,
+        load_fn: Callable[[str], tuple[Gaussians3D, SceneMetaData]],
+        device: torch.device | str = "cpu",
+        max_scenes: int = 8,
+        max_bytes: int | None = None,
+    ):
+        """Initialize SceneCache.
+
+        Args:
+            load_fn: Function to load the Gaussians and metadata of a scene id.
+            device: The device to keep the scenes on.
+            max_scenes: Maximum number of resident scenes.
+            max_bytes: Maximum memory of all resident scenes.
+        """
+        if max_scenes < 1:
+            raise ValueError("Scene cache must hold at least one scene.")
+        self.load_fn = load_fn
+        self.device = torch.device(device)
+        self.max_scenes = max_scenes
+        self.max_bytes = max_bytes
+        self.num_hits = 0
+        self.num_misses = 0
+        self._scenes: collections.OrderedDict[str, CachedScene] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of resident scenes."""
+        return len(self._scenes)
+
+    def __contains__(self, scene_id: str) -> bool:
+        """Check whether a scene is resident."""
+        return scene_id in self._scenes
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all resident scenes."""
+        return sum(scene.nbytes for scene in self._scenes.values())
+
+    def get(self, scene_id: str) -> CachedScene:
+        """Return a resident scene, loading it on a cache miss."""
+        with self._lock:
+            scene = self._scenes.get(scene_id)
+            if scene is not None:
+                self._scenes.move_to_end(scene_id)
+                self.num_hits += 1
+                return scene
+            self.num_misses += 1
+
+        # Load outside of the lock so hits are not blocked by slow loads.
+        LOGGER.info("Loading scene %s to %s.", scene_id, self.device)
+        gaussians, metadata = self.load_fn(scene_id)
+        gaussians = gaussians.to(self.device)
+        scene = CachedScene(gaussians, metadata, get_gaussians_nbytes(gaussians))
+
+        with self._lock:
+            self._scenes[scene_id] = scene
+            self._scenes.move_to_end(scene_id)
+            self._evict()
+        return scene
+
+    def clear(self) -> None:
+        """Evict all scenes."""
+        with self._lock:
+            self._scenes.clear()
+
+    def _evict(self) -> None:
+        while len(self._scenes) > self.max_scenes or (
+            self.max_bytes is not None and len(self._scenes) > 1 and self.nbytes > self.max_bytes
+        ):
+            scene_id, _ = self._scenes.popitem(last=False)
+            LOGGER.debug("Evicted scene %s.", scene_id)
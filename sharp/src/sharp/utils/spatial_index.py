@@ -0,0 +1,150 @@
+"""Contains a spatial index over Gaussian positions for neighborhood and region queries.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import torch
+
+from sharp.utils.gaussians import Gaussians3D
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SpatialIndex:
+    """KD-tree over 3D points with vectorized radius, kNN and box queries.
+
+    All queries return indices into the points the index was originally built from,
+    also for label-filtered subsets created with subset().
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray | torch.Tensor,
+        indices: np.ndarray | None = None,
+        leafsize: int = 16,
+        num_workers: int = -1,
+    ):
+        """Build a spatial index.
+
+        Args:
+            points: The points with shape N x 3.
+            indices: The original indices of the points. Defaults to 0, ..., N - 1.
+            leafsize: Leaf size of the KD-tree.
+            num_workers: How many threads to use for queries (-1 uses all cores).
+        """
+        # We import scipy lazily as only few code paths require a spatial index.
+        from scipy.spatial import cKDTree
+
+        if isinstance(points, torch.Tensor):
+            points = points.detach().cpu().numpy()
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"Expected points with shape N x 3, but received {points.shape}.")
+        if indices is None:
+            indices = np.arange(len(points))
+        elif len(indices) != len(points):
+            raise ValueError("Received different numbers of points and indices.")
+
+        self.points = points
+        self.indices = indices
+        self.num_workers = num_workers
+        self.tree = cKDTree(points, leafsize=leafsize, balanced_tree=False, compact_nodes=False)
+
+    @classmethod
+    def from_gaussians(cls, gaussians: Gaussians3D, **kwargs) -> SpatialIndex:
+        """Build a spatial index over the mean vectors of Gaussians with batch size 1."""
+        if gaussians.mean_vectors.shape[0] != 1:
+            raise ValueError("Spatial index only supports Gaussians with batch size 1.")
+        return cls(gaussians.mean_vectors[0], **kwargs)
+
+    def __len__(self) -> int:
+        """Return the number of indexed points."""
+        return len(self.points)
+
+    def subset(self, mask: np.ndarray | torch.Tensor) -> SpatialIndex:
+        """Build an index over the points selected by a boolean mask, e.g. a label."""
+        if isinstance(mask, torch.Tensor):
+            mask = mask.detach().cpu().numpy()
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self),):
+            raise ValueError(f"Expected mask with shape ({len(self)},), but received {mask.shape}.")
+        return SpatialIndex(
+            self.points[mask],
+            indices=self.indices[mask],
+            leafsize=self.tree.leafsize,
+            num_workers=self.num_workers,
+        )
+
+    def query_radius(self, centers: np.ndarray, radius: float) -> list[np.ndarray]:
+        """Find all points within a radius around each center.
+
+        Args:
+            centers: The query points with shape M x 3.
+            radius: The search radius.
+
+        Returns:
+            A list with the (unsorted) indices of the neighbors of each center.
+        """
+        centers = np.atleast_2d(centers)
+        neighbors = self.tree.query_ball_point(centers, r=radius, workers=self.num_workers)
+        return [self.indices[np.asarray(item, dtype=np.int64)] for item in neighbors]
+
+    def count_radius(self, centers: np.ndarray, radius: float) -> np.ndarray:
+        """Count the points within a radius around each center."""
+        centers = np.atleast_2d(centers)
+        return self.tree.query_ball_point(
+            centers, r=radius, workers=self.num_workers, return_length=True
+        )
+
+    def query_knn(self, centers: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Find the k nearest neighbors of each center.
+
+        Args:
+            centers: The query points with shape M x 3.
+            k: How many neighbors to return.
+
+        Returns:
+            The distances and indices of the neighbors with shape M x k, sorted by
+            distance. Missing neighbors (if k > len(self)) have infinite distance and
+            index -1.
+        """
+        centers = np.atleast_2d(centers)
+        # Passing a list of neighbor ranks always returns arrays of shape M x k.
+        distances, positions = self.tree.query(
+            centers, k=list(range(1, k + 1)), workers=self.num_workers
+        )
+        is_valid = positions < len(self)
+        indices = np.where(is_valid, self.indices[np.minimum(positions, len(self) - 1)], -1)
+        return distances, indices
+
+    def query_box(self, min_corners: np.ndarray, max_corners: np.ndarray) -> list[np.ndarray]:
+        """Find all points inside axis-aligned boxes (inclusive).
+
+        Args:
+            min_corners: The minimum corners of the boxes with shape M x 3.
+            max_corners: The maximum corners of the boxes with shape M x 3.
+
+        Returns:
+            A list with the (unsorted) indices of the points inside each box.
+        """
+        min_corners = np.atleast_2d(np.asarray(min_corners, dtype=np.float64))
+        max_corners = np.atleast_2d(np.asarray(max_corners, dtype=np.float64))
+        centers = 0.5 * (min_corners + max_corners)
+        half_extents = 0.5 * (max_corners - min_corners)
+        # Find candidates in the enclosing cube with the Chebyshev distance and filter them.
+        candidates = self.tree.query_ball_point(
+            centers, r=half_extents.max(axis=-1), p=np.inf, workers=self.num_workers
+        )
+        results = []
+        for positions, min_corner, max_corner in zip(candidates, min_corners, max_corners):
+            positions = np.asarray(positions, dtype=np.int64)
+            points = self.points[positions]
+            inside = np.all((points >= min_corner) & (points <= max_corner), axis=-1)
+            results.append(self.indices[positions[inside]])
+        return results
@@ -6,9 +6,9 @@ Copyright (C) 2025 Apple Inc. All Rights Reserved.
 
 from __future__ import annotations
 
-import numpy as np
 import torch
-from matplotlib import pyplot as plt
+
+from sharp.utils import colormaps
 
 METRIC_DEPTH_MAX_CLAMP_METER = 50.0
 
@@ -42,30 +42,38 @@ def colorize_alpha(alpha: torch.Tensor) -> torch.Tensor:
 
 
 def colorize_scalar_map(
-    scalar_map: torch.Tensor, val_min=0.0, val_max=1.0, color_map: str = "jet"
+    scalar_map: torch.Tensor,
+    val_min=0.0,
+    val_max=1.0,
+    color_map: colormaps.ColorMap | str = "jet",
 ) -> torch.Tensor:
     """Colorize a scalar map of.
 
+    Colors are looked up on the device of the scalar map and match matplotlib's
+    quantization. NaN values are colored black.
+
     Args:
         scalar_map: Map of with format BHW.
         val_min: Minimu value to display.
         val_max: Maximum value to display.
-        color_map: Which color map to use. Will be passed to matplotlob.
+        color_map: Which color map to use, see colormaps.get_colormap_lut().
 
     Returns:
-        A colorized image with format BHWC.
+        A colorized uint8 image with format BHWC.
     """
     if scalar_map.ndim not in (2, 3, 4):
         raise ValueError("Only scalar maps of 2 or 3 or 4 dimensions supported.")
 
-    cmap = plt.get_cmap(color_map)
-
-    scalar_map_np = scalar_map.detach().cpu().float().numpy()
-    scalar_map_np = (scalar_map_np - val_min) / (val_max - val_min)
-    scalar_map_np = np.clip(scalar_map_np, a_min=0.0, a_max=1.0)
+    lut = colormaps.get_colormap_lut(color_map, device=scalar_map.device)
+    num_colors = len(lut)
+    # Extend the table by the last color for values of exactly 1.0, which matplotlib
+    # maps to the last entry, and by black for NaN values.
+    lut = torch.cat([lut, lut[-1:], torch.zeros_like(lut[:1])])
 
-    color_map_np = cmap(scalar_map_np)[..., :3]
-    tensor = torch.as_tensor(color_map_np * 255.0, dtype=torch.uint8)
+    indices = scalar_map.detach().float() - val_min
+    indices.div_(val_max - val_min).clamp_(0.0, 1.0).mul_(num_colors)
+    indices = indices.nan_to_num_(nan=num_colors + 1).to(torch.int32)
+    tensor = lut.index_select(0, indices.flatten()).reshape(*indices.shape, 3)
 
     if tensor.ndim == 3:
         return tensor.permute(2, 0, 1)
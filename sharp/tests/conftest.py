@@ -0,0 +1,32 @@
+"""Contains shared fixtures of the tests.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+import torch
+
+from sharp.utils.gaussians import Gaussians3D
+
+
+def _create_gaussians(num_gaussians: int = 100, seed: int = 0) -> Gaussians3D:
+    generator = torch.Generator().manual_seed(seed)
+    return Gaussians3D(
+        mean_vectors=torch.randn(1, num_gaussians, 3, generator=generator),
+        singular_values=torch.rand(1, num_gaussians, 3, generator=generator) + 0.1,
+        # Unnormalized quaternions as predicted by the model.
+        quaternions=2.0 * torch.randn(1, num_gaussians, 4, generator=generator),
+        colors=torch.rand(1, num_gaussians, 3, generator=generator),
+        opacities=torch.rand(1, num_gaussians, generator=generator),
+    )
+
+
+@pytest.fixture
+def create_gaussians() -> Callable[..., Gaussians3D]:
+    """Return a factory of seeded random Gaussians with batch size 1."""
+    return _create_gaussians
@@ -0,0 +1,115 @@
+"""Contains tests for the chunked processing utilities.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+import torch
+
+from sharp.utils import chunking
+
+
+def _normalize_and_sum(values: torch.Tensor, weights: torch.Tensor):
+    return values / torch.linalg.norm(values, dim=-1, keepdim=True), (values * weights).sum(-1)
+
+
+@pytest.mark.parametrize("num_workers", [0, 1, 3])
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1000])
+def test_map_chunks_matches_unchunked(num_workers, chunk_size):
+    """Test chunks of tensor and numpy outputs, including a smaller last chunk."""
+    generator = torch.Generator().manual_seed(0)
+    values = torch.randn(100, 3, generator=generator)
+    weights = torch.rand(100, 3, generator=generator)
+    normalized_expected, sums_expected = _normalize_and_sum(values, weights)
+
+    normalized = torch.empty(100, 3)
+    sums = np.empty(100, dtype=np.float32)
+    chunk_sizes = []
+    lock = threading.Lock()
+
+    def _fn(values_chunk, weights_chunk):
+        with lock:
+            chunk_sizes.append(len(values_chunk))
+        return _normalize_and_sum(values_chunk, weights_chunk)
+
+    chunking.map_chunks(
+        _fn, [values, weights], [normalized, sums], chunk_size, num_workers=num_workers
+    )
+    assert torch.equal(normalized, normalized_expected)
+    np.testing.assert_array_equal(sums, sums_expected.numpy())
+
+    num_full_chunks, last_chunk_size = divmod(100, chunk_size)
+    chunk_sizes_expected = [chunk_size] * num_full_chunks
+    if last_chunk_size > 0:
+        chunk_sizes_expected.append(last_chunk_size)
+    assert sorted(chunk_sizes, reverse=True) == chunk_sizes_expected
+
+
+def test_map_chunks_along_last_dim():
+    """Test chunking along a negative dimension."""
+    values = torch.arange(2 * 10, dtype=torch.float32).reshape(2, 10)
+    outputs = np.zeros((2, 10), dtype=np.float32)
+    chunking.map_chunks(lambda chunk: (2.0 * chunk,), [values], [outputs], 3, dim=-1)
+    np.testing.assert_array_equal(outputs, 2.0 * values.numpy())
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_map_chunks_zero_length(num_workers):
+    """Test that empty inputs never call the function."""
+
+    def _fn(values):
+        raise AssertionError("Called for empty inputs.")
+
+    outputs = torch.empty(0, 3)
+    chunking.map_chunks(_fn, [torch.empty(0, 3)], [outputs], 16, num_workers=num_workers)
+    assert outputs.shape == (0, 3)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_map_chunks_propagates_errors(num_workers):
+    """Test that errors in any chunk are raised to the caller."""
+
+    def _fn(values):
+        if values[0] >= 50:
+            raise RuntimeError("Chunk failed.")
+        return (values,)
+
+    with pytest.raises(RuntimeError, match="Chunk failed."):
+        chunking.map_chunks(
+            _fn, [torch.arange(100)], [torch.empty(100)], 10, num_workers=num_workers
+        )
+
+
+def test_map_chunks_invalid_arguments():
+    """Test the validation of inputs, outputs, results and chunk size."""
+    values = torch.zeros(10)
+    with pytest.raises(ValueError):
+        chunking.map_chunks(lambda: (), [], [], 4)
+    with pytest.raises(ValueError):
+        chunking.map_chunks(lambda chunk: (chunk,), [values], [torch.zeros(9)], 4)
+    with pytest.raises(ValueError):
+        chunking.map_chunks(lambda chunk: (chunk,), [values], [torch.zeros(10)], 0)
+    with pytest.raises(ValueError):
+        chunking.map_chunks(lambda chunk: (chunk, chunk), [values], [torch.zeros(10)], 4)
+
+
+@pytest.mark.parametrize(
+    "bytes_per_item,memory_budget_bytes,num_workers,chunk_size",
+    [
+        (100, 100_000, 0, 1024),
+        (100, 1_000_000, 0, 10_000),
+        (100, 1_000_000, 1, 10_000),
+        (100, 1_000_000, 4, 2_500),
+        (100, 1_000_000, 8, 1_250),
+        (3, 1_000_000, 0, 333_333),
+    ],
+)
+def test_get_chunk_size(bytes_per_item, memory_budget_bytes, num_workers, chunk_size):
+    """Test that the budget is shared by the workers and bounded by the minimum."""
+    assert chunking.get_chunk_size(bytes_per_item, memory_budget_bytes, num_workers) == chunk_size
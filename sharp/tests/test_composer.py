@@ -0,0 +1,138 @@
+"""Contains tests for the Gaussian initializer and composer.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from sharp.models.composer import GaussianComposer
+from sharp.models.initializer import GaussianBaseValues, MultiLayerInitializer
+from sharp.models.params import DeltaFactor
+from sharp.utils import math as math_utils
+
+NUM_LAYERS = 2
+BATCH_SIZE = 2
+STRIDE = 2
+IMAGE_SIZE = 32
+
+
+def _create_inputs() -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    generator = torch.Generator().manual_seed(0)
+    image = torch.rand(BATCH_SIZE, 3, IMAGE_SIZE, IMAGE_SIZE, generator=generator)
+    depth = 1.0 + 9.0 * torch.rand(BATCH_SIZE, 2, IMAGE_SIZE, IMAGE_SIZE, generator=generator)
+    base_size = IMAGE_SIZE // STRIDE
+    delta = torch.randn(BATCH_SIZE, 14, NUM_LAYERS, base_size, base_size, generator=generator)
+    return image, depth, delta
+
+
+def _create_base_xy_reference(depth: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    """Create the base x and y coordinates by repeating them, as before broadcasting."""
+    batch_size, _, image_height, image_width = depth.shape
+    xx = torch.arange(0.5 * STRIDE, image_width, STRIDE)
+    yy = torch.arange(0.5 * STRIDE, image_height, STRIDE)
+    xx = 2 * xx / image_width - 1.0
+    yy = 2 * yy / image_height - 1.0
+    xx, yy = torch.meshgrid(xx, yy, indexing="xy")
+    return (
+        xx[None, None, None].repeat(batch_size, 1, NUM_LAYERS, 1, 1),
+        yy[None, None, None].repeat(batch_size, 1, NUM_LAYERS, 1, 1),
+    )
+
+
+def _forward_mean_reference(
+    base_values: GaussianBaseValues, delta: torch.Tensor, delta_factor: DeltaFactor
+) -> torch.Tensor:
+    """Compose the means with masks and repeated base values, as before broadcasting."""
+    delta_factor_tensor = torch.tensor([delta_factor.xy, delta_factor.xy, delta_factor.z])[
+        None, :, None, None, None
+    ]
+    target_shape = (1, 3, 1, 1, 1)
+    mean_x_mask = torch.tensor([1.0, 0.0, 0.0]).reshape(target_shape)
+    mean_y_mask = torch.tensor([0.0, 1.0, 0.0]).reshape(target_shape)
+    mean_z_mask = torch.tensor([0.0, 0.0, 1.0]).reshape(target_shape)
+    base = (
+        base_values.mean_x_ndc.repeat(target_shape) * mean_x_mask
+        + base_values.mean_y_ndc.repeat(target_shape) * mean_y_mask
+        + base_values.mean_inverse_z_ndc.repeat(target_shape) * mean_z_mask
+    )
+    learned_delta = delta_factor_tensor * delta[:, :3]
+    xx = base[:, 0:1] + learned_delta[:, 0:1]
+    yy = base[:, 1:2] + learned_delta[:, 1:2]
+    inverse_zz = F.softplus(math_utils.inverse_softplus(base[:, 2:3]) + learned_delta[:, 2:3])
+    zz = 1.0 / (inverse_zz + 1e-3)
+    return torch.cat([zz * xx, zz * yy, zz], dim=1)
+
+
+@pytest.mark.parametrize(
+    "color_option,rest_layer_depth_option",
+    [
+        ("all_layers", "surface_min"),
+        ("first_layer", "linear_disparity"),
+        ("none", "base_depth"),
+    ],
+)
+def test_initializer_and_composer_match_materialized_base_values(
+    color_option, rest_layer_depth_option
+):
+    """Test that broadcast base values compose the same Gaussians as repeated ones."""
+    initializer = MultiLayerInitializer(
+        num_layers=NUM_LAYERS,
+        stride=STRIDE,
+        base_depth=10.0,
+        scale_factor=1.0,
+        disparity_factor=1.0,
+        color_option=color_option,
+        rest_layer_depth_option=rest_layer_depth_option,
+    )
+    delta_factor = DeltaFactor(xy=0.1, z=0.1)
+    composer = GaussianComposer(
+        delta_factor=delta_factor,
+        min_scale=0.0,
+        max_scale=10.0,
+        color_activation_type="sigmoid",
+        opacity_activation_type="sigmoid",
+        color_space="linearRGB",
+        base_scale_on_predicted_mean=True,
+    )
+    image, depth, delta = _create_inputs()
+    output = initializer(image, depth)
+    base_values = output.gaussian_base_values
+
+    base_x_ndc, base_y_ndc = _create_base_xy_reference(depth)
+    assert torch.equal(base_values.mean_x_ndc, base_x_ndc)
+    assert torch.equal(base_values.mean_y_ndc, base_y_ndc)
+    if color_option == "all_layers":
+        colors = F.avg_pool2d(image, STRIDE, STRIDE)[:, :, None].repeat(1, 1, NUM_LAYERS, 1, 1)
+        assert torch.equal(base_values.colors, colors)
+    if rest_layer_depth_option == "linear_disparity":
+        disparity = torch.linspace(1.0 / 10.0, 0.0, NUM_LAYERS)[None, None, :-1, None, None]
+        disparity = disparity.repeat(BATCH_SIZE, 1, 1, *base_x_ndc.shape[-2:])
+        assert torch.equal(base_values.mean_inverse_z_ndc[:, :, 1:], disparity)
+
+    gaussians = composer(delta, base_values, output.global_scale)
+    base_values_materialized = GaussianBaseValues(
+        *(value.contiguous().clone() for value in base_values)
+    )
+    gaussians_expected = composer(delta, base_values_materialized, output.global_scale)
+    mean_vectors_expected = _forward_mean_reference(base_values_materialized, delta, delta_factor)
+    mean_vectors_expected = mean_vectors_expected.permute(0, 2, 3, 4, 1).flatten(1, 3)
+    mean_vectors_expected = output.global_scale[:, None, None] * mean_vectors_expected
+
+    assert torch.equal(gaussians.mean_vectors, mean_vectors_expected)
+    for values, values_expected in zip(gaussians, gaussians_expected):
+        assert torch.equal(values, values_expected)
+
+    # Writing to the broadcast base values in place fails instead of changing the
+    # values of all layers and images.
+    with pytest.raises(RuntimeError):
+        base_values.mean_x_ndc.add_(1.0)
+    # Each call creates new base values.
+    output_next = initializer(image, depth)
+    assert (
+        output_next.gaussian_base_values.mean_x_ndc.data_ptr() != base_values.mean_x_ndc.data_ptr()
+    )
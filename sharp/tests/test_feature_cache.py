@@ -0,0 +1,52 @@
+"""Contains tests for the monodepth feature cache.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import torch
+
+from sharp.models import create_predictor, create_predictor_params
+from sharp.models.feature_cache import MonodepthFeatureCache, compute_weights_version
+
+
+def test_feature_cache_round_trip(tmp_path):
+    """Test that cached outputs are exact by default and rounded for float16."""
+    torch.manual_seed(0)
+    monodepth_model = create_predictor(create_predictor_params("tiny")).monodepth_model.eval()
+    weights_version = compute_weights_version(monodepth_model)
+    generator = torch.Generator().manual_seed(0)
+    image = torch.rand(1, 3, 1536, 1536, generator=generator)
+    with torch.no_grad():
+        output = monodepth_model(image)
+
+    caches = {
+        feature_dtype: MonodepthFeatureCache(
+            tmp_path / feature_dtype, weights_version, feature_dtype=feature_dtype
+        )
+        for feature_dtype in ("original", "float16")
+    }
+    keys = {feature_dtype: cache.get_key(image) for feature_dtype, cache in caches.items()}
+    assert keys["original"] != keys["float16"]
+
+    for feature_dtype, cache in caches.items():
+        assert cache.get(keys[feature_dtype], monodepth_model, image.device) is None
+        cache.put(keys[feature_dtype], output, monodepth_model)
+        with torch.no_grad():
+            output_cached = cache.get(keys[feature_dtype], monodepth_model, image.device)
+        assert output_cached is not None
+        assert cache.num_hits == 1 and cache.num_misses == 1
+
+        assert torch.equal(output_cached.disparity, output.disparity)
+        features_pairs = list(zip(output_cached.encoder_features, output.encoder_features))
+        features_pairs += list(zip(output_cached.output_features, output.output_features))
+        for feature_cached, feature in features_pairs:
+            assert feature_cached.dtype == feature.dtype
+            if feature_dtype == "original":
+                assert torch.equal(feature_cached, feature)
+            else:
+                torch.testing.assert_close(feature_cached, feature, rtol=1e-3, atol=1e-3)
+
+    assert caches["float16"].nbytes < caches["original"].nbytes
@@ -0,0 +1,120 @@
+"""Contains tests for the Gaussian utilities.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import torch
+
+from sharp.utils import gaussians as gaussians_utils
+from sharp.utils import linalg
+
+ROTATION = linalg.rotation_matrices_from_quaternions(torch.tensor([0.9, 0.1, -0.3, 0.2]))
+SHEAR = torch.tensor([[1.0, 0.5, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+
+def _create_transform(transform_linear: torch.Tensor) -> torch.Tensor:
+    return torch.cat([transform_linear, torch.tensor([[1.0], [-2.0], [0.5]])], dim=-1)
+
+
+@pytest.mark.parametrize(
+    "transform_linear,transform_type",
+    [
+        (torch.eye(3), "similarity"),
+        (ROTATION, "similarity"),
+        (2.5 * ROTATION, "similarity"),
+        (torch.diag(torch.tensor([1.0, 2.0, 3.0])), "diagonal"),
+        (torch.diag(torch.tensor([-1.0, 1.0, 1.0])), "diagonal"),
+        (-torch.eye(3), "diagonal"),
+        (SHEAR, "general"),
+        (ROTATION @ torch.diag(torch.tensor([1.0, 2.0, 3.0])), "general"),
+        (ROTATION @ torch.diag(torch.tensor([-1.0, 1.0, 1.0])), "general"),
+    ],
+)
+def test_classify_transform(transform_linear, transform_type):
+    """Test the classification of rotations, scalings, reflections and shears."""
+    assert gaussians_utils.classify_transform(transform_linear) == transform_type
+
+
+@pytest.mark.parametrize(
+    "transform_linear",
+    [
+        2.5 * ROTATION,
+        torch.diag(torch.tensor([1.0, 2.0, 3.0])),
+        torch.diag(torch.tensor([-1.0, 1.0, 1.0])),
+        SHEAR,
+        ROTATION @ torch.diag(torch.tensor([1.0, 2.0, 3.0])),
+    ],
+)
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_apply_transform(create_gaussians, transform_linear, num_workers):
+    """Test each branch of apply_transform against transforming covariance matrices."""
+    gaussians = create_gaussians(3000)
+    transform = _create_transform(transform_linear)
+    # A tiny budget processes the general transforms in several chunks.
+    gaussians_transformed = gaussians_utils.apply_transform(
+        gaussians, transform, memory_budget_bytes=1, num_workers=num_workers
+    )
+
+    transform_linear = transform_linear.double()
+    covariance_matrices = gaussians_utils.compose_covariance_matrices(
+        gaussians.quaternions.double(), gaussians.singular_values.double()
+    )
+    covariance_matrices_expected = (
+        transform_linear @ covariance_matrices @ transform_linear.transpose(-1, -2)
+    )
+    covariance_matrices_transformed = gaussians_utils.compose_covariance_matrices(
+        gaussians_transformed.quaternions.double(),
+        gaussians_transformed.singular_values.double(),
+    )
+    scale = covariance_matrices_expected.abs().amax(dim=(-2, -1), keepdim=True)
+    torch.testing.assert_close(
+        covariance_matrices_transformed / scale,
+        covariance_matrices_expected / scale,
+        rtol=0,
+        atol=1e-5,
+    )
+    torch.testing.assert_close(
+        gaussians_transformed.mean_vectors,
+        gaussians.mean_vectors @ transform[:, :3].T + transform[:, 3],
+    )
+    torch.testing.assert_close(
+        torch.linalg.norm(gaussians_transformed.quaternions, dim=-1),
+        torch.ones_like(gaussians.opacities),
+    )
+    assert (gaussians_transformed.singular_values >= 0).all()
+    assert gaussians_transformed.colors is gaussians.colors
+    assert gaussians_transformed.opacities is gaussians.opacities
+
+
+def test_apply_transform_similarity_scales_singular_values(create_gaussians):
+    """Test that similarity transforms scale the singular values uniformly."""
+    gaussians = create_gaussians(3000)
+    gaussians_transformed = gaussians_utils.apply_transform(
+        gaussians, _create_transform(2.5 * ROTATION)
+    )
+    torch.testing.assert_close(
+        gaussians_transformed.singular_values, 2.5 * gaussians.singular_values
+    )
+
+
+def test_save_ply_quantiles(create_gaussians, tmp_path):
+    """Test the exact disparity and the approximate depth quantiles of saved scenes."""
+    gaussians = create_gaussians(2**18 + 1000)
+    gaussians = gaussians._replace(mean_vectors=gaussians.mean_vectors.abs() + 0.5)
+    plydata = gaussians_utils.save_ply(gaussians, 500.0, (480, 640), tmp_path / "scene.ply")
+
+    depth = gaussians.mean_vectors[0, :, 2]
+    disparity_expected = torch.quantile(1.0 / depth, torch.tensor([0.1, 0.9]))
+    assert torch.equal(torch.from_numpy(plydata["disparity"]["disparity"]), disparity_expected)
+
+    depth_quantiles = torch.from_numpy(plydata["depth_quantile"]["depth_quantile"])
+    depth_quantiles_expected = torch.quantile(
+        depth, torch.tensor(gaussians_utils.SCENE_DEPTH_QUANTILES)
+    )
+    torch.testing.assert_close(depth_quantiles, depth_quantiles_expected, rtol=1e-2, atol=0)
+    _, metadata = gaussians_utils.load_ply(tmp_path / "scene.ply")
+    assert metadata.statistics == gaussians_utils.SceneStatistics(*depth_quantiles.tolist())
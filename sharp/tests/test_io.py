@@ -0,0 +1,140 @@
+"""Contains tests for the IO utilities.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+import imageio.v2 as iio
+import numpy as np
+import pytest
+import torch
+
+from sharp.utils import io
+
+# Fail instead of hanging if a writer deadlocks.
+TIMEOUT_SECONDS = 30.0
+
+
+def _create_frames(num_frames: int) -> list[tuple[torch.Tensor, torch.Tensor]]:
+    generator = torch.Generator().manual_seed(0)
+    return [
+        (
+            torch.randint(0, 256, (32, 32, 3), generator=generator, dtype=torch.uint8),
+            1.0 + 9.0 * torch.rand(1, 32, 32, generator=generator),
+        )
+        for _ in range(num_frames)
+    ]
+
+
+def _run_with_timeout(function: Callable[[], None]) -> BaseException | None:
+    """Run a function in a thread and return the exception it raised."""
+    errors: list[BaseException] = []
+
+    def _run():
+        try:
+            function()
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT_SECONDS)
+    assert not thread.is_alive(), "The video writer did not finish."
+    return errors[0] if errors else None
+
+
+def _record_frames(video_writer: io.VideoWriter) -> dict[str, list[np.ndarray]]:
+    """Record the frames passed to the encoders of a video writer."""
+    recorded: dict[str, list[np.ndarray]] = {"image": [], "depth": []}
+    for name, writer in (
+        ("image", video_writer.image_writer),
+        ("depth", video_writer.depth_writer),
+    ):
+        append_data = writer.append_data
+
+        def _append_data(frame, name=name, append_data=append_data):
+            recorded[name].append(np.array(frame))
+            append_data(frame)
+
+        writer.append_data = _append_data
+    return recorded
+
+
+def test_video_writer_asynchronous_matches_synchronous(tmp_path):
+    """Test that asynchronous encoding writes the same frames as synchronous encoding."""
+    frames = _create_frames(12)
+    recorded = {}
+    for asynchronous in (False, True):
+        output_path = tmp_path / f"{asynchronous}" / "video.mp4"
+        video_writer = io.VideoWriter(output_path, asynchronous=asynchronous, max_queued_frames=2)
+        recorded[asynchronous] = _record_frames(video_writer)
+        for image, depth in frames:
+            video_writer.add_frame(image, depth)
+        video_writer.close()
+        assert output_path.exists() and output_path.with_suffix(".depth.mp4").exists()
+
+    for name in ("image", "depth"):
+        assert len(recorded[True][name]) == len(frames)
+        for frame, frame_expected in zip(recorded[True][name], recorded[False][name]):
+            np.testing.assert_array_equal(frame, frame_expected)
+
+    # The encoded videos are identical as well.
+    for suffix in (".mp4", ".depth.mp4"):
+        videos = [
+            np.stack(iio.mimread(tmp_path / f"{asynchronous}" / f"video{suffix}"))
+            for asynchronous in (False, True)
+        ]
+        np.testing.assert_array_equal(videos[0], videos[1])
+
+
+@pytest.mark.parametrize("failing_stream", ["image", "depth"])
+def test_video_writer_asynchronous_propagates_errors(tmp_path, failing_stream):
+    """Test that a failing encoder raises from add_frame() or close() instead of hanging."""
+    video_writer = io.VideoWriter(tmp_path / "video.mp4", asynchronous=True, max_queued_frames=1)
+    writer = video_writer.image_writer if failing_stream == "image" else video_writer.depth_writer
+
+    def _fail(frame):
+        raise OSError("Disk full.")
+
+    writer.append_data = _fail
+
+    def _write_frames():
+        try:
+            # More frames than fit into the queue.
+            for image, depth in _create_frames(10):
+                video_writer.add_frame(image, depth)
+        finally:
+            video_writer.close()
+
+    error = _run_with_timeout(_write_frames)
+    assert isinstance(error, RuntimeError)
+    assert isinstance(error.__cause__, OSError)
+
+
+def test_encoder_thread_blocks_when_queue_is_full():
+    """Test that put() blocks while max_queued_frames frames wait to be encoded."""
+    is_released = threading.Event()
+    encoded_frames = []
+
+    def _encode(frame):
+        is_released.wait(TIMEOUT_SECONDS)
+        encoded_frames.append(frame)
+
+    encoder = io._EncoderThread(_encode, max_queued_frames=2)
+    frames = [torch.full((1,), index) for index in range(4)]
+    put_thread = threading.Thread(target=lambda: [encoder.put(frame) for frame in frames])
+    put_thread.start()
+    # One frame is being encoded and two are queued, so the last put() blocks.
+    put_thread.join(0.5)
+    assert put_thread.is_alive()
+
+    is_released.set()
+    put_thread.join(TIMEOUT_SECONDS)
+    assert not put_thread.is_alive()
+    encoder.close()
+    assert encoded_frames == frames
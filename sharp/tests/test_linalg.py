@@ -0,0 +1,203 @@
+"""Contains tests for the linear algebra utilities.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from sharp.utils import linalg
+
+TOLERANCES = {torch.float32: 1e-4, torch.float64: 1e-10}
+
+
+def _create_random_rotations(num_matrices: int, dtype: torch.dtype) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(0)
+    quaternions = torch.randn(num_matrices, 4, generator=generator, dtype=torch.float64)
+    return linalg.rotation_matrices_from_quaternions(quaternions).to(dtype)
+
+
+def _create_symmetric_matrices(eigenvalues: torch.Tensor) -> torch.Tensor:
+    rotations = _create_random_rotations(len(eigenvalues), torch.float64)
+    matrices = rotations @ torch.diag_embed(eigenvalues.double()) @ rotations.transpose(-1, -2)
+    return matrices.to(eigenvalues.dtype)
+
+
+def _check_eigh(matrices: torch.Tensor, method: linalg.SymmetricEigenMethod) -> None:
+    """Check the eigen decomposition relative to the largest absolute matrix entry."""
+    atol = TOLERANCES[matrices.dtype]
+    eigenvalues, eigenvectors = linalg.eigh_symmetric_3x3(matrices, method=method)
+    eigenvalues_ref = torch.linalg.eigh(matrices).eigenvalues.flip(-1)
+    scale = matrices.abs().amax(dim=(-2, -1)).clamp_min(1e-30)
+    eye = torch.eye(3, dtype=matrices.dtype).expand_as(matrices)
+
+    assert eigenvalues.shape == matrices.shape[:-1]
+    assert eigenvectors.shape == matrices.shape
+    assert (eigenvalues[..., :-1] >= eigenvalues[..., 1:]).all()
+    torch.testing.assert_close(
+        eigenvalues / scale[..., None], eigenvalues_ref / scale[..., None], rtol=0, atol=atol
+    )
+    torch.testing.assert_close(
+        eigenvectors.transpose(-1, -2) @ eigenvectors, eye, rtol=0, atol=atol
+    )
+    torch.testing.assert_close(
+        torch.linalg.det(eigenvectors), torch.ones_like(scale), rtol=0, atol=atol
+    )
+    reconstruction = eigenvectors @ torch.diag_embed(eigenvalues) @ eigenvectors.transpose(-1, -2)
+    torch.testing.assert_close(
+        reconstruction / scale[..., None, None],
+        matrices / scale[..., None, None],
+        rtol=0,
+        atol=atol,
+    )
+
+
+@pytest.mark.parametrize("method", ["analytic", "jacobi"])
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+def test_eigh_symmetric_3x3_random_covariances(method, dtype):
+    """Test the decomposition of covariances with scales over several orders of magnitude."""
+    generator = torch.Generator().manual_seed(1)
+    eigenvalues = torch.exp(4 * torch.randn(1000, 3, generator=generator, dtype=torch.float64))
+    _check_eigh(_create_symmetric_matrices(eigenvalues.to(dtype)), method)
+
+
+@pytest.mark.parametrize("method", ["analytic", "jacobi"])
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+def test_eigh_symmetric_3x3_matches_svd(method, dtype):
+    """Test that the eigenvalues of covariances are their singular values."""
+    generator = torch.Generator().manual_seed(2)
+    factors = torch.randn(100, 3, 3, generator=generator, dtype=torch.float64)
+    matrices = (factors @ factors.transpose(-1, -2)).to(dtype)
+    eigenvalues, _ = linalg.eigh_symmetric_3x3(matrices, method=method)
+    singular_values = torch.linalg.svdvals(matrices)
+    scale = singular_values[:, :1]
+    torch.testing.assert_close(
+        eigenvalues / scale, singular_values / scale, rtol=0, atol=TOLERANCES[dtype]
+    )
+
+
+@pytest.mark.parametrize("method", ["analytic", "jacobi"])
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+@pytest.mark.parametrize(
+    "eigenvalues",
+    [
+        (2.0, 2.0, 1.0),
+        (2.0, 1.0, 1.0),
+        (1.0, 1.0, 1.0),
+        (1.0, 1.0, 1.0 - 1e-7),
+        (1.0, 1e-7, 0.0),
+        (1.0, 1.0, 0.0),
+        (1.0, 0.0, 0.0),
+        (0.0, 0.0, 0.0),
+        (3.0, -1.0, -1.0),
+        (1e-20, 1e-20, 1e-30),
+    ],
+)
+def test_eigh_symmetric_3x3_repeated_and_degenerate(method, dtype, eigenvalues):
+    """Test matrices with repeated or zero eigenvalues, rotated and axis-aligned."""
+    eigenvalues = torch.tensor(eigenvalues, dtype=dtype).expand(16, 3)
+    rotated_matrices = _create_symmetric_matrices(eigenvalues)
+    diagonal_matrices = torch.diag_embed(eigenvalues.flip(-1))
+    _check_eigh(torch.cat([rotated_matrices, diagonal_matrices]), method)
+
+
+def test_eigh_symmetric_3x3_batch_shape():
+    """Test that arbitrary batch dimensions are preserved."""
+    generator = torch.Generator().manual_seed(3)
+    eigenvalues = torch.rand(2 * 5, 3, generator=generator, dtype=torch.float64)
+    matrices = _create_symmetric_matrices(eigenvalues).unflatten(0, (2, 5))
+    _check_eigh(matrices, "analytic")
+
+
+def test_eigh_symmetric_3x3_invalid_shape():
+    """Test that non-3x3 matrices are rejected."""
+    with pytest.raises(ValueError):
+        linalg.eigh_symmetric_3x3(torch.eye(4))
+
+
+ROTATION_TOLERANCES = {torch.float16: 2e-3, torch.float32: 1e-6, torch.float64: 1e-12}
+
+
+def _create_test_quaternions() -> torch.Tensor:
+    """Create random quaternions and the edge cases of Shepperd's method in float64."""
+    generator = torch.Generator().manual_seed(4)
+    quaternions = torch.randn(1000, 4, generator=generator, dtype=torch.float64)
+    edge_cases = torch.tensor(
+        [
+            # Identity and rotations by 180 degrees, where w vanishes.
+            [1.0, 0.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0],
+            [0.0, 1.0, 1.0, 0.0],
+            [0.0, 1.0, -1.0, 1.0],
+            # Nearly 180 degrees and ties between the components.
+            [1e-4, 1.0, 0.0, 0.0],
+            [1.0, 1.0, 1.0, 1.0],
+            [1.0, -1.0, 0.0, 0.0],
+        ],
+        dtype=torch.float64,
+    )
+    quaternions = torch.cat([quaternions, edge_cases])
+    return quaternions / torch.linalg.norm(quaternions, dim=-1, keepdim=True)
+
+
+@pytest.mark.parametrize("dtype", [torch.float16, torch.float32, torch.float64])
+def test_rotation_matrices_from_quaternions(dtype):
+    """Test that the matrices are rotations and match the float64 reference."""
+    atol = ROTATION_TOLERANCES[dtype]
+    quaternions = _create_test_quaternions()
+    matrices = linalg.rotation_matrices_from_quaternions(quaternions.to(dtype))
+    matrices_ref = linalg.rotation_matrices_from_quaternions(quaternions)
+
+    assert matrices.dtype == dtype
+    torch.testing.assert_close(matrices.double(), matrices_ref, rtol=0, atol=atol)
+    torch.testing.assert_close(
+        matrices_ref.transpose(-1, -2) @ matrices_ref,
+        torch.eye(3, dtype=torch.float64).expand_as(matrices_ref),
+        rtol=0,
+        atol=1e-12,
+    )
+    torch.testing.assert_close(
+        torch.linalg.det(matrices_ref), torch.ones_like(quaternions[:, 0]), rtol=0, atol=1e-12
+    )
+    # Rotating a pure quaternion with q * v * q^-1 matches the matrix.
+    vectors = torch.randn(len(quaternions), 3, dtype=torch.float64)
+    rotated = linalg.quaternion_product(
+        linalg.quaternion_product(quaternions, F.pad(vectors, (1, 0))),
+        linalg.quaternion_conj(quaternions),
+    )[:, 1:]
+    torch.testing.assert_close((matrices_ref @ vectors[:, :, None])[..., 0], rotated)
+
+
+@pytest.mark.parametrize("dtype", [torch.float16, torch.float32, torch.float64])
+def test_quaternions_rotation_matrices_round_trip(dtype):
+    """Test the round trip via rotation matrices up to the sign of the quaternions."""
+    atol = ROTATION_TOLERANCES[dtype]
+    quaternions = _create_test_quaternions().to(dtype)
+    matrices = linalg.rotation_matrices_from_quaternions(quaternions)
+    quaternions_round_trip = linalg.quaternions_from_rotation_matrices(matrices)
+
+    assert quaternions_round_trip.dtype == dtype
+    quaternions = quaternions.double()
+    quaternions_round_trip = quaternions_round_trip.double()
+    sign = torch.where((quaternions * quaternions_round_trip).sum(dim=-1) < 0, -1.0, 1.0)
+    torch.testing.assert_close(
+        sign[:, None] * quaternions_round_trip, quaternions, rtol=0, atol=4 * atol
+    )
+    torch.testing.assert_close(
+        linalg.rotation_matrices_from_quaternions(quaternions_round_trip),
+        matrices.double(),
+        rtol=0,
+        atol=4 * atol,
+    )
+
+
+def test_quaternions_from_rotation_matrices_invalid_shape():
+    """Test that non-3x3 matrices are rejected."""
+    with pytest.raises(ValueError):
+        linalg.quaternions_from_rotation_matrices(torch.eye(4))
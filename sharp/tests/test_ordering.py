@@ -0,0 +1,133 @@
+"""Contains tests for the space-filling-curve orderings of Gaussians.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+from sharp.utils import ordering
+from sharp.utils.gaussians import Gaussians3D
+
+
+def _interleave_bits_naive(cells: np.ndarray, num_bits: int) -> np.ndarray:
+    """Interleave the bits of x, y and z cells one bit at a time."""
+    codes = np.zeros(cells.shape[:-1], dtype=np.int64)
+    for bit in range(num_bits):
+        for axis in range(3):
+            codes |= ((cells[..., axis] >> bit) & 1) << (3 * bit + axis)
+    return codes
+
+
+def test_spread_bits_matches_naive_interleave():
+    """Test that the spread bits of all axes interleave to the naive Morton code."""
+    generator = torch.Generator().manual_seed(0)
+    max_cell = 2**ordering.MORTON_BITS_PER_AXIS - 1
+    cells = torch.randint(0, max_cell + 1, (1000, 3), generator=generator)
+    cells[0] = 0
+    cells[1] = max_cell
+    cells[2] = torch.tensor([max_cell, 0, 1])
+
+    codes = (
+        ordering._spread_bits(cells[:, 0])
+        | (ordering._spread_bits(cells[:, 1]) << 1)
+        | (ordering._spread_bits(cells[:, 2]) << 2)
+    )
+    codes_expected = _interleave_bits_naive(cells.numpy(), ordering.MORTON_BITS_PER_AXIS)
+    np.testing.assert_array_equal(codes.numpy(), codes_expected)
+    assert codes.min() >= 0
+
+
+def test_compute_morton_codes_quantizes_bounding_box():
+    """Test that points are quantized to the grid spanning their bounding box."""
+    num_bits = 4
+    points = torch.tensor([[-1.0, 2.0, 10.0], [1.0, 4.0, 30.0], [0.0, 3.0, 20.0], [1.0, 2.0, 10.0]])
+    cells = np.array([[0, 0, 0], [15, 15, 15], [8, 8, 8], [15, 0, 0]])
+
+    codes = ordering.compute_morton_codes(points, num_bits=num_bits)
+    np.testing.assert_array_equal(codes.numpy(), _interleave_bits_naive(cells, num_bits))
+
+
+def test_compute_morton_codes_non_finite_last_cell():
+    """Test that non-finite coordinates map to the last cell and not the bounding box."""
+    num_bits = 4
+    points = torch.tensor(
+        [
+            [0.0, 0.0, 0.0],
+            [1.0, 1.0, 1.0],
+            [torch.nan, 0.0, 0.0],
+            [0.0, torch.inf, 0.0],
+            [0.0, 0.0, -torch.inf],
+            [torch.nan, torch.nan, torch.nan],
+        ]
+    )
+    cells = np.array([[0, 0, 0], [15, 15, 15], [15, 0, 0], [0, 15, 0], [0, 0, 15], [15, 15, 15]])
+
+    codes = ordering.compute_morton_codes(points, num_bits=num_bits)
+    np.testing.assert_array_equal(codes.numpy(), _interleave_bits_naive(cells, num_bits))
+
+
+def test_compute_morton_codes_invalid_arguments():
+    """Test the validation of the number of bits and the point shape."""
+    with pytest.raises(ValueError):
+        ordering.compute_morton_codes(torch.zeros(4, 3), num_bits=0)
+    with pytest.raises(ValueError):
+        ordering.compute_morton_codes(torch.zeros(4, 3), num_bits=22)
+    with pytest.raises(ValueError):
+        ordering.compute_morton_codes(torch.zeros(4, 2))
+
+
+def _stack_gaussians(gaussians: list[Gaussians3D]) -> Gaussians3D:
+    return Gaussians3D(*(torch.cat(values) for values in zip(*gaussians)))
+
+
+def test_sort_gaussians_valid_permutation(create_gaussians):
+    """Test that the order of each batch is a permutation sorting the Morton codes."""
+    gaussians = _stack_gaussians([create_gaussians(300, seed=seed) for seed in range(2)])
+    gaussians.mean_vectors[1, 5] = torch.nan
+    gaussians_sorted, permutation = ordering.sort_gaussians(gaussians, "morton")
+
+    assert permutation.shape == (2, 300) and permutation.dtype == torch.int64
+    for batch_index in range(2):
+        assert torch.equal(permutation[batch_index].sort().values, torch.arange(300))
+        codes = ordering.compute_morton_codes(gaussians_sorted.mean_vectors[batch_index])
+        assert torch.all(codes[1:] >= codes[:-1])
+    # The Gaussian with a non-finite mean is sorted last.
+    assert permutation[1, -1] == 5
+
+    # The inverse permutation restores the original order.
+    inverse_permutation = torch.argsort(permutation, dim=-1)
+    gaussians_restored = ordering.reorder_gaussians(gaussians_sorted, inverse_permutation)
+    for values, values_expected in zip(gaussians_restored, gaussians):
+        torch.testing.assert_close(values, values_expected, rtol=0.0, atol=0.0, equal_nan=True)
+
+
+def test_sort_gaussians_none_keeps_order(create_gaussians):
+    """Test that the "none" order is the identity."""
+    gaussians = create_gaussians(50)
+    gaussians_sorted, permutation = ordering.sort_gaussians(gaussians, "none")
+    assert torch.equal(permutation, torch.arange(50)[None])
+    for values, values_expected in zip(gaussians_sorted, gaussians):
+        assert torch.equal(values, values_expected)
+
+
+def test_saved_order_remaps_labels(create_gaussians, tmp_path):
+    """Test that labels[order] matches the sorted Gaussians as saved by the predict CLI."""
+    gaussians = create_gaussians(200)
+    # Label each Gaussian by a value derived from its original mean.
+    labels = (1e4 * gaussians.mean_vectors[0, :, 0]).round().numpy().astype(np.int64)
+    gaussians_sorted, permutation = ordering.sort_gaussians(gaussians)
+
+    np.save(tmp_path / "image_order.npy", permutation[0].numpy().astype(np.int32))
+    order = np.load(tmp_path / "image_order.npy")
+
+    labels_sorted = labels[order]
+    labels_expected = (
+        (1e4 * gaussians_sorted.mean_vectors[0, :, 0]).round().numpy().astype(np.int64)
+    )
+    np.testing.assert_array_equal(labels_sorted, labels_expected)
+    np.testing.assert_array_equal(labels_sorted[np.argsort(order)], labels)
@@ -0,0 +1,51 @@
+"""Contains tests for the packed Gaussian buffers.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import torch
+
+from sharp.utils.packed_gaussians import (
+    COMPACT_LAYOUT,
+    FLOAT32_LAYOUT,
+    PackedGaussians,
+    PackedLayout,
+)
+
+
+def test_packed_gaussians_float32_round_trip(create_gaussians):
+    """Test that the float32 layout stores the Gaussians exactly."""
+    gaussians = create_gaussians()
+    gaussians_unpacked = PackedGaussians.from_gaussians(gaussians, FLOAT32_LAYOUT).to_gaussians()
+    for values, values_unpacked in zip(gaussians, gaussians_unpacked):
+        assert torch.equal(values, values_unpacked)
+
+
+@pytest.mark.parametrize(
+    "layout",
+    [FLOAT32_LAYOUT, COMPACT_LAYOUT, PackedLayout(colors="float16", opacities="uint8")],
+)
+def test_packed_gaussians_numpy_round_trip(create_gaussians, layout):
+    """Test that numpy arrays of any layout are wrapped without copies."""
+    packed = PackedGaussians.from_gaussians(create_gaussians(), layout)
+    array = packed.to_numpy()
+    packed_wrapped = PackedGaussians.from_numpy(array, layout)
+
+    assert packed_wrapped.layout == layout
+    assert packed_wrapped.data.data_ptr() == packed.data.data_ptr()
+    if layout in (FLOAT32_LAYOUT, COMPACT_LAYOUT):
+        assert PackedGaussians.from_numpy(array).layout == layout
+    else:
+        with pytest.raises(ValueError):
+            PackedGaussians.from_numpy(array)
+
+
+def test_packed_gaussians_from_numpy_layout_mismatch(create_gaussians):
+    """Test that arrays which do not match the given layout are rejected."""
+    array = PackedGaussians.from_gaussians(create_gaussians(), FLOAT32_LAYOUT).to_numpy()
+    with pytest.raises(ValueError):
+        PackedGaussians.from_numpy(array, COMPACT_LAYOUT)
@@ -0,0 +1,76 @@
+"""Contains tests for the Gaussian predictor.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import weakref
+
+import pytest
+import torch
+
+from sharp.models import create_predictor, create_predictor_params
+from sharp.models.decoders import MultiresConvDecoder
+
+
+def _predict(device: torch.device, low_memory: bool, memory_budget_bytes: int | None = None):
+    torch.manual_seed(0)
+    predictor = create_predictor(create_predictor_params("tiny")).eval().to(device)
+    predictor.set_low_memory(low_memory, memory_budget_bytes=memory_budget_bytes)
+    generator = torch.Generator().manual_seed(0)
+    image = torch.rand(1, 3, 1536, 1536, generator=generator).to(device)
+    with torch.no_grad():
+        return predictor(image, torch.ones(1, device=device))
+
+
+def test_predictor_low_memory_matches_default():
+    """Test that low-memory inference predicts the same Gaussians."""
+    gaussians_expected = _predict(torch.device("cpu"), low_memory=False)
+    # The memory budget only offloads encodings on CUDA and is ignored on CPU.
+    gaussians = _predict(torch.device("cpu"), low_memory=True, memory_budget_bytes=0)
+    for values, values_expected in zip(gaussians, gaussians_expected):
+        assert torch.equal(values, values_expected)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Offloading requires CUDA.")
+def test_predictor_offloaded_encodings_match_default():
+    """Test that offloading all encodings to host memory predicts the same Gaussians."""
+    device = torch.device("cuda")
+    gaussians_expected = _predict(device, low_memory=False)
+    gaussians = _predict(device, low_memory=True, memory_budget_bytes=0)
+    for values, values_expected in zip(gaussians, gaussians_expected):
+        assert torch.equal(values, values_expected)
+
+
+def test_multires_conv_decoder_releases_each_encoding():
+    """Test that each encoding is freed before the next decoder level runs."""
+    dims_encoder = [16, 24, 32]
+    decoder = MultiresConvDecoder(dims_encoder, 8).eval()
+    generator = torch.Generator().manual_seed(0)
+    encodings = [
+        torch.randn(1, dim, 32 // 2**level, 32 // 2**level, generator=generator)
+        for level, dim in enumerate(dims_encoder)
+    ]
+    with torch.no_grad():
+        features_expected = decoder(encodings)
+
+    references = [weakref.ref(encoding) for encoding in encodings]
+    num_alive_per_level: dict[int, int] = {}
+
+    def _count_alive_encodings(level: int):
+        def hook(module, args):
+            num_alive_per_level[level] = sum(reference() is not None for reference in references)
+
+        return hook
+
+    for level, fusion in enumerate(decoder.fusions):
+        fusion.register_forward_pre_hook(_count_alive_encodings(level))
+    with torch.no_grad():
+        features = decoder(encodings, release_encodings=True)
+
+    assert encodings == []
+    # Levels are decoded from the lowest resolution to the highest one.
+    assert num_alive_per_level == {2: 2, 1: 1, 0: 0}
+    assert torch.equal(features, features_expected)
@@ -0,0 +1,282 @@
+"""Contains tests for the tile-based CPU rasterizer.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+import torch
+
+from sharp.utils import linalg, rasterizer
+from sharp.utils.gaussians import Gaussians3D
+from sharp.utils.gsplat import GSplatRenderer
+
+# An image size which is not a multiple of the tile size of 8 pixels.
+WIDTH = 37
+HEIGHT = 29
+FOCAL_LENGTH = 30.0
+NEAR_PLANE = 0.01
+
+
+def _create_intrinsics() -> torch.Tensor:
+    return torch.tensor(
+        [[FOCAL_LENGTH, 0.0, WIDTH / 2], [0.0, FOCAL_LENGTH, HEIGHT / 2], [0.0, 0.0, 1.0]]
+    )
+
+
+def _create_viewmats() -> torch.Tensor:
+    """Create an identity view and a slightly rotated and translated view."""
+    angle = math.radians(5.0)
+    rotated_view = torch.eye(4)
+    rotated_view[:3, :3] = torch.tensor(
+        [
+            [math.cos(angle), 0.0, math.sin(angle)],
+            [0.0, 1.0, 0.0],
+            [-math.sin(angle), 0.0, math.cos(angle)],
+        ]
+    )
+    rotated_view[:3, 3] = torch.tensor([0.05, -0.02, -0.1])
+    return torch.stack([torch.eye(4), rotated_view])
+
+
+def _pixel_to_point(x: float, y: float, z: float) -> list[float]:
+    """Return the camera space point of the identity view which projects to (x, y)."""
+    return [(x - WIDTH / 2) * z / FOCAL_LENGTH, (y - HEIGHT / 2) * z / FOCAL_LENGTH, z]
+
+
+def _create_scene() -> Gaussians3D:
+    """Create hand-placed Gaussians on tile borders and random Gaussians in the view."""
+    generator = torch.Generator().manual_seed(0)
+    num_random = 60
+    depths = 2.0 + 4.0 * torch.rand(num_random, generator=generator)
+    pixels_x = WIDTH * torch.rand(num_random, generator=generator)
+    pixels_y = HEIGHT * torch.rand(num_random, generator=generator)
+    random_means = torch.stack(
+        [
+            (pixels_x - WIDTH / 2) * depths / FOCAL_LENGTH,
+            (pixels_y - HEIGHT / 2) * depths / FOCAL_LENGTH,
+            depths,
+        ],
+        dim=-1,
+    )
+    means = torch.cat(
+        [
+            torch.tensor(
+                [
+                    # Centered on tile corners and borders.
+                    _pixel_to_point(8.0, 8.0, 3.0),
+                    _pixel_to_point(16.0, 12.5, 2.5),
+                    _pixel_to_point(20.5, 24.0, 4.0),
+                    # Centered just outside the image.
+                    _pixel_to_point(-1.5, 10.0, 3.1),
+                    _pixel_to_point(WIDTH + 1.0, HEIGHT + 1.0, 3.2),
+                    # Opaque Gaussians which saturate the transmittance.
+                    _pixel_to_point(28.0, 8.0, 1.5),
+                    _pixel_to_point(28.5, 8.5, 1.6),
+                    # Large Gaussians behind the camera and in front of the near plane,
+                    # which would cover the image if they were not culled.
+                    [0.0, 0.0, -2.0],
+                    [0.0, 0.0, 0.5 * NEAR_PLANE],
+                ]
+            ),
+            random_means,
+        ]
+    )
+    num_hand_placed = len(means) - num_random
+    scales = torch.cat(
+        [
+            torch.tensor([0.3, 0.2, 0.3, 0.2, 0.25, 0.3, 0.3, 5.0, 5.0])[:, None].expand(-1, 3),
+            0.01 + 0.15 * torch.rand(num_random, 3, generator=generator),
+        ]
+    )
+    opacities = torch.cat(
+        [
+            torch.tensor([0.9, 0.6, 0.8, 0.7, 0.9, 1.0, 1.0, 1.0, 1.0]),
+            torch.rand(num_random, generator=generator),
+        ]
+    )
+    return Gaussians3D(
+        mean_vectors=means[None],
+        singular_values=scales[None],
+        quaternions=torch.randn(1, num_hand_placed + num_random, 4, generator=generator),
+        colors=torch.rand(1, num_hand_placed + num_random, 3, generator=generator),
+        opacities=opacities[None],
+    )
+
+
+def _render_reference(
+    gaussians: Gaussians3D, viewmat: torch.Tensor, K: torch.Tensor, eps2d: float
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Render by evaluating every Gaussian at every pixel in float64.
+
+    Gaussians are composited one at a time in depth order with the thresholds of
+    gsplat. Returns the colors and unnormalized depth with shape H x W x 4 and the
+    alpha with shape H x W x 1.
+    """
+    dtype = torch.float64
+    means = gaussians.mean_vectors[0].to(dtype)
+    rotations = linalg.rotation_matrices_from_quaternions(gaussians.quaternions[0].to(dtype))
+    scales = gaussians.singular_values[0].to(dtype)
+    covariances = rotations @ torch.diag_embed(scales.square()) @ rotations.transpose(-1, -2)
+    opacities = gaussians.opacities[0].to(dtype)
+    features = torch.cat(
+        [gaussians.colors[0].to(dtype), torch.zeros_like(opacities)[:, None]], dim=-1
+    )
+    viewmat = viewmat.to(dtype)
+    K = K.to(dtype)
+    fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+
+    pixel_y, pixel_x = torch.meshgrid(
+        torch.arange(HEIGHT, dtype=dtype) + 0.5,
+        torch.arange(WIDTH, dtype=dtype) + 0.5,
+        indexing="ij",
+    )
+    color = torch.zeros(HEIGHT, WIDTH, 4, dtype=dtype)
+    transmittance = torch.ones(HEIGHT, WIDTH, dtype=dtype)
+    is_done = torch.zeros(HEIGHT, WIDTH, dtype=torch.bool)
+
+    rotation_view = viewmat[:3, :3]
+    means_cam = means @ rotation_view.T + viewmat[:3, 3]
+    for index in torch.argsort(means_cam[:, 2]).tolist():
+        x, y, z = means_cam[index].tolist()
+        if z <= NEAR_PLANE or opacities[index] < rasterizer.MIN_ALPHA:
+            continue
+        # The EWA approximation with the Jacobian clamped to the enlarged frustum.
+        margin_x = 0.15 * WIDTH / fx
+        margin_y = 0.15 * HEIGHT / fy
+        tx = z * min(max(x / z, -cx / fx - margin_x), (WIDTH - cx) / fx + margin_x)
+        ty = z * min(max(y / z, -cy / fy - margin_y), (HEIGHT - cy) / fy + margin_y)
+        jacobian = torch.tensor(
+            [[fx / z, 0.0, -fx * tx / z**2], [0.0, fy / z, -fy * ty / z**2]], dtype=dtype
+        )
+        covariance_cam = rotation_view @ covariances[index] @ rotation_view.T
+        covariance_2d = jacobian @ covariance_cam @ jacobian.T + eps2d * torch.eye(2, dtype=dtype)
+        conic = torch.linalg.inv(covariance_2d)
+        delta = torch.stack([pixel_x - (fx * x / z + cx), pixel_y - (fy * y / z + cy)], dim=-1)
+        sigma = 0.5 * torch.einsum("...i,ij,...j->...", delta, conic, delta)
+
+        alpha = (opacities[index] * torch.exp(-sigma)).clamp(max=rasterizer.MAX_ALPHA)
+        alpha = torch.where(alpha >= rasterizer.MIN_ALPHA, alpha, 0.0)
+        transmittance_next = transmittance * (1.0 - alpha)
+        is_done = is_done | (transmittance_next <= rasterizer.MIN_TRANSMITTANCE)
+        weights = torch.where(is_done, 0.0, alpha * transmittance)
+        feature = features[index].clone()
+        feature[3] = z
+        color += weights[..., None] * feature
+        transmittance = torch.where(is_done, transmittance, transmittance_next)
+
+    return color, (1.0 - transmittance)[..., None]
+
+
+@pytest.mark.parametrize("eps2d", [0.0, 0.3])
+@pytest.mark.parametrize(
+    "tiles_per_batch,gaussians_per_batch,num_workers", [(256, 32, 0), (3, 4, 2), (1, 1, 0)]
+)
+def test_rasterize_matches_dense_reference(
+    eps2d, tiles_per_batch, gaussians_per_batch, num_workers
+):
+    """Test colors, depth and alpha against a dense per-pixel evaluation."""
+    gaussians = _create_scene()
+    viewmats = _create_viewmats()
+    Ks = _create_intrinsics().expand(len(viewmats), 3, 3)
+
+    colors, alphas = rasterizer.rasterize(
+        means=gaussians.mean_vectors[0],
+        quats=gaussians.quaternions[0],
+        scales=gaussians.singular_values[0],
+        opacities=gaussians.opacities[0],
+        colors=gaussians.colors[0],
+        viewmats=viewmats,
+        Ks=Ks,
+        width=WIDTH,
+        height=HEIGHT,
+        eps2d=eps2d,
+        tiles_per_batch=tiles_per_batch,
+        gaussians_per_batch=gaussians_per_batch,
+        num_workers=num_workers,
+    )
+    assert colors.shape == (len(viewmats), HEIGHT, WIDTH, 4)
+    assert alphas.shape == (len(viewmats), HEIGHT, WIDTH, 1)
+
+    for view_index, (viewmat, K) in enumerate(zip(viewmats, Ks)):
+        colors_expected, alphas_expected = _render_reference(gaussians, viewmat, K, eps2d)
+        # The scene covers the image only partially and saturates some pixels.
+        assert (alphas_expected < 0.5).any() and (alphas_expected > 0.99).any()
+        torch.testing.assert_close(
+            colors[view_index, ..., :3].double(), colors_expected[..., :3], rtol=0, atol=1e-5
+        )
+        torch.testing.assert_close(
+            colors[view_index, ..., 3].double(), colors_expected[..., 3], rtol=0, atol=1e-4
+        )
+        torch.testing.assert_close(alphas[view_index].double(), alphas_expected, rtol=0, atol=1e-5)
+
+
+def test_project_gaussians_culls_near_and_behind_camera():
+    """Test that Gaussians in front of the near plane or behind the camera are culled."""
+    gaussians = _create_scene()
+    principal_axes = rasterizer.compute_principal_axes(
+        gaussians.quaternions[0], gaussians.singular_values[0]
+    )
+    projected = rasterizer.project_gaussians(
+        gaussians.mean_vectors[0],
+        principal_axes,
+        gaussians.opacities[0],
+        torch.eye(4),
+        _create_intrinsics(),
+        WIDTH,
+        HEIGHT,
+        near_plane=NEAR_PLANE,
+    )
+    assert 7 not in projected.indices and 8 not in projected.indices
+    assert (projected.depths > NEAR_PLANE).all()
+    # The Gaussians centered just outside the image still overlap it.
+    assert 3 in projected.indices and 4 in projected.indices
+
+
+def test_rasterize_empty_scene():
+    """Test that a scene without visible Gaussians renders transparent black."""
+    colors, alphas = rasterizer.rasterize(
+        means=torch.tensor([[0.0, 0.0, -1.0]]),
+        quats=torch.tensor([[1.0, 0.0, 0.0, 0.0]]),
+        scales=torch.ones(1, 3),
+        opacities=torch.ones(1),
+        colors=torch.ones(1, 3),
+        viewmats=torch.eye(4)[None],
+        Ks=_create_intrinsics()[None],
+        width=WIDTH,
+        height=HEIGHT,
+    )
+    assert not colors.any() and not alphas.any()
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="gsplat requires CUDA.")
+def test_rasterize_matches_gsplat():
+    """Test that the CPU backend renders like the gsplat backend."""
+    gaussians = _create_scene()
+    gaussians = Gaussians3D(*(values.cuda() for values in gaussians))
+    viewmats = _create_viewmats().cuda()
+    intrinsics = torch.eye(4).expand(len(viewmats), 4, 4).clone()
+    intrinsics[:, :3, :3] = _create_intrinsics()
+    intrinsics = intrinsics.cuda()
+
+    renderings = {
+        backend: GSplatRenderer(backend=backend).render_views(
+            gaussians, viewmats, intrinsics, WIDTH, HEIGHT
+        )
+        for backend in ("gsplat", "cpu")
+    }
+    rendering, rendering_expected = renderings["cpu"], renderings["gsplat"]
+    assert rendering.color.device == rendering_expected.color.device
+    torch.testing.assert_close(rendering.color, rendering_expected.color, rtol=0, atol=1e-4)
+    torch.testing.assert_close(rendering.alpha, rendering_expected.alpha, rtol=0, atol=1e-4)
+    # Compare the unnormalized depth, which is stable where alpha vanishes.
+    torch.testing.assert_close(
+        rendering.depth * rendering.alpha,
+        rendering_expected.depth * rendering_expected.alpha,
+        rtol=0,
+        atol=1e-3,
+    )
@@ -0,0 +1,49 @@
+"""Contains tests for the `sharp render` CLI.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import torch
+from click.testing import CliRunner
+
+from sharp.cli import render
+from sharp.utils.gaussians import save_ply
+
+
+def _render_frames(gaussians, metadata, video_writer, params=None, fail=False) -> int:
+    for _ in range(2):
+        video_writer.add_frame(torch.zeros(32, 32, 3, dtype=torch.uint8), torch.ones(1, 32, 32))
+    if fail:
+        raise RuntimeError("Rendering failed.")
+    return 2
+
+
+def test_render_cli_removes_partial_videos(tmp_path, monkeypatch):
+    """Test that failed scenes leave no videos behind and are rendered again."""
+    generator = torch.Generator().manual_seed(0)
+    gaussians = render.Gaussians3D(
+        mean_vectors=torch.randn(1, 100, 3, generator=generator) + torch.tensor([0, 0, 5]),
+        singular_values=torch.rand(1, 100, 3, generator=generator) * 0.1,
+        quaternions=torch.randn(1, 100, 4, generator=generator),
+        colors=torch.rand(1, 100, 3, generator=generator),
+        opacities=torch.rand(1, 100, generator=generator),
+    )
+    save_ply(gaussians, 32.0, (32, 32), tmp_path / "scene.ply")
+    output_path = tmp_path / "videos"
+    args = ["-i", str(tmp_path / "scene.ply"), "-o", str(output_path), "--skip-existing"]
+
+    monkeypatch.setattr(render, "render_trajectory", lambda *args: _render_frames(*args, fail=True))
+    result = CliRunner().invoke(render.render_cli, args)
+    assert result.exit_code == 0, result.output
+    assert list(output_path.iterdir()) == []
+
+    monkeypatch.setattr(render, "render_trajectory", _render_frames)
+    result = CliRunner().invoke(render.render_cli, args)
+    assert result.exit_code == 0, result.output
+    assert sorted(path.name for path in output_path.iterdir()) == [
+        "scene.depth.mp4",
+        "scene.mp4",
+    ]
@@ -0,0 +1,108 @@
+"""Contains tests for the LRU cache of resident scenes.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import threading
+
+import pytest
+
+from sharp.utils.gaussians import SceneMetaData
+from sharp.utils.scene_cache import SceneCache, get_gaussians_nbytes
+
+# Bytes of a single float32 Gaussian with mean, scale, quaternion, color and opacity.
+NBYTES_PER_GAUSSIAN = (3 + 3 + 4 + 3 + 1) * 4
+
+
+class _SceneLoader:
+    """Load scenes whose number of Gaussians is given by their id, e.g. "a:100"."""
+
+    def __init__(self, create_gaussians):
+        self.create_gaussians = create_gaussians
+        self.num_loads: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, scene_id: str):
+        with self._lock:
+            self.num_loads[scene_id] += 1
+        num_gaussians = int(scene_id.split(":")[1])
+        metadata = SceneMetaData(500.0, (640, 480), "linearRGB")
+        return self.create_gaussians(num_gaussians), metadata
+
+
+def test_scene_cache_evicts_least_recently_used_scenes(create_gaussians):
+    """Test that the least recently used scene is evicted beyond max_scenes."""
+    loader = _SceneLoader(create_gaussians)
+    cache = SceneCache(loader, max_scenes=2)
+
+    cache.get("a:10")
+    cache.get("b:10")
+    # Using "a" again makes "b" the least recently used scene.
+    cache.get("a:10")
+    cache.get("c:10")
+    assert "a:10" in cache and "c:10" in cache and "b:10" not in cache
+    cache.get("b:10")
+    assert "a:10" not in cache and len(cache) == 2
+
+    assert loader.num_loads == {"a:10": 1, "b:10": 2, "c:10": 1}
+    assert cache.num_hits == 1 and cache.num_misses == 4
+
+
+def test_scene_cache_evicts_beyond_max_bytes(create_gaussians):
+    """Test that least recently used scenes are evicted until the scenes fit max_bytes."""
+    loader = _SceneLoader(create_gaussians)
+    cache = SceneCache(loader, max_scenes=8, max_bytes=250 * NBYTES_PER_GAUSSIAN)
+
+    scene = cache.get("a:100")
+    assert scene.nbytes == get_gaussians_nbytes(scene.gaussians) == 100 * NBYTES_PER_GAUSSIAN
+    cache.get("b:100")
+    cache.get("a:100")
+    cache.get("c:100")
+    assert "b:100" not in cache and "a:100" in cache and "c:100" in cache
+    assert cache.nbytes == 200 * NBYTES_PER_GAUSSIAN
+
+
+def test_scene_cache_keeps_single_scene_beyond_max_bytes(create_gaussians):
+    """Test that a scene larger than max_bytes is kept alone instead of failing."""
+    loader = _SceneLoader(create_gaussians)
+    cache = SceneCache(loader, max_scenes=8, max_bytes=250 * NBYTES_PER_GAUSSIAN)
+
+    cache.get("a:100")
+    cache.get("b:100")
+    scene = cache.get("c:1000")
+    assert len(cache) == 1 and "c:1000" in cache
+    assert cache.nbytes == scene.nbytes > cache.max_bytes
+    # The large scene is evicted by the next one.
+    cache.get("a:100")
+    assert len(cache) == 1 and "a:100" in cache
+
+
+def test_scene_cache_invalid_max_scenes(create_gaussians):
+    """Test that a cache without room for a scene is rejected."""
+    with pytest.raises(ValueError):
+        SceneCache(_SceneLoader(create_gaussians), max_scenes=0)
+
+
+def test_scene_cache_concurrent_access(create_gaussians):
+    """Test that concurrent hits and misses keep the cache consistent."""
+    loader = _SceneLoader(create_gaussians)
+    cache = SceneCache(loader, max_scenes=3, max_bytes=350 * NBYTES_PER_GAUSSIAN)
+    scene_ids = [f"{name}:100" for name in "abcde"]
+    requests = [scene_ids[index % 7 % len(scene_ids)] for index in range(400)]
+
+    def _get(scene_id: str) -> str:
+        scene = cache.get(scene_id)
+        assert len(scene.gaussians.mean_vectors[0]) == 100
+        return scene_id
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(_get, requests)) == requests
+
+    assert cache.num_hits + cache.num_misses == len(requests)
+    assert cache.num_misses == sum(loader.num_loads.values())
+    assert len(cache) <= 3 and cache.nbytes <= cache.max_bytes
@@ -0,0 +1,143 @@
+"""Contains tests for the spatial index over Gaussian positions.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+from sharp.utils.spatial_index import SpatialIndex
+
+pytest.importorskip("scipy")
+
+NUM_POINTS = 300
+
+
+def _create_points(num_points: int, seed: int = 0) -> np.ndarray:
+    # Quantized coordinates create exact ties and points on box and sphere boundaries.
+    return np.random.default_rng(seed).integers(-8, 9, size=(num_points, 3)) / 4.0
+
+
+def _brute_force_radius(points, indices, centers, radius) -> list[np.ndarray]:
+    distances = np.linalg.norm(points[None] - centers[:, None], axis=-1)
+    return [indices[distances_center <= radius] for distances_center in distances]
+
+
+def _brute_force_box(points, indices, min_corners, max_corners) -> list[np.ndarray]:
+    return [
+        indices[np.all((points >= min_corner) & (points <= max_corner), axis=-1)]
+        for min_corner, max_corner in zip(min_corners, max_corners)
+    ]
+
+
+def _assert_equal_sets(results: list[np.ndarray], results_expected: list[np.ndarray]):
+    assert len(results) == len(results_expected)
+    for result, result_expected in zip(results, results_expected):
+        assert result.dtype == np.int64 or len(result) == 0
+        np.testing.assert_array_equal(np.sort(result), np.sort(result_expected))
+
+
+@pytest.mark.parametrize("radius", [0.0, 0.25, 0.6, 1.0, 10.0])
+def test_query_radius_matches_brute_force(radius):
+    """Test radius queries and counts including points exactly on the sphere."""
+    points = _create_points(NUM_POINTS)
+    centers = np.concatenate([points[:10], _create_points(10, seed=1) + 0.1])
+    index = SpatialIndex(points, leafsize=4)
+
+    results_expected = _brute_force_radius(points, np.arange(NUM_POINTS), centers, radius)
+    _assert_equal_sets(index.query_radius(centers, radius), results_expected)
+    np.testing.assert_array_equal(
+        index.count_radius(centers, radius), [len(result) for result in results_expected]
+    )
+
+
+@pytest.mark.parametrize("k", [1, 5, NUM_POINTS, NUM_POINTS + 7])
+def test_query_knn_matches_brute_force(k):
+    """Test kNN distances and the padding of missing neighbors if k > len(index)."""
+    points = _create_points(NUM_POINTS)
+    centers = _create_points(20, seed=1) + 0.1
+    index = SpatialIndex(torch.from_numpy(points), leafsize=4)
+
+    distances, indices = index.query_knn(centers, k)
+    assert distances.shape == indices.shape == (len(centers), k)
+
+    distances_all = np.linalg.norm(points[None] - centers[:, None], axis=-1)
+    num_valid = min(k, NUM_POINTS)
+    distances_expected = np.sort(distances_all, axis=-1)[:, :num_valid]
+    np.testing.assert_allclose(distances[:, :num_valid], distances_expected, rtol=1e-12)
+    # Ties may be returned in any order, so compare the distances of the indices.
+    np.testing.assert_allclose(
+        np.take_along_axis(distances_all, indices[:, :num_valid], axis=-1),
+        distances_expected,
+        rtol=1e-12,
+    )
+    for indices_center in indices[:, :num_valid]:
+        assert len(np.unique(indices_center)) == num_valid
+    assert np.all(np.isinf(distances[:, num_valid:]))
+    assert np.all(indices[:, num_valid:] == -1)
+
+
+def test_query_box_matches_brute_force():
+    """Test box queries including points on faces and degenerate boxes."""
+    points = _create_points(NUM_POINTS)
+    rng = np.random.default_rng(1)
+    corners = rng.integers(-10, 11, size=(2, 30, 3)) / 4.0
+    min_corners, max_corners = np.minimum(*corners), np.maximum(*corners)
+    # A flat box and a box which only contains a single grid point.
+    min_corners[0], max_corners[0] = [-1.0, -1.0, 0.5], [1.0, 1.0, 0.5]
+    min_corners[1], max_corners[1] = [0.25, 0.5, -0.75], [0.25, 0.5, -0.75]
+    index = SpatialIndex(points, leafsize=4)
+
+    results_expected = _brute_force_box(points, np.arange(NUM_POINTS), min_corners, max_corners)
+    assert len(results_expected[0]) > 0
+    _assert_equal_sets(index.query_box(min_corners, max_corners), results_expected)
+
+
+def test_subset_returns_original_indices(create_gaussians):
+    """Test that queries on a label subset return indices into the full set of points."""
+    gaussians = create_gaussians(NUM_POINTS)
+    points = gaussians.mean_vectors[0].double().numpy()
+    labels = np.random.default_rng(0).integers(0, 3, size=NUM_POINTS)
+    index = SpatialIndex.from_gaussians(gaussians)
+    subset = index.subset(torch.from_numpy(labels == 1))
+    original_indices = np.flatnonzero(labels == 1)
+    assert len(subset) == len(original_indices)
+
+    centers = points[:15]
+    results_expected = _brute_force_radius(points[original_indices], original_indices, centers, 0.8)
+    _assert_equal_sets(subset.query_radius(centers, 0.8), results_expected)
+    _assert_equal_sets(
+        subset.query_box(centers - 0.5, centers + 0.5),
+        _brute_force_box(points[original_indices], original_indices, centers - 0.5, centers + 0.5),
+    )
+
+    distances, indices = subset.query_knn(centers, len(subset) + 3)
+    assert np.all(labels[indices[:, : len(subset)]] == 1)
+    assert np.all(indices[:, len(subset) :] == -1)
+    np.testing.assert_allclose(
+        distances[:, : len(subset)],
+        np.linalg.norm(points[indices[:, : len(subset)]] - centers[:, None], axis=-1),
+    )
+
+    # Subsets of subsets keep mapping to the original points.
+    nested_subset = subset.subset(points[original_indices, 0] > 0)
+    nested_indices = original_indices[points[original_indices, 0] > 0]
+    _assert_equal_sets(nested_subset.query_radius(centers, 10.0), [nested_indices] * len(centers))
+
+
+def test_spatial_index_invalid_arguments(create_gaussians):
+    """Test the validation of points, indices, masks and the batch size."""
+    with pytest.raises(ValueError):
+        SpatialIndex(np.zeros((10, 2)))
+    with pytest.raises(ValueError):
+        SpatialIndex(np.zeros((10, 3)), indices=np.arange(9))
+    with pytest.raises(ValueError):
+        SpatialIndex(np.zeros((10, 3))).subset(np.ones(9, dtype=bool))
+    gaussians = create_gaussians(10)
+    gaussians_batch = type(gaussians)(*(torch.cat([values, values]) for values in gaussians))
+    with pytest.raises(ValueError):
+        SpatialIndex.from_gaussians(gaussians_batch)
@@ -0,0 +1,81 @@
+"""Contains tests for the sliding pyramid network encoder.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import torch
+
+from sharp.models.encoders import create_monodepth_encoder
+from sharp.models.encoders.spn_encoder import merge, split
+
+# Patch size of the test patches. With an overlap of 0.25, cropping 1/8 of the patch
+# at inner borders tiles the image exactly, like the 24 x 24 tokens of the SPN.
+PATCH_SIZE = 24
+
+
+@pytest.mark.parametrize(
+    "overlap_ratio,padding,steps,num_lower_patches",
+    [(0.0, 0, 4, 2 * 2 + 1), (0.25, 3, 5, 3 * 3 + 1)],
+)
+@pytest.mark.parametrize("batch_size", [1, 2])
+def test_split_merge_round_trip(overlap_ratio, padding, steps, num_lower_patches, batch_size):
+    """Test that merging split patches restores the images of a batch."""
+    image_size = PATCH_SIZE + (steps - 1) * int(PATCH_SIZE * (1 - overlap_ratio))
+    generator = torch.Generator().manual_seed(0)
+    images = torch.rand(batch_size, 3, image_size, image_size, generator=generator)
+
+    patches = split(images, overlap_ratio=overlap_ratio, patch_size=PATCH_SIZE)
+    assert patches.shape == (steps * steps * batch_size, 3, PATCH_SIZE, PATCH_SIZE)
+    assert torch.equal(merge(patches, batch_size=batch_size, padding=padding), images)
+
+    # The forward pass appends the patches of the two lower pyramid levels, which merge
+    # has to ignore.
+    lower_level_patches = torch.rand(num_lower_patches * batch_size, 3, PATCH_SIZE, PATCH_SIZE)
+    patches = torch.cat([patches, lower_level_patches])
+    assert torch.equal(merge(patches, batch_size=batch_size, padding=padding), images)
+
+
+def test_split_merge_batch_order():
+    """Test that patches of each image in a batch are merged into that image."""
+    generator = torch.Generator().manual_seed(1)
+    images = torch.rand(2, 3, 96, 96, generator=generator)
+    patches = split(images, overlap_ratio=0.25, patch_size=PATCH_SIZE)
+    for index in range(2):
+        patches_single = split(images[index : index + 1], overlap_ratio=0.25, patch_size=PATCH_SIZE)
+        assert torch.equal(patches[index::2], patches_single)
+
+
+def test_sliding_pyramid_network_batch():
+    """Test that the SPN encodes each image of a batch like a single image."""
+    torch.manual_seed(0)
+    encoder = create_monodepth_encoder("tiny16_384", "tiny16_384", last_encoder=32).eval()
+    generator = torch.Generator().manual_seed(2)
+    images = torch.rand(2, 3, 1536, 1536, generator=generator)
+
+    with torch.no_grad():
+        outputs = encoder(images)
+        for index in range(2):
+            outputs_single = encoder(images[index : index + 1])
+            for output, output_single in zip(outputs, outputs_single):
+                torch.testing.assert_close(output[index : index + 1], output_single)
+
+
+def test_sliding_pyramid_network_patch_batch_size():
+    """Test that encoding the patches in batches matches encoding them at once."""
+    torch.manual_seed(0)
+    encoder = create_monodepth_encoder("tiny16_384", "tiny16_384", last_encoder=32).eval()
+    generator = torch.Generator().manual_seed(3)
+    images = torch.rand(2, 3, 1536, 1536, generator=generator)
+
+    with torch.no_grad():
+        outputs_expected = encoder(images)
+        for patch_batch_size in (1, 4):
+            encoder.patch_batch_size = patch_batch_size
+            outputs = encoder(images)
+            assert len(outputs) == len(outputs_expected)
+            for output, output_expected in zip(outputs, outputs_expected):
+                assert torch.equal(output, output_expected)
@@ -0,0 +1,86 @@
+"""Contains tests for the visualization utilities.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import typing
+
+import matplotlib
+import numpy as np
+import pytest
+import torch
+
+from sharp.utils import colormaps, vis
+
+COLOR_MAPS = typing.get_args(colormaps.ColorMap)
+
+
+def _colorize_scalar_map_matplotlib(
+    scalar_map: torch.Tensor, val_min: float, val_max: float, color_map: str
+) -> torch.Tensor:
+    """Colorize a scalar map with matplotlib as reference, with format ...HWC."""
+    scalar_map_np = scalar_map.float().numpy()
+    scalar_map_np = np.clip((scalar_map_np - val_min) / (val_max - val_min), 0.0, 1.0)
+    colors = matplotlib.colormaps[color_map](scalar_map_np)[..., :3]
+    return torch.as_tensor(colors * 255.0, dtype=torch.uint8)
+
+
+def _create_scalar_map(shape: tuple[int, ...]) -> torch.Tensor:
+    """Create values in and around [0, 1] including the LUT bin boundaries and NaN."""
+    generator = torch.Generator().manual_seed(0)
+    values = torch.rand(shape, generator=generator) * 1.2 - 0.1
+    values = values.flatten()
+    edge_cases = torch.cat(
+        [
+            torch.arange(colormaps.LUT_SIZE + 1) / colormaps.LUT_SIZE,
+            torch.tensor([0.0, 1.0, -1.0, 2.0, float("nan")]),
+        ]
+    )
+    values[: len(edge_cases)] = edge_cases
+    return values.reshape(shape)
+
+
+@pytest.mark.parametrize("color_map", COLOR_MAPS)
+def test_colormap_lut_matches_matplotlib(color_map):
+    """Test that the precomputed tables match the matplotlib color maps."""
+    colors = matplotlib.colormaps[color_map](np.arange(colormaps.LUT_SIZE))[:, :3]
+    lut_expected = torch.as_tensor((colors * 255.0).astype(np.uint8))
+    assert torch.equal(colormaps.get_colormap_lut(color_map), lut_expected)
+
+
+@pytest.mark.parametrize("color_map", [*COLOR_MAPS, "viridis"])
+@pytest.mark.parametrize("shape", [(32, 48), (2, 32, 48), (2, 3, 32, 48)])
+def test_colorize_scalar_map_matches_matplotlib(color_map, shape):
+    """Test colorization against matplotlib for all supported input dimensions."""
+    scalar_map = _create_scalar_map(shape)
+    colors = vis.colorize_scalar_map(scalar_map, val_min=0.0, val_max=1.0, color_map=color_map)
+    colors_expected = _colorize_scalar_map_matplotlib(scalar_map, 0.0, 1.0, color_map)
+
+    assert colors.dtype == torch.uint8
+    assert torch.equal(colors.movedim(-3, -1), colors_expected)
+
+
+def test_colorize_depth_matches_matplotlib():
+    """Test the colorization of single and multi-layer depth maps."""
+    depth = 12.0 * _create_scalar_map((2, 2, 32, 48))
+    colors = vis.colorize_depth(depth, val_max=10.0)
+    colors_expected = torch.cat(
+        [
+            _colorize_scalar_map_matplotlib(depth[:, layer], 0.0, 10.0, "turbo")
+            for layer in range(depth.shape[1])
+        ],
+        dim=-2,
+    )
+    assert torch.equal(colors.movedim(-3, -1), colors_expected)
+    assert torch.equal(vis.colorize_depth(depth[:, :1], val_max=10.0), colors[..., :48])
+
+
+def test_colorize_alpha_matches_matplotlib():
+    """Test the colorization of alpha maps."""
+    alpha = _create_scalar_map((2, 1, 32, 48))
+    colors = vis.colorize_alpha(alpha)
+    colors_expected = _colorize_scalar_map_matplotlib(alpha[:, 0], 0.0, 1.0, "coolwarm")
+    assert torch.equal(colors.movedim(-3, -1), colors_expected)
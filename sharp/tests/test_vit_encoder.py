@@ -0,0 +1,56 @@
+"""Contains tests for the ViT encoder.
+
+For licensing see accompanying LICENSE file.
+Copyright (C) 2025 Apple Inc. All Rights Reserved.
+"""
+
+from __future__ import annotations
+
+import pytest
+import timm
+import torch
+
+from sharp.models.encoders.vit_encoder import create_vit
+
+
+def _create_tiny_vit():
+    torch.manual_seed(0)
+    return create_vit(preset="tiny16_384", intermediate_features_ids=[1, 3]).eval()
+
+
+@pytest.mark.parametrize("attention_backend", ["math", "eager", "flash"])
+def test_attention_backends_match(attention_backend):
+    """Test that the attention backends compute the same features."""
+    model = _create_tiny_vit()
+    generator = torch.Generator().manual_seed(1)
+    images = torch.rand(2, 3, 384, 384, generator=generator)
+
+    with torch.no_grad():
+        output_expected, features_expected = model(images)
+        model.set_attention_backend(attention_backend)
+        output, features = model(images)
+
+    torch.testing.assert_close(output, output_expected, rtol=1e-4, atol=1e-5)
+    assert features.keys() == features_expected.keys()
+    for index, feature in features.items():
+        torch.testing.assert_close(feature, features_expected[index], rtol=1e-4, atol=1e-5)
+
+
+def test_attention_backend_unsupported_device():
+    """Test that a kernel the device cannot run fails with a clear error."""
+    model = _create_tiny_vit()
+    model.set_attention_backend("efficient")
+    with torch.no_grad(), pytest.raises(RuntimeError, match="Attention backend 'efficient'"):
+        model(torch.rand(1, 3, 384, 384))
+
+
+def test_attention_backend_auto_keeps_timm_default(monkeypatch):
+    """Test that "auto" restores the default of timm, e.g. TIMM_FUSED_ATTN=0."""
+    model = _create_tiny_vit()
+    monkeypatch.setattr(timm.layers, "use_fused_attn", lambda: False)
+    model.set_attention_backend("math")
+    assert all(block.attn.fused_attn for block in model.blocks)
+    model.set_attention_backend("auto")
+    assert not any(block.attn.fused_attn for block in model.blocks)
+    model.set_attention_backend("eager")
+    assert not any(block.attn.fused_attn for block in model.blocks)